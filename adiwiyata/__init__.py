@@ -0,0 +1 @@
+"""Modul pendukung dashboard Adiwiyata & Sampah (app.py)."""
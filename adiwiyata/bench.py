@@ -0,0 +1,447 @@
+"""
+Benchmark pipeline pada data sintetis berskala besar.
+
+Dataset_DS hanya berisi ~500 wilayah. Modul ini membangkitkan kelima file
+sumber (Sekolah, RTH, Sampah, IKA, IKU) dengan skema yang sama persis
+dengan aslinya, dari seed tetap, pada skala 10^3 sampai 10^6 wilayah dan
+sampai 10^7 baris sekolah, lalu mengukur setiap tahap secara terpisah:
+ingest, normalize_kabkot_sekolah, clean/aggregate/resolve/merge, feature
+engineering, korelasi, inference satu baris & batch, dan render grafik EDA.
+
+Tahap pipeline dipanggil lewat fungsi aslinya (__wrapped__, tanpa memo)
+supaya yang diukur benar-benar komputasinya. Hasil ditulis ke JSON
+baseline; mode --compare menandai tahap yang melambat melebihi ambang.
+
+    python -m adiwiyata.bench --scales 1k 10k --out benchmarks/baseline.json
+    python -m adiwiyata.bench --scales 1k 10k --compare benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import compiled, correlation, eda, features, figcache, inference, model_store, pipeline
+from adiwiyata.ingest import FILES, load_sources, read_raw, stream_group_counts
+from adiwiyata.regions import normalize_kabkot_sekolah
+
+# Skala bawaan: nama -> (jumlah wilayah, jumlah baris sekolah)
+SCALES = {
+    "1k": (1_000, 100_000),
+    "10k": (10_000, 1_000_000),
+    "100k": (100_000, 10_000_000),
+    "1m": (1_000_000, 10_000_000),
+}
+
+SEED = 42
+YEARS = (2023, 2024)
+N_PROVINCES = 38
+
+# Suku kata nama wilayah sintetis (4 suku kata -> 40^4 nama unik)
+SYLLABLES = [
+    "ba", "be", "bu", "da", "di", "ga", "go", "gu", "ja", "je",
+    "ka", "ke", "ko", "ku", "la", "lo", "lu", "ma", "me", "mo",
+    "mu", "na", "ne", "ni", "no", "pa", "pu", "ra", "re", "ri",
+    "ro", "sa", "se", "si", "ta", "te", "to", "tu", "wa", "ya",
+]
+NAME_SYLLABLES = 4
+
+# Porsi wilayah yang ejaannya di daftar sekolah salah satu huruf (jalur fuzzy resolve)
+TYPO_RATE = 0.01
+
+# Kunci yang gagal di-resolve paling banyak UNRESOLVED_FACTOR * TYPO_RATE *
+# wilayah (minimal UNRESOLVED_MIN); lebih dari itu berarti join rusak
+# (mis. normalisasi awalan kab/kota) dan hasil tidak layak jadi baseline
+UNRESOLVED_FACTOR = 2.0
+UNRESOLVED_MIN = 5
+
+# Baris maksimum satu sheet Excel (tanpa header); RTH/Sampah yang lebih
+# besar ditulis sebagai CSV (read_raw memilih parser dari ekstensinya)
+EXCEL_MAX_ROWS = 1_048_575
+
+# Baris sekolah per potongan saat menulis CSV
+WRITE_CHUNK = 1_000_000
+
+# Pengulangan: tahap biasa, inference satu baris, replikasi bootstrap
+REPEAT = 3
+SINGLE_ROW_CALLS = 200
+BOOT_SAMPLES = 100
+
+# Baris acak per skala untuk cek paritas evaluator NumPy vs LightGBM
+PARITY_ROWS = 10_000
+
+BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+
+# Tahap dianggap regresi kalau median waktunya > baseline * (1 + THRESHOLD)
+THRESHOLD = 0.20
+# Tahap yang lebih cepat dari ini (detik) di kedua run tidak dinilai (noise)
+MIN_SECONDS = 1e-3
+
+RTH_EXTRA_COLUMNS = [
+    "Taman Kota (km2)", "Hutan Kota (km2)", "Jalur hijau di Jalan (km2)",
+    "Sempadan Sungai (km2)", "Sempadan Pantai (km2)", "Tempat Pemakaman Umum (km2)",
+    "Sempadan Rel Kereta Api (km2)", "Jalur Hijau Jaringan Listrik Tegangan Tinggi (km2)",
+    "Pengaman Sumber_Air Baku Mata Air (km2)", "Kebun Bibit (km2)", "Lain-lain (km2)",
+]
+
+
+# ==========================================
+# GENERATOR DATA SINTETIS
+# ==========================================
+def region_names(n_regions, rng):
+    """Nama inti unik ("Bamurosa") dari kombinasi suku kata, urutan acak"""
+    n_syl = len(SYLLABLES)
+    if n_regions > n_syl ** NAME_SYLLABLES:
+        raise ValueError(f"Maksimum {n_syl ** NAME_SYLLABLES} wilayah")
+    codes = rng.choice(n_syl ** NAME_SYLLABLES, size=n_regions, replace=False)
+    syl = np.array(SYLLABLES, dtype=object)
+    names = syl[codes % n_syl]
+    for k in range(1, NAME_SYLLABLES):
+        names = names + syl[(codes // n_syl ** k) % n_syl]
+    return pd.Series(names, dtype=object).str.title().to_numpy(dtype=object)
+
+
+def _with_dashes(values, rate, rng):
+    """Kolom angka dengan sebagian sel '-' (seperti file Excel asli)"""
+    out = values.astype(object)
+    out[rng.random(len(values)) < rate] = "-"
+    return out
+
+
+def _write_table(df, path):
+    """Tulis .xlsx kalau muat satu sheet, selain itu .csv (path dikembalikan)"""
+    if len(df) <= EXCEL_MAX_ROWS:
+        df.to_excel(path, index=False)
+        return path
+    path = f"{os.path.splitext(path)[0]}.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def generate(out_dir, n_regions, n_schools, seed=SEED):
+    """
+    Tulis lima file sumber sintetis ke out_dir dengan nama & kolom sesuai
+    ingest.FILES. Hasil: dict {label FILES: path}.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {label: os.path.join(out_dir, name) for label, name in FILES.items()}
+
+    core = region_names(n_regions, rng)
+    is_kota = rng.random(n_regions) < 0.2
+    canonical = np.where(is_kota, "Kota " + core, "Kab. " + core)
+    province = np.arange(n_regions) % N_PROVINCES
+    prov_names = np.array([f"Provinsi {p + 1:02d}" for p in range(N_PROVINCES)], dtype=object)
+
+    # --- Sekolah: nama kab/kota mentah dengan variasi penulisan ---
+    upper = pd.Series(core, dtype=object).str.upper().to_numpy(dtype=object)
+    typo = rng.random(n_regions) < TYPO_RATE
+    dropped = pd.Series(upper, dtype=object).str.slice_replace(2, 3, "").to_numpy(dtype=object)
+    variants = np.stack([
+        np.where(is_kota, "KOTA " + upper, "KABUPATEN " + upper),
+        np.where(is_kota, "KOTA  " + upper, "KAB. " + upper),
+        np.where(is_kota, "Kota " + np.where(typo, dropped, upper), "kab " + np.where(typo, dropped, upper)),
+    ])
+    prov_upper = pd.Series(prov_names, dtype=object).str.upper().to_numpy(dtype=object)
+    with open(paths["Sekolah"], "w", encoding="utf-8", newline="") as f:
+        for start in range(0, n_schools, WRITE_CHUNK):
+            stop = min(start + WRITE_CHUNK, n_schools)
+            m = stop - start
+            region = rng.integers(0, n_regions, m)
+            no = np.arange(start + 1, stop + 1)
+            pd.DataFrame({
+                "No": no,
+                "Provinsi": prov_upper[province[region]],
+                "Kabupaten/Kota": variants[rng.integers(0, len(variants), m), region],
+                "Nama Sekolah": "SEKOLAH " + pd.Series(no).astype(str).to_numpy(dtype=object),
+                "Tingkat Sekolah": rng.choice(["SD/MI", "SMP/MTS", "SMA/SMK/MA"], m),
+                "Tingkat Penghargaan": rng.choice(["KABUPATEN/KOTA", "PROVINSI", "NASIONAL", "MANDIRI"], m),
+                "Jenis Sekolah": rng.choice(["negeri", "swasta"], m),
+            }).to_csv(f, header=start == 0, index=False)
+
+    # --- RTH & Sampah: satu baris per wilayah per tahun (tahun terakhir tidak lengkap) ---
+    rth_parts, sampah_parts = [], []
+    luas = rng.lognormal(6.5, 1.2, n_regions)
+    harian = rng.lognormal(4.5, 1.0, n_regions)
+    for year in YEARS:
+        rows = np.flatnonzero(rng.random(n_regions) < (0.9 if year == YEARS[-1] else 1.0))
+        n = len(rows)
+        luas_y = luas[rows] * rng.normal(1.0, 0.01, n)
+        rth_y = luas_y * rng.uniform(0.01, 0.4, n)
+        rth = pd.DataFrame({
+            "Tahun": year,
+            "Provinsi": prov_names[province[rows]],
+            "Kabupaten/Kota": canonical[rows],
+            "Luas Wilayah (km2)(A)": _with_dashes(luas_y.round(2), 0.005, rng),
+            "Luas RTH (km2)(B)": rth_y.round(2),
+            "% RTH(B/A)": _with_dashes((rth_y / luas_y * 100).round(2), 0.02, rng),
+        })
+        for col in RTH_EXTRA_COLUMNS:
+            rth[col] = _with_dashes((rth_y * rng.uniform(0, 0.2, n)).round(2), 0.3, rng)
+        rth_parts.append(rth)
+
+        harian_y = harian[rows] * rng.normal(1.0, 0.05, n)
+        sampah_parts.append(pd.DataFrame({
+            "Tahun": year,
+            "Provinsi": prov_names[province[rows]],
+            "Kabupaten/Kota": canonical[rows],
+            "Timbulan Sampah Harian(ton)": harian_y.round(2),
+            "Timbulan Sampah Tahunan(ton)": (harian_y * 365).round(2),
+        }))
+    paths["RTH"] = _write_table(pd.concat(rth_parts, ignore_index=True), paths["RTH"])
+    paths["Sampah"] = _write_table(pd.concat(sampah_parts, ignore_index=True), paths["Sampah"])
+
+    # --- IKA / IKU: satu baris per provinsi ---
+    pd.DataFrame({
+        "Provinsi": prov_names,
+        "Indeks Kualitas Air": rng.uniform(30, 80, N_PROVINCES).round(1),
+    }).to_csv(paths["Kualitas Air"], index=False)
+    pd.DataFrame({
+        "Provinsi": prov_names,
+        "Indeks Kualitas Udara": rng.uniform(70, 95, N_PROVINCES).round(2),
+    }).to_csv(paths["Kualitas Udara"], index=False)
+    return paths
+
+
+# ==========================================
+# PENGUKURAN
+# ==========================================
+def _measure(fn, repeat):
+    """Jalankan fn `repeat` kali -> (hasil terakhir, statistik waktu)"""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - t0)
+    return result, {"seconds": float(np.median(runs)), "min": float(min(runs)), "runs": len(runs)}
+
+
+def run_scale(n_regions, n_schools, model, seed=SEED, repeat=REPEAT, data_dir=None):
+    """Bangkitkan satu skala lalu ukur semua tahap. Hasil: dict siap JSON"""
+    stages = {}
+
+    def timed(name, fn, n=repeat):
+        result, stages[name] = _measure(fn, n)
+        return result
+
+    with tempfile.TemporaryDirectory(prefix="adiwiyata-bench-") as tmp:
+        out_dir = data_dir or os.path.join(tmp, "data")
+        cache_dir = os.path.join(tmp, "columnar")
+
+        t0 = time.perf_counter()
+        paths = generate(out_dir, n_regions, n_schools, seed)
+        generate_seconds = time.perf_counter() - t0
+
+        # --- INGEST ---
+        sources = {label: paths[label] for label in ["Sekolah", "RTH", "Sampah"]}
+        raw = {label: timed(f"ingest.read_raw.{label.lower()}", lambda p=path: read_raw(p), 1)
+               for label, path in sources.items()}
+        timed("ingest.parquet_build", lambda: load_sources(sources, cache_dir), 1)
+        timed("ingest.parquet_hit", lambda: load_sources(sources, cache_dir))
+        counts = timed(
+            "ingest.stream_counts",
+            lambda: stream_group_counts(paths["Sekolah"], "Kabupaten/Kota", "Nama Sekolah"),
+        )
+
+        # --- NORMALISASI (jalur aturan penuh, tanpa belajar alias) ---
+        timed("normalize_kabkot_sekolah", lambda: normalize_kabkot_sekolah(raw["Sekolah"]["Kabupaten/Kota"], learn=False))
+
+        # --- CLEAN / AGGREGATE / RESOLVE / MERGE ---
+        sekolah = timed("clean.sekolah", lambda: pipeline.clean_sekolah.__wrapped__(raw["Sekolah"]))
+        rth = timed("clean.rth", lambda: pipeline.clean_rth.__wrapped__(raw["RTH"]))
+        sampah = timed("clean.sampah", lambda: pipeline.clean_sampah.__wrapped__(raw["Sampah"]))
+        sekolah_w = timed("aggregate.sekolah", lambda: pipeline.aggregate_sekolah.__wrapped__(sekolah))
+        timed("aggregate.sekolah_counts", lambda: pipeline.aggregate_sekolah_counts.__wrapped__(counts))
+        rth_w = timed("aggregate.latest_rth", lambda: pipeline.latest_per_region.__wrapped__(rth, columns=pipeline.RTH_COLUMNS))
+        sampah_w = timed(
+            "aggregate.latest_sampah",
+            lambda: pipeline.latest_per_region.__wrapped__(sampah, columns=pipeline.SAMPAH_COLUMNS),
+        )
+        resolved, report = timed("resolve", lambda: pipeline.resolve_sekolah.__wrapped__(sekolah_w, rth_w, sampah_w))
+        df_final = timed("merge.final", lambda: pipeline.merge_final.__wrapped__(resolved, rth_w, sampah_w))
+
+
+        # --- FEATURES & KORELASI ---
+        timed("features", lambda: features._build(df_final))
+        df_corr = features.feature_frame(df_final)[eda.CORR_COLS]
+        timed("correlation.compute", lambda: correlation.compute(df_corr))
+        timed(
+            "correlation.bootstrap",
+            lambda: correlation.bootstrap(df_corr, "spearman", n_boot=BOOT_SAMPLES, workers=os.cpu_count() or 1),
+            1,
+        )
+
+        # --- INFERENCE ---
+        raw_inputs = df_final.loc[df_final["LUAS_WILAYAH"] > 0, inference.RAW_COLUMNS].dropna().to_numpy(dtype=np.float64)
+        record = dict(zip(inference.RAW_INPUTS, raw_inputs[0]))
+        # Paritas compiled vs predict_proba: AssertionError menggagalkan run (tidak ada baseline)
+        X = inference.build_features(raw_inputs)
+        parity = compiled.check_parity(model, X[np.random.default_rng(seed).permutation(len(X))[:PARITY_ROWS]])
+        inference.predict(model, raw_inputs[:1], compiled=True)  # kompilasi model di luar pengukuran
+        timed("inference.single_row", lambda: inference.predict(model, record), SINGLE_ROW_CALLS)
+        timed("inference.single_row_compiled", lambda: inference.predict(model, record, compiled=True), SINGLE_ROW_CALLS)
+        timed("inference.batch", lambda: inference.predict(model, raw_inputs))
+        timed("inference.batch_compiled", lambda: inference.predict(model, raw_inputs, compiled=True))
+
+        # --- GRAFIK EDA (tanpa cache bytes) ---
+        for section in eda.SECTIONS:
+            figs = list(section.figures(eda.load_deps(section, df_final)).values())
+            timed(f"charts.{section.key}",
+                  lambda figs=figs: [figcache.figure_bytes(f.draw(f.data, **f.params)) for f in figs], 1)
+
+        return {
+            "regions": n_regions,
+            "schools": n_schools,
+            "rows_final": int(len(df_final)),
+            "unresolved": int(report.loc[report["method"] == "none", "key"].nunique()),
+            "parity_max_diff": parity,
+            "formats": {label: os.path.splitext(path)[1].lstrip(".") for label, path in paths.items()},
+            "generate_seconds": generate_seconds,
+            "stages": stages,
+        }
+
+
+def check_resolution(result):
+    """Pastikan join wilayah satu skala sehat (lihat UNRESOLVED_FACTOR), selain itu RuntimeError"""
+    limit = max(UNRESOLVED_FACTOR * TYPO_RATE * result["regions"], UNRESOLVED_MIN)
+    if result["unresolved"] > limit:
+        raise RuntimeError(
+            f"{result['unresolved']:,} kunci wilayah tidak ter-resolve dari {result['regions']:,} wilayah "
+            f"(batas {limit:,.0f}, ~{TYPO_RATE:.0%} typo); join rusak, hasil tidak ditulis"
+        )
+    return result
+
+
+def environment():
+    import lightgbm
+    import matplotlib
+    import pyarrow
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": {
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pyarrow": pyarrow.__version__,
+            "lightgbm": lightgbm.__version__,
+            "matplotlib": matplotlib.__version__,
+        },
+    }
+
+
+def run(scales, model_path=model_store.PATH_MODEL, seed=SEED, repeat=REPEAT, data_dir=None, log=print):
+    """
+    Jalankan beberapa skala: {nama: (wilayah, sekolah)} -> dict hasil lengkap.
+    data_dir: simpan file sintetis di data_dir/<nama skala> (bisa dipakai
+    sebagai BASE_DIR aplikasi), selain itu di folder sementara.
+    """
+    model = model_store.get_model(model_path)
+    result = {"meta": {**environment(), "seed": seed, "model": model_path}, "scales": {}}
+    for name, (n_regions, n_schools) in scales.items():
+        log(f"[{name}] {n_regions:,} wilayah, {n_schools:,} baris sekolah ...")
+        result["scales"][name] = check_resolution(run_scale(
+            n_regions, n_schools, model, seed, repeat,
+            data_dir=os.path.join(data_dir, name) if data_dir else None,
+        ))
+    return result
+
+
+# ==========================================
+# BASELINE & PERBANDINGAN
+# ==========================================
+def save(result, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load(path=BASELINE_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """
+    Bandingkan median waktu per (skala, tahap) yang ada di kedua hasil.
+    Hasil: DataFrame dengan kolom ratio & regression.
+    """
+    rows = []
+    for scale, result in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if base is None:
+            continue
+        for stage_name, stats in result["stages"].items():
+            ref = base["stages"].get(stage_name)
+            if ref is None:
+                continue
+            now, before = stats["seconds"], ref["seconds"]
+            ratio = now / before if before > 0 else float("inf")
+            rows.append({
+                "scale": scale,
+                "stage": stage_name,
+                "baseline_s": before,
+                "current_s": now,
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold and max(now, before) >= min_seconds,
+            })
+    return pd.DataFrame(rows, columns=["scale", "stage", "baseline_s", "current_s", "ratio", "regression"])
+
+
+def parse_scale(spec):
+    """'10k' (lihat SCALES) atau '<wilayah>:<sekolah>' -> (nama, (wilayah, sekolah))"""
+    if spec in SCALES:
+        return spec, SCALES[spec]
+    try:
+        n_regions, n_schools = (int(v) for v in spec.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Skala tidak dikenal: {spec} (pilih {', '.join(SCALES)} atau WILAYAH:SEKOLAH)") from None
+    return spec, (n_regions, n_schools)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline Adiwiyata pada data sintetis")
+    parser.add_argument("--scales", nargs="+", type=parse_scale, default=[parse_scale("1k"), parse_scale("10k")],
+                        help=f"skala ({', '.join(SCALES)}) atau WILAYAH:SEKOLAH")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="pengulangan per tahap (median)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--model", default=model_store.PATH_MODEL)
+    parser.add_argument("--data-dir", help="simpan file sintetis di sini (per skala) alih-alih folder sementara")
+    parser.add_argument("--out", help=f"tulis hasil ke JSON ini (mis. {BASELINE_PATH})")
+    parser.add_argument("--compare", metavar="BASELINE", help="bandingkan dengan JSON baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="ambang regresi relatif (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    result = run(dict(args.scales), args.model, args.seed, args.repeat, args.data_dir)
+    if args.out:
+        save(result, args.out)
+        print(f"Hasil ditulis ke {args.out}")
+
+    if not args.compare:
+        print(json.dumps(result["scales"], indent=2))
+        return 0
+
+    table = compare(result, load(args.compare), args.threshold)
+    with pd.option_context("display.max_rows", None, "display.width", 120):
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+    regressions = table[table["regression"]]
+    if len(regressions):
+        print(f"\n{len(regressions)} tahap melambat > {args.threshold:.0%} dari baseline {args.compare}")
+        return 1
+    print(f"\nTidak ada regresi > {args.threshold:.0%} dari baseline {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
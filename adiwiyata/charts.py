@@ -0,0 +1,164 @@
+"""
+Grafik matplotlib/seaborn halaman EDA & Modelling.
+
+Setiap fungsi menerima potongan data + parameter grafik dan mengembalikan
+Figure, tanpa memanggil Streamlit, sehingga hasilnya bisa di-render sekali
+lalu disimpan sebagai bytes (lihat adiwiyata/figcache.py).
+"""
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from adiwiyata import correlation, segments
+
+
+# ==========================================
+# TAB 1: STATISTIK & DISTRIBUSI
+# ==========================================
+def distribution_grid(df):
+    """Histogram + KDE tiap kolom (grid 2x3)"""
+    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
+    axes = axes.flatten()
+
+    for i, col in enumerate(df.columns):
+        if i < len(axes):
+            # Warna histogram: Hijau jika berhubungan dengan lingkungan (RTH/Sekolah),
+            # Merah jika berhubungan dengan beban (Sampah/Luas)
+            bar_color = "#66BB6A" if "SEKOLAH" in col or "RTH" in col else "#EF5350"
+
+            sns.histplot(df[col], kde=True, ax=axes[i], bins=25, color=bar_color)
+
+            # Judul yang lebih deskriptif
+            axes[i].set_title(col.replace("_", " "), fontsize=10, fontweight='bold')
+            axes[i].set_xlabel("")
+            axes[i].set_ylabel("Jumlah Wilayah")
+
+    for j in range(len(df.columns), len(axes)):
+        axes[j].axis("off")
+
+    fig.tight_layout()
+    return fig
+
+
+def outlier_box(series):
+    """Boxplot satu indikator"""
+    fig, ax = plt.subplots(figsize=(10, 4))
+    sns.boxplot(x=series, color="#FFD54F", ax=ax)
+    ax.set_title(f"Sebaran {series.name}")
+    ax.set_xlabel("")
+    return fig
+
+
+# ==========================================
+# TAB 2: LOG TRANSFORM
+# ==========================================
+def log_compare_grid(df, columns):
+    """Histogram sebelum (kiri) vs sesudah log transform (kanan)"""
+    fig, axes = plt.subplots(nrows=len(columns), ncols=2, figsize=(16, 4 * len(columns)))
+
+    for i, col in enumerate(columns):
+        # BEFORE (Data Asli)
+        sns.histplot(df[col], bins=30, kde=True, ax=axes[i, 0], color='#EF5350') # Merah (Timpang)
+        axes[i, 0].set_title(f"SEBELUM: {col}\n(Sangat Timpang ke Kiri)", fontsize=10, color='red')
+        axes[i, 0].set_xlabel("")
+        axes[i, 0].set_ylabel("Frekuensi")
+
+        # AFTER (Data Log)
+        sns.histplot(df[f"LOG_{col}"], bins=30, kde=True, ax=axes[i, 1], color='#42A5F5') # Biru (Normal)
+        axes[i, 1].set_title(f"SESUDAH: LOG_{col}\n(Lebih Terdistribusi Normal)", fontsize=10, color='blue')
+        axes[i, 1].set_xlabel("")
+        axes[i, 1].set_ylabel("")
+
+    fig.tight_layout()
+    return fig
+
+
+def horizontal_box(df, title, figsize=(14, 6), grid=False):
+    """Boxplot horizontal beberapa kolom sekaligus"""
+    fig, ax = plt.subplots(figsize=figsize)
+    # Menggunakan palette 'Set2' agar warna-warni tapi lembut
+    sns.boxplot(data=df, orient="h", palette="Set2", ax=ax)
+    ax.set_title(title)
+    if grid:
+        ax.grid(axis='x', linestyle='--', alpha=0.3)
+    return fig
+
+
+# ==========================================
+# TAB 3 & 4: KORELASI
+# ==========================================
+def corr_heatmap(df, method, title=None, figsize=(8, 6), bounded=True):
+    """Heatmap matriks korelasi (spearman / pearson) dari kolom-kolom df"""
+    # Ranking & matriks dipakai bersama Spearman/Pearson (lihat adiwiyata/correlation.py)
+    corr = correlation.matrix(df, method)
+    fig, ax = plt.subplots(figsize=figsize)
+    limits = {"vmin": -1, "vmax": 1} if bounded else {}
+    sns.heatmap(corr, annot=True, cmap="coolwarm", center=0, fmt=".2f", ax=ax, **limits)
+    if title:
+        ax.set_title(title)
+    return fig
+
+
+# ==========================================
+# TAB 4: NORMALISASI WILAYAH
+# ==========================================
+def density_hist(df):
+    """Histogram + KDE kolom densitas (1 baris)"""
+    fig, axes = plt.subplots(1, len(df.columns), figsize=(18, 5))
+    for i, col in enumerate(df.columns):
+        sns.histplot(df[col], bins=30, kde=True, ax=axes[i], color='green')
+        axes[i].set_title(f"Distribusi {col}")
+        axes[i].set_xlabel("")
+    fig.tight_layout()
+    return fig
+
+
+# ==========================================
+# TAB 5: SEGMENTASI (REGRESI PER KELOMPOK)
+# ==========================================
+def segment_lmplot(df, x="LOG_ADIWIYATA_PER_KM2", y="LOG_SAMPAH_HARIAN_PER_KM2", groups=2):
+    """Regresi x vs y per kelompok kuantil y (OLS + pita CI analitik, lihat adiwiyata/segments.py)"""
+    result = segments.segment(df, x, y, groups=groups)
+    data = df[[x, y]].dropna()
+    colors = sns.color_palette(n_colors=groups)
+
+    # Ukuran sama dengan lmplot(height=5, aspect=1.2)
+    fig, ax = plt.subplots(figsize=(6, 5))
+    for i, label in enumerate(result.labels):
+        part = data[result.codes == i]
+        band = result.bands[result.bands["group"] == i]
+        ax.scatter(part[x], part[y], color=colors[i], alpha=0.5, label=label)
+        ax.plot(band["x"], band["y"], color=colors[i])
+        ax.fill_between(band["x"], band["lo"], band["hi"], color=colors[i], alpha=0.15)
+
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.set_title("Perbedaan Pola Hubungan: Wilayah Rendah vs Tinggi")
+    ax.legend(title="Kategori Wilayah", loc='upper left') # Merapikan legend
+    sns.despine(fig)
+    fig.tight_layout()
+    return fig
+
+
+# ==========================================
+# MODELLING: EVALUASI MODEL
+# ==========================================
+def confusion_heatmap(cm, labels=("Selaras", "Tdk Selaras")):
+    """Heatmap confusion matrix (array 2x2)"""
+    fig, ax = plt.subplots(figsize=(4, 3))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+                xticklabels=list(labels), yticklabels=list(labels), ax=ax)
+    return fig
+
+
+def importance_bar(df):
+    """Bar horizontal feature importance (kolom Fitur & Importance)"""
+    fig, ax = plt.subplots(figsize=(8, 3))
+    sns.barplot(data=df, x="Importance", y="Fitur", palette="viridis", ax=ax)
+    return fig
+
+
+def label_dist_bar(df):
+    """Jumlah per label: data asli vs prediksi model (kolom Label, Count, Type)"""
+    fig, ax = plt.subplots(figsize=(8, 4))
+    sns.barplot(data=df, x="Label", y="Count", hue="Type", palette="pastel", ax=ax)
+    return fig
@@ -0,0 +1,323 @@
+"""
+Evaluator pohon LightGBM "terkompilasi" ke array NumPy datar.
+
+Booster di-export lewat dump_model() menjadi array node (fitur, threshold,
+anak kiri/kanan, aturan missing value, nilai leaf). Prediksi lalu berjalan
+untuk SEMUA pohon sekaligus: matriks indeks node (n_baris, n_pohon) maju
+satu level per iterasi sampai semua berada di leaf. Tidak ada overhead
+validasi/pandas per panggilan, jadi cocok untuk input satu baris maupun
+jutaan baris (diproses per blok agar memori tetap terbatas).
+
+Cek paritas & benchmark:  python -m adiwiyata.compiled
+Paritas juga dicek otomatis di setiap skala adiwiyata.bench.
+"""
+import time
+import weakref
+
+import numpy as np
+
+# Sama dengan kZeroThreshold di LightGBM
+ZERO_THRESHOLD = 1e-35
+
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+# Baris per blok traversal (matriks indeks blok x n_pohon).
+# Mode dense menyimpan keputusan semua node per baris, jadi bloknya lebih kecil
+BLOCK_ROWS = 4096
+DENSE_BLOCK_ROWS = 64
+
+# Pohon sedalam ini atau kurang dipadatkan menjadi pohon biner lengkap
+DENSE_MAX_DEPTH = 10
+
+# Batas memori kerja satu blok dense. Per baris per node padding ada nilai
+# fitur (float64), keputusan (bool) dan keputusan sebagai indeks (intp)
+DENSE_MAX_BLOCK_BYTES = 64 * 1024 * 1024
+DENSE_BYTES_PER_NODE = 8 + 1 + 8
+
+
+class CompiledModel:
+    """
+    Booster biner LightGBM dalam bentuk array node datar.
+
+    Kalau kedalaman pohon <= DENSE_MAX_DEPTH dan memori satu blok dense
+    (DENSE_BLOCK_ROWS x total node padding) muat di DENSE_MAX_BLOCK_BYTES,
+    setiap pohon dipadatkan menjadi pohon biner lengkap (anak node i ada di
+    2i+1 / 2i+2). Keputusan semua node dihitung dalam satu operasi compare,
+    lalu satu level traversal cukup satu gather. Selain itu dipakai
+    representasi sparse (indeks anak eksplisit).
+    """
+
+    def __init__(self, dump):
+        if dump.get("num_tree_per_iteration", 1) != 1:
+            raise NotImplementedError("Hanya model biner/regresi (1 pohon per iterasi)")
+        objective = dump.get("objective", "")
+        self.sigmoid = None
+        if objective.startswith("binary"):
+            self.sigmoid = float(objective.split("sigmoid:")[1]) if "sigmoid:" in objective else 1.0
+        self.average_output = bool(dump.get("average_output", False))
+        self.feature_names = list(dump["feature_names"])
+
+        trees = [tree["tree_structure"] for tree in dump["tree_info"]]
+        for tree in trees:
+            _check_numeric(tree)
+        self.num_trees = len(trees)
+        self.max_depth = max((_depth(tree) for tree in trees), default=0)
+        self.dense = (
+            self.max_depth <= DENSE_MAX_DEPTH
+            and _dense_block_bytes(self.num_trees, self.max_depth) <= DENSE_MAX_BLOCK_BYTES
+        )
+        if self.dense:
+            self._build_dense(trees)
+        else:
+            self._build_sparse(trees)
+
+    # ------------------------------------------
+    # Representasi pohon lengkap (dense)
+    # ------------------------------------------
+    def _build_dense(self, trees):
+        depth = self.max_depth
+        n_inner, n_leaf = 2 ** depth - 1, 2 ** depth
+        T = self.num_trees
+
+        feature = np.zeros((T, n_inner), dtype=np.intp)
+        threshold = np.full((T, n_inner), np.inf)
+        default_left = np.ones((T, n_inner), dtype=bool)
+        missing = np.zeros((T, n_inner), dtype=np.int8)
+        value = np.zeros((T, n_leaf))
+
+        def fill(t, node, pos, level):
+            if level == depth:
+                value[t, pos - n_inner] = node["leaf_value"]
+                return
+            if "leaf_value" in node:
+                # Leaf yang lebih dangkal: kedua anak membawa leaf yang sama,
+                # jadi arah cabang padding tidak berpengaruh
+                fill(t, node, 2 * pos + 1, level + 1)
+                fill(t, node, 2 * pos + 2, level + 1)
+                return
+            feature[t, pos] = node["split_feature"]
+            threshold[t, pos] = node["threshold"]
+            default_left[t, pos] = node["default_left"]
+            missing[t, pos] = _MISSING_TYPES[node["missing_type"]]
+            fill(t, node["left_child"], 2 * pos + 1, level + 1)
+            fill(t, node["right_child"], 2 * pos + 2, level + 1)
+
+        for t, tree in enumerate(trees):
+            fill(t, tree, 0, 0)
+
+        self.n_inner = n_inner
+        self.tree_offset = (np.arange(T) * n_inner).astype(np.intp)
+        self.leaf_offset = (np.arange(T) * n_leaf - n_inner).astype(np.intp)
+        self.feature = feature.ravel()
+        self.threshold = threshold.ravel()
+        self.default_left = default_left.ravel()
+        self.missing = missing.ravel()
+        self.value = value.ravel()
+        self.has_zero_missing = bool((self.missing == MISSING_ZERO).any())
+
+    def _leaves_dense(self, X):
+        n = X.shape[0]
+        # Keputusan SEMUA node sekaligus: (n, n_pohon * n_inner), 1 = ke kanan
+        fval = X[:, self.feature]
+        if self.has_zero_missing or np.isnan(fval).any():
+            go_right = ~_decide_missing(fval, self.missing, self.default_left, self.threshold)
+        else:
+            go_right = fval > self.threshold
+        go_right = go_right.astype(np.intp).ravel()
+
+        row_offset = (np.arange(n, dtype=np.intp) * go_right.size // max(n, 1))[:, None] + self.tree_offset
+        node = np.zeros((n, self.num_trees), dtype=np.intp)
+        for _ in range(self.max_depth):
+            node = 2 * node + 1 + go_right[row_offset + node]
+        return node + self.leaf_offset
+
+    # ------------------------------------------
+    # Representasi sparse (pohon dalam)
+    # ------------------------------------------
+    def _build_sparse(self, trees):
+        feature, threshold, left, right = [], [], [], []
+        default_left, missing, value = [], [], []
+        roots = []
+
+        def add(node):
+            i = len(feature)
+            # Leaf menunjuk ke dirinya sendiri agar tetap diam di level berikutnya
+            feature.append(0); threshold.append(np.inf); left.append(i); right.append(i)
+            default_left.append(True); missing.append(MISSING_NONE); value.append(0.0)
+            if "leaf_value" in node:
+                value[i] = node["leaf_value"]
+                return i
+            feature[i] = node["split_feature"]
+            threshold[i] = node["threshold"]
+            default_left[i] = node["default_left"]
+            missing[i] = _MISSING_TYPES[node["missing_type"]]
+            left[i] = add(node["left_child"])
+            right[i] = add(node["right_child"])
+            return i
+
+        for tree in trees:
+            roots.append(add(tree))
+
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing = np.asarray(missing, dtype=np.int8)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+
+    def _leaves_sparse(self, X):
+        n, n_features = X.shape
+        flat_x = X.ravel()
+        row_offset = (np.arange(n, dtype=np.intp) * n_features)[:, None]
+        idx = np.broadcast_to(self.roots, (n, self.num_trees)).copy()
+
+        for _ in range(self.max_depth):
+            fval = flat_x[row_offset + self.feature[idx]]
+            go_left = _decide_missing(fval, self.missing[idx], self.default_left[idx], self.threshold[idx])
+            idx = np.where(go_left, self.left[idx], self.right[idx])
+        return idx
+
+    # ------------------------------------------
+    # Prediksi
+    # ------------------------------------------
+    def predict_raw(self, X):
+        """Skor mentah (jumlah nilai leaf semua pohon)"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        leaves = self._leaves_dense if self.dense else self._leaves_sparse
+        block_rows = DENSE_BLOCK_ROWS if self.dense else BLOCK_ROWS
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], block_rows):
+            block = X[start:start + block_rows]
+            out[start:start + block_rows] = self.value[leaves(block)].sum(axis=1)
+        if self.average_output:
+            out /= self.num_trees
+        return out
+
+    def predict_proba(self, X):
+        """Probabilitas (n, 2) seperti LGBMClassifier.predict_proba"""
+        if self.sigmoid is None:
+            raise ValueError("Model bukan klasifikasi biner")
+        p = 1.0 / (1.0 + np.exp(-self.sigmoid * self.predict_raw(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return np.argmax(self.predict_proba(X), axis=1)
+
+
+def _check_numeric(node):
+    if "leaf_value" in node:
+        return
+    if node["decision_type"] != "<=":
+        raise NotImplementedError("Split kategorikal belum didukung")
+    _check_numeric(node["left_child"])
+    _check_numeric(node["right_child"])
+
+
+def _depth(node):
+    if "leaf_value" in node:
+        return 0
+    return 1 + max(_depth(node["left_child"]), _depth(node["right_child"]))
+
+
+def _dense_block_bytes(num_trees, depth):
+    """Perkiraan memori kerja satu blok traversal dense (byte)"""
+    padded_nodes = num_trees * (2 ** depth - 1)
+    return DENSE_BLOCK_ROWS * padded_nodes * DENSE_BYTES_PER_NODE
+
+
+def _decide_missing(fval, missing, default_left, threshold):
+    """Sama seperti NumericalDecision LightGBM (True = ke kiri)"""
+    nan = np.isnan(fval)
+    # NaN dianggap 0 kecuali missing_type NaN
+    fval = np.where(nan & (missing != MISSING_NAN), 0.0, fval)
+    use_default = ((missing == MISSING_ZERO) & (np.abs(fval) <= ZERO_THRESHOLD)) | \
+                  ((missing == MISSING_NAN) & nan)
+    return np.where(use_default, default_left, fval <= threshold)
+
+
+_compiled = weakref.WeakKeyDictionary()
+
+
+def compile_model(model):
+    """CompiledModel untuk LGBMClassifier (di-cache per objek model)"""
+    compiled = _compiled.get(model)
+    if compiled is None:
+        compiled = _compiled[model] = CompiledModel(model.booster_.dump_model())
+    return compiled
+
+
+def check_parity(model, X, atol=1e-12):
+    """
+    Bandingkan CompiledModel dengan model.predict_proba pada X.
+    Melempar AssertionError kalau selisih probabilitas > atol atau kelas berbeda.
+    """
+    compiled = compile_model(model)
+    expected = model.predict_proba(X)
+    got = compiled.predict_proba(np.asarray(X, dtype=np.float64))
+    max_diff = float(np.max(np.abs(expected - got))) if len(got) else 0.0
+    assert max_diff <= atol, f"Selisih probabilitas {max_diff:.3e} > {atol:.0e}"
+    assert np.array_equal(model.predict(X), model.classes_[np.argmax(got, axis=1)]), "Kelas prediksi berbeda"
+    return max_diff
+
+
+def _timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def benchmark(model, X, batch_rows=1_000_000, repeat=20):
+    """Latensi satu baris & throughput batch: predict_proba vs CompiledModel"""
+    import pandas as pd
+
+    compiled = compile_model(model)
+    X = np.asarray(X, dtype=np.float64)
+    names = list(model.feature_name_)
+    row_df = pd.DataFrame(X[:1], columns=names)
+    row_np = X[:1]
+
+    rng = np.random.default_rng(42)
+    batch = X[rng.integers(0, len(X), batch_rows)]
+    batch_df = pd.DataFrame(batch, columns=names)
+
+    single_sklearn = _timeit(lambda: model.predict_proba(row_df), repeat)
+    single_booster = _timeit(lambda: model.booster_.predict(row_np), repeat)
+    single_compiled = _timeit(lambda: compiled.predict_proba(row_np), repeat)
+    batch_sklearn = _timeit(lambda: model.predict_proba(batch_df), 3)
+    batch_compiled = _timeit(lambda: compiled.predict_proba(batch), 3)
+
+    return {
+        "single_row_us": {
+            "predict_proba": single_sklearn * 1e6,
+            "booster_predict": single_booster * 1e6,
+            "compiled": single_compiled * 1e6,
+        },
+        "batch_rows": batch_rows,
+        "batch_rows_per_s": {
+            "predict_proba": batch_rows / batch_sklearn,
+            "compiled": batch_rows / batch_compiled,
+        },
+    }
+
+
+if __name__ == "__main__":
+    import json
+
+    from adiwiyata import inference, model_store, pipeline
+    from adiwiyata.evaluation import build_model_frame
+
+    model = model_store.get_model()
+    df_model_clean = build_model_frame(pipeline.build_final())
+    X = inference.frame_features(df_model_clean)
+
+    diff = check_parity(model, X)
+    print(f"Paritas OK pada {len(X)} baris df_model_clean (selisih maks {diff:.2e})")
+    print(json.dumps(benchmark(model, X), indent=2))
@@ -0,0 +1,215 @@
+"""
+Mesin korelasi bersama (bagian Korelasi & Normalisasi Wilayah).
+
+Pearson dan Spearman dihitung dari perantara yang sama: setiap kolom
+di-ranking SEKALI, lalu Spearman = Pearson atas ranking. Matriks hasil
+di-cache per sidik jari isi data, jadi heatmap Spearman & Pearson (dan
+backend Vega-Lite) tidak mengulang ranking atau korelasi.
+
+Nilai yang hilang ditangani seperti pandas .corr(): pasangan kolom yang
+sama-sama lengkap memakai jalur cepat; pasangan dengan NaN dihitung ulang
+atas baris yang lengkap untuk pasangan itu saja (pairwise deletion).
+
+Interval kepercayaan bootstrap dihitung sebagai resample batch NumPy:
+semua replikasi dalam satu operasi array (B, n, p), dipotong per
+BOOT_CHUNK replikasi agar memori terbatas, dan bisa dibagi ke beberapa
+thread (sort & einsum NumPy melepas GIL). Hasilnya sama berapa pun jumlah
+worker karena tiap potongan punya seed turunannya sendiri.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import perf
+from adiwiyata.features import fingerprint
+
+METHODS = ("pearson", "spearman")
+
+# Replikasi bootstrap per potongan array
+BOOT_CHUNK = 200
+
+# Jumlah hasil yang disimpan di cache
+CACHE_SIZE = 8
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class Correlations(NamedTuple):
+    pearson: pd.DataFrame
+    spearman: pd.DataFrame
+
+    def get(self, method):
+        return getattr(self, method)
+
+
+# ==========================================
+# RANKING & PEARSON (NUMPY)
+# ==========================================
+def average_ranks(x):
+    """
+    Ranking rata-rata (ties dapat rata-rata peringkat, sama dengan
+    pandas rank(method='average')) di sepanjang axis 1 array (B, n, p).
+    """
+    b, n, p = x.shape
+    order = np.argsort(x, axis=1, kind="mergesort")
+    s = np.take_along_axis(x, order, axis=1)
+
+    pos = np.broadcast_to(np.arange(n)[None, :, None], (b, n, p))
+    new = np.ones((b, n, p), dtype=bool)
+    new[:, 1:] = s[:, 1:] != s[:, :-1]
+    start = np.maximum.accumulate(np.where(new, pos, 0), axis=1)
+    last = np.ones((b, n, p), dtype=bool)
+    last[:, :-1] = new[:, 1:]
+    end = np.minimum.accumulate(np.where(last, pos, n - 1)[:, ::-1], axis=1)[:, ::-1]
+
+    ranks = np.empty((b, n, p), dtype=np.float64)
+    np.put_along_axis(ranks, order, (start + end) / 2.0 + 1.0, axis=1)
+    return ranks
+
+
+def pearson_batch(x):
+    """Matriks Pearson per replikasi: (B, n, p) -> (B, p, p)"""
+    x = x - x.mean(axis=1, keepdims=True)
+    cov = np.einsum("bnp,bnq->bpq", x, x)
+    std = np.sqrt(np.einsum("bpp->bp", cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / (std[:, :, None] * std[:, None, :])
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _pairwise(values, method):
+    """Korelasi satu pasangan kolom atas baris yang lengkap (jalur NaN)"""
+    ok = np.isfinite(values).all(axis=1)
+    if ok.sum() < 2:
+        return np.nan
+    x = values[ok][None]
+    if method == "spearman":
+        x = average_ranks(x)
+    return pearson_batch(x)[0, 0, 1]
+
+
+@perf.timed("correlation.compute")
+def compute(df):
+    """Pearson & Spearman semua kolom df dari satu kali ranking"""
+    values = df.to_numpy(dtype=np.float64)
+    columns = df.columns
+    complete = np.isfinite(values).all(axis=0)
+
+    result = {}
+    x = values[None]
+    ranks = average_ranks(x)
+    for method, data in (("pearson", x), ("spearman", ranks)):
+        mat = pearson_batch(data)[0]
+        np.fill_diagonal(mat, 1.0)
+        # Pasangan yang menyentuh kolom dengan NaN: hitung ulang secara pairwise
+        for i in np.flatnonzero(~complete):
+            for j in range(len(columns)):
+                if j != i:
+                    mat[i, j] = mat[j, i] = _pairwise(values[:, [i, j]], method)
+        result[method] = pd.DataFrame(mat, index=columns, columns=columns)
+    return Correlations(**result)
+
+
+def correlations(df):
+    """compute() dengan cache per sidik jari isi df"""
+    key = fingerprint(df)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = compute(df)
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def matrix(df, method):
+    """Matriks korelasi satu metode (pengganti df.corr(method=...))"""
+    return correlations(df).get(method)
+
+
+# ==========================================
+# BOOTSTRAP CI
+# ==========================================
+def _boot_chunk(values, method, size, seed):
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(values), size=(size, len(values)))
+    x = values[idx]
+    if method == "spearman":
+        x = average_ranks(x)
+    return pearson_batch(x)
+
+
+def _replicate(values, method, sizes, seeds, workers):
+    """Semua potongan replikasi untuk satu array baris (n, p) -> (sum(sizes), p, p)"""
+    jobs = [(values, method, size, s) for size, s in zip(sizes, seeds)]
+    if workers > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(lambda job: _boot_chunk(*job), jobs))
+    else:
+        parts = [_boot_chunk(*job) for job in jobs]
+    return np.concatenate(parts)
+
+
+@perf.timed("correlation.bootstrap")
+def bootstrap(df, method, n_boot=1000, seed=0, workers=1):
+    """
+    Replikasi bootstrap matriks korelasi: array (n_boot, p, p).
+    NaN ditangani seperti compute(): pasangan kolom lengkap di-resample dari
+    semua baris, pasangan yang menyentuh kolom dengan NaN di-resample dari
+    baris yang lengkap untuk pasangan itu saja (CI sesuai dengan r-nya).
+    """
+    values = df.to_numpy(dtype=np.float64)
+    complete = np.isfinite(values).all(axis=0)
+    sizes = [min(BOOT_CHUNK, n_boot - start) for start in range(0, n_boot, BOOT_CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    reps = _replicate(values, method, sizes, seeds, workers)
+    for i in np.flatnonzero(~complete):
+        for j in range(values.shape[1]):
+            if j == i or (not complete[j] and j < i):
+                continue
+            pair = values[:, [i, j]]
+            pair = pair[np.isfinite(pair).all(axis=1)]
+            r = _replicate(pair, method, sizes, seeds, workers)[:, 0, 1] if len(pair) >= 2 else np.nan
+            reps[:, i, j] = reps[:, j, i] = r
+    return reps
+
+
+def confidence_intervals(df, method, n_boot=1000, level=0.95, seed=0, workers=1):
+    """
+    Tabel per pasangan kolom (segitiga atas): korelasi, batas bawah & atas
+    interval kepercayaan persentil bootstrap. Di-cache per data & parameter.
+    """
+    key = (fingerprint(df), "ci", method, n_boot, level, seed)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    point = matrix(df, method)
+    reps = bootstrap(df, method, n_boot=n_boot, seed=seed, workers=workers)
+    alpha = (1 - level) / 2
+    lo, hi = np.nanquantile(reps, [alpha, 1 - alpha], axis=0)
+
+    cols = list(df.columns)
+    i, j = np.triu_indices(len(cols), k=1)
+    result = pd.DataFrame({
+        "Variabel 1": [cols[a] for a in i],
+        "Variabel 2": [cols[b] for b in j],
+        "r": point.to_numpy()[i, j],
+        "CI Bawah": lo[i, j],
+        "CI Atas": hi[i, j],
+    })
+    with _cache_lock:
+        _cache[key] = result
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
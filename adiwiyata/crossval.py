@@ -0,0 +1,169 @@
+"""
+Evaluasi cross-validation k-fold tanpa leakage (menu Modelling).
+
+Evaluasi biasa menilai model pada seluruh data, termasuk baris yang dipakai
+saat training, jadi akurasinya optimistis. Di sini, untuk setiap fold:
+
+1. Ambang label KETIDAKSESUAIAN (median LOG_ADIWIYATA_PER_KM2, IKA, IKU)
+   dihitung dari fold TRAIN saja, lalu dipakai untuk melabeli train & test.
+2. Model baru dengan parameter yang sama dengan model aktif di-fit pada
+   fold train dan dinilai pada fold test.
+
+Fold dijalankan bersamaan di process pool. Prediksi & metrik tiap fold
+disimpan di disk per fold, dikunci dengan sidik jari data + parameter +
+pengaturan CV, sehingga fold yang sudah pernah dihitung tidak diulang.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+from sklearn.metrics import accuracy_score, confusion_matrix, f1_score
+from sklearn.model_selection import KFold
+
+from adiwiyata import evaluation, inference
+from adiwiyata.features import fingerprint
+from adiwiyata.ingest import BASE_DIR
+
+CV_CACHE_DIR = os.path.join(evaluation.EVAL_CACHE_DIR, "cv")
+N_SPLITS = 5
+SEED = 42
+
+# Naikkan kalau isi hasil fold berubah
+CV_FORMAT = 2
+
+# Parameter yang tidak memengaruhi hasil (tidak ikut kunci cache / diganti per fold)
+_RUNTIME_PARAMS = {"n_jobs", "verbose", "silent"}
+
+
+def model_params(model):
+    """Parameter model yang menentukan hasil training (dipakai ulang per fold)"""
+    return {k: v for k, v in sorted(model.get_params().items()) if k not in _RUNTIME_PARAMS}
+
+
+def _run_fold(fold, params, X_train, X_test, label_train, label_test):
+    """
+    Satu fold (dijalankan di proses terpisah). label_* = DataFrame kolom
+    evaluation.LABEL_COLUMNS untuk membangun label tanpa leakage.
+    """
+    thresholds = evaluation.label_thresholds(label_train)
+    y_train = evaluation.apply_labels(label_train.copy(), thresholds)["KETIDAKSESUAIAN"].to_numpy()
+    y_test = evaluation.apply_labels(label_test.copy(), thresholds)["KETIDAKSESUAIAN"].to_numpy()
+
+    model = LGBMClassifier(**params, n_jobs=1, verbose=-1)
+    model.fit(X_train, y_train)
+    proba = model.predict_proba(X_test)
+    y_pred = np.asarray(model.classes_)[np.argmax(proba, axis=1)]
+    return {
+        "fold": fold,
+        "thresholds": thresholds,
+        "y_true": y_test,
+        "y_pred": y_pred,
+        "proba": proba,
+        "accuracy": accuracy_score(y_test, y_pred),
+        "f1": f1_score(y_test, y_pred, zero_division=0),
+        "f1_macro": f1_score(y_test, y_pred, average="macro", zero_division=0),
+    }
+
+
+def cv_key(df_model, params, n_splits=N_SPLITS, seed=SEED):
+    return hashlib.sha1(repr((
+        CV_FORMAT,
+        fingerprint(df_model[inference.RAW_COLUMNS + evaluation.LABEL_COLUMNS]),
+        sorted(params.items()),
+        n_splits,
+        seed,
+    )).encode("utf-8")).hexdigest()
+
+
+def _fold_path(key, fold, cache_dir):
+    return os.path.join(cache_dir, f"{key}-fold{fold}.joblib")
+
+
+def _load_fold(key, fold, cache_dir):
+    try:
+        return joblib.load(_fold_path(key, fold, cache_dir))
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+def _save_fold(key, result, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _fold_path(key, result["fold"], cache_dir)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(result, tmp)
+    os.replace(tmp, path)
+
+
+def summarize(folds, index):
+    """Tabel per fold + ringkasan mean ± std + confusion matrix out-of-fold"""
+    per_fold = pd.DataFrame([
+        {"Fold": r["fold"] + 1, "n Test": len(r["y_true"]), "Accuracy": r["accuracy"],
+         "F1": r["f1"], "F1 (Macro)": r["f1_macro"]}
+        for r in folds
+    ])
+    metrics = per_fold[["Accuracy", "F1", "F1 (Macro)"]]
+    summary = pd.DataFrame({"Mean": metrics.mean(), "Std": metrics.std(ddof=1)})
+
+    y_true = np.concatenate([r["y_true"] for r in folds])
+    y_pred = np.concatenate([r["y_pred"] for r in folds])
+    oof = pd.DataFrame({"KETIDAKSESUAIAN": y_true, "PREDIKSI": y_pred},
+                       index=np.concatenate([index[r["test_idx"]] for r in folds]))
+    return {
+        "per_fold": per_fold,
+        "summary": summary,
+        "confusion": confusion_matrix(y_true, y_pred, labels=[0, 1]),
+        "oof": oof,
+    }
+
+
+def _prepare(model, df_final, base_dir, n_splits, seed):
+    df_model = evaluation.build_unlabeled_frame(df_final, base_dir)
+    params = model_params(model)
+    splits = list(KFold(n_splits, shuffle=True, random_state=seed).split(df_model))
+    return df_model, params, splits, cv_key(df_model, params, n_splits, seed)
+
+
+def cached(model, df_final, base_dir=BASE_DIR, n_splits=N_SPLITS, seed=SEED, cache_dir=CV_CACHE_DIR):
+    """Ringkasan CV kalau SEMUA fold sudah ada di cache, selain itu None"""
+    df_model, params, splits, key = _prepare(model, df_final, base_dir, n_splits, seed)
+    folds = [_load_fold(key, i, cache_dir) for i in range(len(splits))]
+    if any(f is None for f in folds):
+        return None
+    return summarize(folds, df_model.index.to_numpy())
+
+
+def cross_validate(model, df_final, base_dir=BASE_DIR, n_splits=N_SPLITS, seed=SEED,
+                   cache_dir=CV_CACHE_DIR, max_workers=None):
+    """
+    Jalankan k-fold CV (fold yang belum ada di cache dihitung paralel di
+    process pool), simpan tiap fold, lalu kembalikan summarize().
+    """
+    df_model, params, splits, key = _prepare(model, df_final, base_dir, n_splits, seed)
+    X = inference.frame_features(df_model)
+    labels = df_model[evaluation.LABEL_COLUMNS].reset_index(drop=True)
+
+    folds = {i: _load_fold(key, i, cache_dir) for i in range(len(splits))}
+    todo = [i for i, f in folds.items() if f is None]
+    if todo:
+        workers = max_workers or min(len(todo), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                i: pool.submit(
+                    _run_fold, i, params,
+                    X[splits[i][0]], X[splits[i][1]],
+                    labels.iloc[splits[i][0]], labels.iloc[splits[i][1]],
+                )
+                for i in todo
+            }
+            for i, fut in futures.items():
+                result = fut.result()
+                result["test_idx"] = splits[i][1]
+                _save_fold(key, result, cache_dir)
+                folds[i] = result
+
+    return summarize([folds[i] for i in range(len(splits))], df_model.index.to_numpy())
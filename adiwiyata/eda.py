@@ -0,0 +1,197 @@
+"""
+Bagian-bagian (section) halaman EDA beserta dependensi datanya.
+
+Setiap section mendeklarasikan data yang dibutuhkan (df_final, df_stat,
+df_norm) dan grafik yang digambarnya. Halaman EDA hanya menjalankan section
+yang sedang dibuka; section berat lainnya di-render di background (prefetch)
+setelah halaman selesai tampil, sehingga saat dibuka grafiknya sudah ada di
+cache (adiwiyata/figcache.py).
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple
+
+from adiwiyata import charts, figcache, sketch
+from adiwiyata.features import (BASE_COLUMNS, LOG_DENSITY_COLUMNS, density_frame,
+                                feature_frame, fingerprint)
+
+# Kolom numerik utama
+NUMERICAL_COLS = list(BASE_COLUMNS)
+
+CORR_COLS = [
+    "LOG_JUMLAH_SEKOLAH_ADIWIYATA",
+    "LOG_PERSEN_RTH",
+    "LOG_SAMPAH_HARIAN_TON",
+    "LOG_SAMPAH_TAHUNAN_TON"
+]
+
+NORM_COLS = list(LOG_DENSITY_COLUMNS)
+
+_sketch_cache = OrderedDict()
+_sketch_lock = threading.Lock()
+
+
+def column_sketches(df_final):
+    """
+    Sketch statistik kolom numerik (describe, batas IQR, top-k wilayah) dalam
+    satu lintasan, di-cache per sidik jari df_final (lihat adiwiyata/sketch.py)
+    """
+    key = fingerprint(df_final)
+    with _sketch_lock:
+        if key in _sketch_cache:
+            _sketch_cache.move_to_end(key)
+            return _sketch_cache[key]
+    result = sketch.sketch_frame(df_final, NUMERICAL_COLS, label="KABKOT_STD")
+    with _sketch_lock:
+        _sketch_cache[key] = result
+        while len(_sketch_cache) > 4:
+            _sketch_cache.popitem(last=False)
+    return result
+
+
+# Penyedia data: nama dependensi -> fungsi df_final -> data (semuanya di-cache)
+PROVIDERS = {
+    "df_final": lambda df_final: df_final,
+    "df_stat": feature_frame,
+    "df_norm": density_frame,
+    "sketch": column_sketches,
+}
+
+
+class Figure(NamedTuple):
+    """Satu grafik: nama cache, fungsi gambar, potongan data, parameter"""
+    name: str
+    draw: Callable
+    data: Any
+    params: dict
+
+    def render(self):
+        return figcache.render(self.name, self.draw, self.data, **self.params)
+
+    def warm(self):
+        return figcache.warm(self.name, self.draw, self.data, **self.params)
+
+    def spec(self):
+        """Spesifikasi Vega-Lite (browser) atau None kalau tidak ada builder-nya"""
+        from adiwiyata import vega  # altair hanya dimuat kalau backend ini dipakai
+        if not vega.supports(self.name):
+            return None
+        return vega.spec(self.name, self.data, **self.params)
+
+
+class Section(NamedTuple):
+    key: str
+    title: str
+    deps: tuple
+    heavy: bool
+    figures: Callable  # dict data -> {id: Figure}
+
+
+def _figures_statistik(data):
+    df = data["df_final"]
+    figs = {"distribution_grid": Figure("distribution_grid", charts.distribution_grid, df[NUMERICAL_COLS], {})}
+    for col in NUMERICAL_COLS:
+        figs[f"outlier_box:{col}"] = Figure("outlier_box", charts.outlier_box, df[col], {})
+    return figs
+
+
+def _figures_log(data):
+    df = data["df_stat"]
+    log_cols = [f"LOG_{c}" for c in NUMERICAL_COLS]
+    return {
+        "log_compare_grid": Figure(
+            "log_compare_grid", charts.log_compare_grid,
+            df[NUMERICAL_COLS + log_cols], {"columns": NUMERICAL_COLS}
+        ),
+        "log_box": Figure(
+            "log_box", charts.horizontal_box, df[log_cols],
+            {"title": "Distribusi Data Siap Pakai (Log Scale)", "grid": True}
+        ),
+    }
+
+
+def _figures_korelasi(data):
+    df = data["df_stat"][CORR_COLS]
+    return {
+        method: Figure(
+            "corr_heatmap", charts.corr_heatmap, df,
+            {"method": method, "title": f"Matriks Korelasi {method.title()}"}
+        )
+        for method in ["spearman", "pearson"]
+    }
+
+
+def _figures_normalisasi(data):
+    df = data["df_norm"][NORM_COLS]
+    figs = {
+        "density_hist": Figure("density_hist", charts.density_hist, df, {}),
+        "density_box": Figure(
+            "density_box", charts.horizontal_box, df,
+            {"title": "Boxplot Variabel Normalisasi (Log)", "figsize": (10, 4)}
+        ),
+    }
+    for method in ["spearman", "pearson"]:
+        figs[method] = Figure(
+            "corr_heatmap", charts.corr_heatmap, df,
+            {"method": method, "figsize": (6, 5), "bounded": False}
+        )
+    return figs
+
+
+def _figures_segmentasi(data):
+    df = data["df_norm"][["LOG_ADIWIYATA_PER_KM2", "LOG_SAMPAH_HARIAN_PER_KM2"]]
+    return {"segment_lmplot": Figure("segment_lmplot", charts.segment_lmplot, df, {"groups": 2})}
+
+
+SECTIONS = [
+    Section("statistik", "1. Statistik & Distribusi", ("df_final", "sketch"), False, _figures_statistik),
+    Section("log", "2. Log Transform", ("df_stat",), True, _figures_log),
+    Section("korelasi", "3. Korelasi", ("df_stat",), False, _figures_korelasi),
+    Section("normalisasi", "4. Normalisasi Wilayah", ("df_norm",), True, _figures_normalisasi),
+    Section("segmentasi", "5. Visualisasi Lanjutan", ("df_norm",), True, _figures_segmentasi),
+]
+
+SECTIONS_BY_KEY = {s.key: s for s in SECTIONS}
+
+
+def load_deps(section, df_final):
+    """Hitung (atau ambil dari cache) hanya data yang dibutuhkan section"""
+    return {dep: PROVIDERS[dep](df_final) for dep in section.deps}
+
+
+# ==========================================
+# PREFETCH BACKGROUND
+# ==========================================
+_prefetch_lock = threading.Lock()
+_prefetched = set()
+
+
+def prefetch(df_final, skip=(), heavy_only=True):
+    """
+    Render grafik section lain di background thread (sekali per dataset).
+    Dipanggil setelah section yang dibuka selesai tampil (halaman idle).
+    """
+    key = fingerprint(df_final)
+    targets = [
+        s for s in SECTIONS
+        if s.key not in skip and (s.heavy or not heavy_only) and (key, s.key) not in _prefetched
+    ]
+    with _prefetch_lock:
+        targets = [s for s in targets if (key, s.key) not in _prefetched]
+        _prefetched.update((key, s.key) for s in targets)
+    if not targets:
+        return None
+
+    def _run():
+        for section in targets:
+            try:
+                for fig in section.figures(load_deps(section, df_final)).values():
+                    fig.warm()
+            except Exception:
+                # Gagal di background: section akan menggambar sendiri saat dibuka
+                with _prefetch_lock:
+                    _prefetched.discard((key, section.key))
+
+    thread = threading.Thread(target=_run, name="eda-prefetch", daemon=True)
+    thread.start()
+    return thread
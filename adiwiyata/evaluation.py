@@ -0,0 +1,217 @@
+"""
+Data evaluasi model: df_final + Provinsi + IKA/IKU + label KETIDAKSESUAIAN.
+
+Data referensi (kab/kota -> provinsi -> IKA/IKU) dibangun sekali per versi
+file sumbernya lalu dipakai sebagai lookup di memori. Hasil evaluasi model
+disimpan di disk (EVAL_CACHE_DIR), dikunci dengan hash file model + sidik
+jari data, sehingga tab evaluasi langsung terbuka untuk semua pengguna
+sampai model atau datanya benar-benar berubah.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+from sklearn.metrics import accuracy_score, classification_report
+
+from adiwiyata import features, inference
+from adiwiyata.ingest import BASE_DIR, file_fingerprint, load_sources, read_table
+from adiwiyata.regions import alias_version, normalize_kabkot_sekolah
+
+EVAL_CACHE_DIR = os.path.join(".cache", "evaluation")
+
+# Naikkan kalau isi hasil evaluasi berubah (hasil lama di disk otomatis diabaikan)
+EVAL_FORMAT = 2
+
+# Jumlah hasil evaluasi yang disimpan di memori (yang lama tetap ada di disk)
+CACHE_SIZE = 8
+
+_reference = {}
+_reference_lock = threading.Lock()
+_results = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def _reference_paths(base_dir):
+    return {
+        "RTH": os.path.join(base_dir, "Data_RTH.xlsx"),
+        "IKA": os.path.join(base_dir, "Indeks_Kualitas_Air.csv"),
+        "IKU": os.path.join(base_dir, "indeks_kualitas_udara.csv"),
+    }
+
+
+def reference_key(base_dir=BASE_DIR):
+    """Kunci versi data referensi: sidik jari ketiga file + versi tabel alias"""
+    paths = _reference_paths(base_dir)
+    return hashlib.sha1(repr((
+        sorted((label, file_fingerprint(path)) for label, path in paths.items()),
+        alias_version(),
+    )).encode("utf-8")).hexdigest()
+
+
+def _build_reference(base_dir):
+    paths = _reference_paths(base_dir)
+
+    # Load Mapping Provinsi
+    df_rth_raw = read_table(paths["RTH"])
+    col_kab = [c for c in df_rth_raw.columns if 'Kabupaten' in c][0]
+    df_rth_raw.rename(columns={col_kab: 'Kabupaten/Kota'}, inplace=True)
+    df_rth_raw["KABKOT_STD"] = normalize_kabkot_sekolah(df_rth_raw["Kabupaten/Kota"])
+    col_prov = [c for c in df_rth_raw.columns if 'Provinsi' in c or 'PROVINSI' in c][0]
+    df_ref = df_rth_raw.drop_duplicates("KABKOT_STD")[["KABKOT_STD", col_prov]].rename(columns={col_prov: "PROVINSI"})
+    df_ref["PROVINSI"] = df_ref["PROVINSI"].astype(str).str.upper().str.strip()
+
+    # Load & Merge IKA/IKU
+    refs = load_sources({"IKA": paths["IKA"], "IKU": paths["IKU"]})
+    df_ika = refs["IKA"].rename(columns={"Provinsi": "PROVINSI", "Indeks Kualitas Air": "IKA"})
+    df_iku = refs["IKU"].rename(columns={"Provinsi": "PROVINSI", "Indeks Kualitas Udara": "IKU"})
+    for df in [df_ika, df_iku]:
+        if "PROVINSI" in df.columns: df["PROVINSI"] = df["PROVINSI"].astype(str).str.upper().str.strip()
+
+    # Provinsi yang muncul lebih dari sekali di IKA/IKU tetap menggandakan baris,
+    # persis seperti merge per provinsi sebelumnya
+    return (
+        df_ref
+        .merge(df_ika[["PROVINSI", "IKA"]], on="PROVINSI", how="left")
+        .merge(df_iku[["PROVINSI", "IKU"]], on="PROVINSI", how="left")
+        .reset_index(drop=True)
+    )
+
+
+def reference_index(base_dir=BASE_DIR):
+    """
+    Lookup KABKOT_STD -> PROVINSI, IKA, IKU (DataFrame), dibangun sekali per
+    versi file referensi. Dipakai bersama: jangan dimutasi.
+    """
+    key = reference_key(base_dir)
+    with _reference_lock:
+        if key not in _reference:
+            _reference.clear()
+            _reference[key] = _build_reference(base_dir)
+        return _reference[key]
+
+
+# Kolom yang menentukan label KETIDAKSESUAIAN (ambang = median masing-masing)
+LABEL_COLUMNS = ["LOG_ADIWIYATA_PER_KM2", "IKA", "IKU"]
+
+
+def build_unlabeled_frame(df_final, base_dir=BASE_DIR):
+    """Fitur + Provinsi + IKA/IKU, baris tidak lengkap dibuang (belum berlabel)"""
+    # Feature Engineering (cache bersama, lihat adiwiyata/features.py)
+    df_model = features.density_frame(df_final)
+
+    # Provinsi + IKA/IKU dari lookup referensi (tanpa membaca ulang file)
+    df_model = df_model.merge(reference_index(base_dir), on="KABKOT_STD", how="left")
+
+    return df_model.dropna(subset=["IKA", "IKU", "LOG_ADIWIYATA_PER_KM2"]).copy()
+
+
+def label_thresholds(df):
+    """Median LOG_ADIWIYATA_PER_KM2, IKA, IKU (ambang label) dari df"""
+    return {col: df[col].median() for col in LABEL_COLUMNS}
+
+
+def apply_labels(df, thresholds):
+    """Tambahkan ADIWIYATA_TINGGI, LINGKUNGAN_RENDAH, KETIDAKSESUAIAN (in-place) memakai ambang tertentu"""
+    df["ADIWIYATA_TINGGI"] = df["LOG_ADIWIYATA_PER_KM2"] >= thresholds["LOG_ADIWIYATA_PER_KM2"]
+    df["LINGKUNGAN_RENDAH"] = (df["IKA"] < thresholds["IKA"]) | (df["IKU"] < thresholds["IKU"])
+    df["KETIDAKSESUAIAN"] = (df["ADIWIYATA_TINGGI"] & df["LINGKUNGAN_RENDAH"]).astype(int)
+    return df
+
+
+def build_model_frame(df_final, base_dir=BASE_DIR):
+    """
+    DATA PREP LENGKAP (Merge IKA/IKU) -> df_model_clean berlabel.
+    Kita perlu menyatukan data lagi untuk mendapatkan Label Asli (y_actual).
+    """
+    df_model_clean = build_unlabeled_frame(df_final, base_dir)
+
+    # Labeling (Ground Truth): ambang median dari seluruh data
+    return apply_labels(df_model_clean, label_thresholds(df_model_clean))
+
+
+# ==========================================
+# HASIL EVALUASI PERSISTEN
+# ==========================================
+def results_key(model_path, df_final, base_dir=BASE_DIR):
+    """Hash file model + sidik jari df_final + versi data referensi"""
+    return hashlib.sha1(repr((
+        EVAL_FORMAT,
+        file_fingerprint(model_path)[2],
+        features.fingerprint(df_final),
+        reference_key(base_dir),
+    )).encode("utf-8")).hexdigest()
+
+
+def _results_path(key, cache_dir):
+    return os.path.join(cache_dir, f"{key}.joblib")
+
+
+def cached_results(model_path, df_final, base_dir=BASE_DIR, cache_dir=EVAL_CACHE_DIR):
+    """Hasil evaluasi tersimpan (memori -> disk), None kalau belum pernah dihitung"""
+    key = results_key(model_path, df_final, base_dir)
+    with _results_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key]
+    path = _results_path(key, cache_dir)
+    try:
+        res = joblib.load(path)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # File rusak / terpotong / dari versi library lain (UnpicklingError,
+        # AttributeError, ...): buang lalu hitung ulang seperti belum ada
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    _remember(key, res)
+    return res
+
+
+def _remember(key, res):
+    with _results_lock:
+        _results[key] = res
+        _results.move_to_end(key)
+        while len(_results) > CACHE_SIZE:
+            _results.popitem(last=False)
+
+
+def evaluate(model, model_path, df_final, base_dir=BASE_DIR, cache_dir=EVAL_CACHE_DIR):
+    """Hitung hasil evaluasi model pada seluruh data berlabel lalu simpan ke disk"""
+    key = results_key(model_path, df_final, base_dir)
+    df_model_clean = build_model_frame(df_final, base_dir)
+
+    # --- PREDIKSI MASSIF ---
+    y_actual = df_model_clean["KETIDAKSESUAIAN"]
+    y_pred = inference.predict_frame(model, df_model_clean).pred_class
+    res = {
+        "accuracy": accuracy_score(y_actual, y_pred),
+        "report": classification_report(y_actual, y_pred, target_names=["Selaras", "Tdk Selaras"], output_dict=True),
+        "feature_importances": model.feature_importances_,
+        "feature_names": inference.FEATURES,
+        "y_actual": y_actual,
+        "y_pred": y_pred
+    }
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _results_path(key, cache_dir)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump(res, tmp)
+    os.replace(tmp, path)
+    _remember(key, res)
+    return res
+
+
+def forget_results(model_path, df_final, base_dir=BASE_DIR, cache_dir=EVAL_CACHE_DIR):
+    """Hapus hasil tersimpan (tombol Refresh Evaluasi)"""
+    key = results_key(model_path, df_final, base_dir)
+    with _results_lock:
+        _results.pop(key, None)
+    try:
+        os.remove(_results_path(key, cache_dir))
+    except OSError:
+        pass
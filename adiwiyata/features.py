@@ -0,0 +1,119 @@
+"""
+Feature engineering bersama (EDA, evaluasi model, Try-it-out).
+
+Semua kolom turunan dihitung dalam SATU lintasan NumPy atas matriks kolom
+dasar: LOG_<kolom> (tab Log Transform / Korelasi), <X>_PER_KM2 dan
+LOG_<X>_PER_KM2 (tab Normalisasi, evaluasi, model). Hasilnya disimpan
+sebagai float32 dan di-cache per sidik jari isi df_final, sehingga fitur
+hanya dihitung sekali per dataset, bukan sekali per tab per rerun.
+
+Frame hasil cache dipakai bersama: jangan dimutasi, lakukan .copy() dulu.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import perf
+
+# Kolom numerik dasar df_final
+BASE_COLUMNS = [
+    "JUMLAH_SEKOLAH_ADIWIYATA",
+    "PERSEN_RTH",
+    "LUAS_WILAYAH",
+    "SAMPAH_HARIAN_TON",
+    "SAMPAH_TAHUNAN_TON"
+]
+
+# Kolom densitas: nama -> kolom dasar yang dibagi luas wilayah
+DENSITY_COLUMNS = {
+    "ADIWIYATA_PER_KM2": "JUMLAH_SEKOLAH_ADIWIYATA",
+    "SAMPAH_HARIAN_PER_KM2": "SAMPAH_HARIAN_TON",
+    "SAMPAH_TAHUNAN_PER_KM2": "SAMPAH_TAHUNAN_TON",
+}
+
+LOG_COLUMNS = [f"LOG_{c}" for c in BASE_COLUMNS]
+LOG_DENSITY_COLUMNS = [f"LOG_{c}" for c in DENSITY_COLUMNS]
+DERIVED_COLUMNS = [*LOG_COLUMNS, *DENSITY_COLUMNS, *LOG_DENSITY_COLUMNS]
+
+_LUAS = BASE_COLUMNS.index("LUAS_WILAYAH")
+_DENSITY_SOURCE = [BASE_COLUMNS.index(c) for c in DENSITY_COLUMNS.values()]
+
+# Jumlah dataset yang disimpan di cache (versi lama dibuang duluan)
+CACHE_SIZE = 4
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hit": 0, "miss": 0}
+
+
+def derive(base, dtype=np.float32):
+    """
+    Matriks dasar (n, 5) berurutan BASE_COLUMNS -> matriks turunan (n, 11)
+    berurutan DERIVED_COLUMNS. Luas <= 0 menghasilkan inf/NaN (disaring
+    oleh pemakai, lihat density_frame).
+    """
+    base = np.asarray(base, dtype=np.float64)
+    out = np.empty((base.shape[0], len(DERIVED_COLUMNS)), dtype=dtype)
+    n_log, n_dens = len(LOG_COLUMNS), len(DENSITY_COLUMNS)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        density = base[:, _DENSITY_SOURCE] / base[:, [_LUAS]]
+        out[:, :n_log] = np.log1p(base)
+        out[:, n_log:n_log + n_dens] = density
+        out[:, n_log + n_dens:] = np.log1p(density)
+    return out
+
+
+def fingerprint(df):
+    """Sidik jari isi DataFrame (nilai + nama kolom + index)"""
+    h = hashlib.sha1()
+    h.update(repr(list(df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+@perf.timed("features.build")
+def _build(df_final):
+    derived = pd.DataFrame(
+        derive(df_final[BASE_COLUMNS].to_numpy(dtype=np.float64)),
+        index=df_final.index,
+        columns=DERIVED_COLUMNS,
+    )
+    frame = pd.concat([df_final, derived], axis=1)
+    return {"frame": frame, "density": frame[frame["LUAS_WILAYAH"] > 0]}
+
+
+def _get(df_final):
+    key = fingerprint(df_final)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hit"] += 1
+            return _cache[key]
+        _stats["miss"] += 1
+
+    entry = _build(df_final)
+    with _cache_lock:
+        _cache[key] = entry
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+
+def feature_frame(df_final):
+    """df_final + semua kolom turunan (semua baris)"""
+    return _get(df_final)["frame"]
+
+
+def density_frame(df_final):
+    """feature_frame yang hanya berisi wilayah dengan LUAS_WILAYAH > 0"""
+    return _get(df_final)["density"]
+
+
+def cache_stats():
+    """Statistik hit/miss cache fitur (untuk debugging)"""
+    with _cache_lock:
+        return {**_stats, "entries": len(_cache)}
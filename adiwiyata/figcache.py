@@ -0,0 +1,193 @@
+"""
+Cache grafik ter-render (PNG/SVG bytes) untuk halaman EDA.
+
+Streamlit menjalankan ulang isi semua tab di setiap interaksi. Dengan cache
+ini, grafik yang data dan parameternya tidak berubah langsung dikirim
+sebagai bytes, tanpa digambar ulang oleh matplotlib. Kunci cache = hash
+(nama grafik, kode fungsi gambar, isi potongan data, parameter, format),
+jadi mengubah data ATAU kode grafik otomatis menghasilkan kunci baru.
+
+Selain PNG/SVG, cache yang sama menyimpan spesifikasi Vega-Lite (JSON)
+dari backend Altair (adiwiyata/vega.py) dengan fmt="vega-lite".
+
+Ukuran cache dibatasi total bytes (LRU: yang paling lama tidak dipakai
+dibuang duluan). Statistik hit/miss tersedia lewat stats().
+"""
+import contextlib
+import hashlib
+import inspect
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from adiwiyata import perf
+
+# Batas total ukuran cache (bytes)
+MAX_BYTES = 64 * 1024 * 1024
+
+# Opsi savefig, sama dengan st.pyplot (tampilan tetap tajam di layar HiDPI)
+SAVE_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+
+def _hash_data(h, data):
+    if isinstance(data, pd.DataFrame):
+        h.update(repr(list(data.columns)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, pd.Series):
+        h.update(repr(data.name).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        h.update(repr((data.shape, data.dtype.str)).encode("utf-8"))
+        h.update(np.ascontiguousarray(data).tobytes())
+    else:
+        h.update(repr(data).encode("utf-8"))
+
+
+_code_hashes = {}
+
+
+def _code_hash(fn):
+    if fn not in _code_hashes:
+        try:
+            source = inspect.getsource(fn)
+        except (OSError, TypeError):
+            source = fn.__code__.co_code.hex()
+        _code_hashes[fn] = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    return _code_hashes[fn]
+
+
+def figure_key(name, draw, data, params, fmt="png"):
+    """Kunci konten: nama + kode fungsi gambar + isi data + parameter + format"""
+    h = hashlib.sha1()
+    h.update(repr((name, _code_hash(draw), fmt, sorted(params.items()))).encode("utf-8"))
+    _hash_data(h, data)
+    return h.hexdigest()
+
+
+# pyplot tidak thread-safe: render (foreground / prefetch) dijalankan bergantian
+_draw_lock = threading.Lock()
+
+
+# Format non-matplotlib: chart Altair diserialisasi jadi spesifikasi JSON
+SPEC_FORMATS = {"vega-lite"}
+
+
+def figure_bytes(fig, fmt="png"):
+    """Render Figure ke bytes lalu tutup figurnya"""
+    if fmt in SPEC_FORMATS:
+        return fig.to_json(indent=None).encode("utf-8")
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format=fmt, **SAVE_OPTIONS)
+    finally:
+        plt.close(fig)
+    return buf.getvalue()
+
+
+class FigureCache:
+    """LRU bytes grafik dengan batas total ukuran"""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if len(data) > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self.size -= len(dropped)
+                self.evictions += 1
+
+    def render(self, name, draw, data, fmt="png", **params):
+        """
+        Bytes grafik `draw(data, **params)`. Kalau kuncinya sudah ada di cache,
+        matplotlib tidak dipanggil sama sekali.
+        """
+        key = figure_key(name, draw, data, params, fmt)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        return self._draw(key, draw, data, params, fmt)
+
+    def _draw(self, key, draw, data, params, fmt):
+        # Spesifikasi Vega-Lite tidak menyentuh pyplot, tidak perlu antre
+        with (contextlib.nullcontext() if fmt in SPEC_FORMATS else _draw_lock):
+            # Bisa jadi sudah digambar thread lain selama menunggu lock
+            with self._lock:
+                data_bytes = self._entries.get(key)
+            if data_bytes is None:
+                with perf.span(f"chart.{getattr(draw, '__name__', 'draw')}"):
+                    data_bytes = figure_bytes(draw(data, **params), fmt)
+                self.put(key, data_bytes)
+        return data_bytes
+
+    def warm(self, name, draw, data, fmt="png", **params):
+        """Seperti render, tapi tidak dihitung sebagai hit/miss (untuk prefetch)"""
+        key = figure_key(name, draw, data, params, fmt)
+        with self._lock:
+            if key in self._entries:
+                return False
+        self._draw(key, draw, data, params, fmt)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Cache bersama satu proses (semua sesi Streamlit)
+_default = FigureCache()
+
+
+def render(name, draw, data, fmt="png", **params):
+    """Render lewat cache bersama proses"""
+    return _default.render(name, draw, data, fmt=fmt, **params)
+
+
+def warm(name, draw, data, fmt="png", **params):
+    """Prefetch ke cache bersama proses"""
+    return _default.warm(name, draw, data, fmt=fmt, **params)
+
+
+def stats():
+    return _default.stats()
@@ -0,0 +1,177 @@
+"""
+Recompute inkremental cabang RTH/Sampah saat data tahun baru masuk.
+
+Data RTH & Sampah datang per tahun (file di-append). Alih-alih sort ulang
+seluruh tabel lalu membangun ulang df_final, state "tahun terbaru per
+wilayah" disimpan. Saat file berubah, tiap baris di-hash (hanya kolom yang
+dipakai), baris baru / baris yang hilang dicari lewat perbandingan hash,
+lalu hanya wilayah yang tersentuh baris-baris itu yang dihitung ulang. Di
+df_final pun hanya baris wilayah tersebut yang diperbarui.
+
+Kalau daftar nama wilayah berubah (ada wilayah baru / hilang) resolusi kunci
+sekolah bisa ikut berubah, jadi df_final dibangun ulang penuh.
+"""
+import numpy as np
+import pandas as pd
+
+
+def latest_rows(df_clean, columns=()):
+    """Ambil data tahun terbaru per KABKOT_STD"""
+    columns = ["KABKOT_STD", *columns]
+    if "Tahun" in df_clean.columns:
+        return (
+            df_clean
+            .sort_values(["KABKOT_STD", "Tahun"], ascending=[True, False])
+            .drop_duplicates("KABKOT_STD")
+            [columns]
+        )
+    # Fallback jika tidak ada kolom tahun (ambil unique pertama)
+    return df_clean.drop_duplicates("KABKOT_STD")[columns]
+
+
+class LatestState:
+    """State tahun terbaru per wilayah untuk satu sumber (RTH atau Sampah)"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.latest = None                      # index = KABKOT_STD
+        self._hashes = np.empty(0, np.uint64)   # hash tiap baris, terurut
+        self._regions = np.empty(0, object)     # wilayah tiap hash
+
+    def _row_hashes(self, df_clean):
+        used = [c for c in ["KABKOT_STD", "Tahun", *self.columns] if c in df_clean.columns]
+        return pd.util.hash_pandas_object(df_clean[used], index=False).to_numpy()
+
+    def _store_hashes(self, hashes, regions):
+        order = np.argsort(hashes, kind="stable")
+        self._hashes, self._regions = hashes[order], regions[order]
+
+    def build(self, df_clean):
+        """Bangun state dari seluruh baris (mode penuh)"""
+        self.latest = latest_rows(df_clean, self.columns).set_index("KABKOT_STD")
+        self._store_hashes(self._row_hashes(df_clean), df_clean["KABKOT_STD"].to_numpy(dtype=object))
+        return self
+
+    def update(self, df_clean):
+        """
+        Perbarui state dari versi baru tabel bersih.
+        Hasil: (wilayah yang berubah, jumlah baris baru/hilang yang diproses).
+        """
+        hashes = self._row_hashes(df_clean)
+        regions = df_clean["KABKOT_STD"].to_numpy(dtype=object)
+
+        added = ~np.isin(hashes, self._hashes)
+        removed = ~np.isin(self._hashes, hashes)
+        touched = pd.unique(np.concatenate([regions[added], self._regions[removed]]))
+        n_rows = int(added.sum() + removed.sum())
+        self._store_hashes(hashes, regions)
+        if not len(touched):
+            return [], n_rows
+
+        # Hitung ulang hanya wilayah yang tersentuh (baris lama + baris baru-nya)
+        subset = df_clean[df_clean["KABKOT_STD"].isin(touched)]
+        fresh = latest_rows(subset, self.columns).set_index("KABKOT_STD")
+        old = self.latest.reindex(touched)
+        latest = self.latest.drop(index=[r for r in touched if r in self.latest.index])
+        self.latest = pd.concat([latest, fresh]).sort_index()
+
+        # Wilayah yang nilai kolomnya benar-benar berubah (yang dipakai df_final)
+        changed = [
+            r for r in touched
+            if r not in fresh.index or not fresh.loc[r, self.columns].equals(old.loc[r, self.columns])
+        ]
+        return changed, n_rows
+
+    def names(self):
+        return set(self.latest.index)
+
+
+class IncrementalFinal:
+    """
+    df_final yang diperbarui inkremental. `keys` = kunci memo tahap input
+    (sekolah per wilayah, RTH bersih, Sampah bersih) yang dipakai terakhir.
+    `join_keys` = nama wilayah RTH & Sampah per baris df_final (hasil resolve
+    per tabel, bisa berbeda dari KABKOT_STD).
+    """
+
+    def __init__(self, rth_columns, sampah_columns):
+        self.rth = LatestState(rth_columns)
+        self.sampah = LatestState(sampah_columns)
+        self.keys = None
+        self.join_keys = None
+        self.df_final = None
+        self.last_update = {}
+
+    def current(self, keys):
+        """df_final kalau masih sesuai dengan kunci input, selain itu None"""
+        return self.df_final if keys == self.keys else None
+
+    def rebuild(self, df_final, join_keys, sekolah_node, rth_node, sampah_node):
+        """Inisialisasi ulang dari hasil pipeline penuh (join_keys = [kunci RTH, kunci Sampah])"""
+        self.rth.build(rth_node.value)
+        self.sampah.build(sampah_node.value)
+        self.keys = (sekolah_node.key, rth_node.key, sampah_node.key)
+        self.join_keys = list(join_keys)
+        self.df_final = df_final
+        self.last_update = {
+            "mode": "full",
+            "rows_processed": len(rth_node.value) + len(sampah_node.value),
+            "regions": [],
+            "rows_updated": len(df_final),
+        }
+        return df_final
+
+    def update(self, sekolah_node, rth_node, sampah_node):
+        """
+        Terapkan perubahan RTH/Sampah ke df_final. Mengembalikan df_final baru,
+        atau None kalau perlu pipeline penuh (belum ada state, data sekolah
+        berubah, atau daftar nama wilayah berubah).
+        """
+        keys = (sekolah_node.key, rth_node.key, sampah_node.key)
+        if self.df_final is None or sekolah_node.key != self.keys[0]:
+            return None
+        if keys == self.keys:
+            self.last_update = {"mode": "unchanged", "rows_processed": 0, "regions": [], "rows_updated": 0}
+            return self.df_final
+
+        names_before = (self.rth.names(), self.sampah.names())
+        changes, n_rows = [], 0
+        sources = [(self.rth, rth_node, self.keys[1], self.join_keys[0]),
+                   (self.sampah, sampah_node, self.keys[2], self.join_keys[1])]
+        for state, node, old_key, join in sources:
+            if node.key != old_key:
+                changed, n = state.update(node.value)
+                changes.append((state, join, changed))
+                n_rows += n
+        if (self.rth.names(), self.sampah.names()) != names_before:
+            return None
+
+        # Hasil lama dipakai bersama: salin dulu, lalu ubah baris yang terdampak saja
+        df_final = self.df_final.copy()
+        updated = set()
+        for state, join, changed in changes:
+            rows = np.flatnonzero(pd.Index(join).isin(changed))
+            if len(rows):
+                values = state.latest.reindex(join[rows])[state.columns]
+                for col in state.columns:
+                    df_final.iloc[rows, df_final.columns.get_loc(col)] = values[col].to_numpy()
+                updated.update(rows.tolist())
+
+        self.keys = keys
+        self.df_final = df_final
+        self.last_update = {
+            "mode": "incremental",
+            "rows_processed": n_rows,
+            "regions": sorted({r for _, _, changed in changes for r in changed}),
+            "rows_updated": len(updated),
+        }
+        return df_final
+
+
+def frames_equal(a, b):
+    """Bandingkan dua df_final (nilai, kolom, urutan baris; index diabaikan)"""
+    try:
+        pd.testing.assert_frame_equal(a.reset_index(drop=True), b.reset_index(drop=True))
+        return True
+    except AssertionError:
+        return False
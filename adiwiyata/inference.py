@@ -0,0 +1,145 @@
+"""
+Inference model klasifikasi efektivitas (satu jalur untuk semua pemakai).
+
+Input mentah (luas, jumlah sekolah, sampah harian, sampah tahunan, % RTH)
+diubah menjadi fitur LOG_*_PER_KM2 dengan NumPy, lalu booster LightGBM
+dipanggil SEKALI. Kelas, confidence dan probabilitas semuanya diturunkan
+dari probabilitas hasil satu kali jalan pohon tersebut (tanpa DataFrame).
+"""
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from adiwiyata import features, perf
+from adiwiyata.compiled import compile_model
+
+# Urutan fitur saat training (Urutan kolom PENTING)
+FEATURES = [
+    "LOG_ADIWIYATA_PER_KM2",
+    "LOG_SAMPAH_HARIAN_PER_KM2",
+    "LOG_SAMPAH_TAHUNAN_PER_KM2",
+    "PERSEN_RTH",
+    "LUAS_WILAYAH"
+]
+
+# Urutan input mentah untuk array NumPy
+RAW_INPUTS = ["luas", "sekolah", "sampah_harian", "sampah_tahunan", "rth"]
+
+# Kolom df_final yang sesuai dengan RAW_INPUTS
+RAW_COLUMNS = [
+    "LUAS_WILAYAH",
+    "JUMLAH_SEKOLAH_ADIWIYATA",
+    "SAMPAH_HARIAN_TON",
+    "SAMPAH_TAHUNAN_TON",
+    "PERSEN_RTH"
+]
+
+LABELS = ["Selaras", "Tdk Selaras"]
+
+# Posisi kolom dasar (features.BASE_COLUMNS) di dalam RAW_COLUMNS
+_BASE_ORDER = [RAW_COLUMNS.index(c) for c in features.BASE_COLUMNS]
+_LOG_DENSITY = [features.DERIVED_COLUMNS.index(c) for c in features.LOG_DENSITY_COLUMNS]
+
+
+class Prediction(NamedTuple):
+    """Hasil prediksi: skalar untuk satu record, array untuk input batch"""
+    pred_class: Any
+    confidence: Any
+    proba: np.ndarray
+
+
+def build_features(raw):
+    """
+    PREPROCESSING (Harus sama persis dengan Training)
+    `raw` array (n, 5) berurutan sesuai RAW_INPUTS -> matriks fitur (n, 5) sesuai FEATURES.
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    derived = features.derive(raw[:, _BASE_ORDER], dtype=np.float64)
+
+    X = np.empty((raw.shape[0], len(FEATURES)), dtype=np.float64)
+    X[:, :3] = derived[:, _LOG_DENSITY]
+    X[:, 3] = raw[:, RAW_COLUMNS.index("PERSEN_RTH")]
+    X[:, 4] = raw[:, RAW_COLUMNS.index("LUAS_WILAYAH")]
+    return X
+
+
+def frame_features(df):
+    """
+    Matriks fitur (n, 5) dari kolom RAW_COLUMNS sebuah frame (mis. df_final,
+    df_model). Kolom turunan di cache fitur disimpan float32; model selalu
+    dinilai dari fitur float64 ini, sama dengan Try-it-out & serve.
+    """
+    return build_features(df[RAW_COLUMNS].to_numpy(dtype=np.float64))
+
+
+def _as_raw(record):
+    if isinstance(record, dict):
+        return np.array([[record[k] for k in RAW_INPUTS]], dtype=np.float64), True
+    raw = np.asarray(record, dtype=np.float64)
+    if raw.ndim == 1:
+        return raw.reshape(1, -1), True
+    return raw, False
+
+
+# Nama bawaan LightGBM kalau di-fit dari array tanpa nama (urutan = FEATURES)
+_POSITIONAL = [f"Column_{i}" for i in range(len(FEATURES))]
+
+
+def _feature_order(booster):
+    names = booster.feature_name()
+    if names == FEATURES or names == _POSITIONAL:
+        return None
+    missing = [name for name in names if name not in FEATURES]
+    if missing:
+        raise ValueError(f"Fitur model tidak dikenal: {missing} (harus {FEATURES})")
+    return [FEATURES.index(name) for name in names]
+
+
+@perf.timed("inference.predict")
+def predict_features(model, X, compiled=False):
+    """
+    Satu kali jalan booster untuk matriks fitur X (n, 5) -> proba (n, n_kelas).
+    compiled=True memakai evaluator NumPy (adiwiyata/compiled.py).
+    """
+    booster = model.booster_
+    order = _feature_order(booster)
+    if order is not None:
+        X = X[:, order]
+
+    if compiled:
+        return compile_model(model).predict_proba(X)
+    raw_proba = booster.predict(X)
+    if raw_proba.ndim == 1:
+        # Binary: booster hanya mengembalikan P(kelas 1)
+        return np.column_stack([1.0 - raw_proba, raw_proba])
+    return raw_proba
+
+
+def predict(model, record, compiled=False):
+    """
+    Prediksi kelas + confidence + probabilitas dari input mentah.
+
+    `record` bisa berupa dict {luas, sekolah, sampah_harian, sampah_tahunan, rth},
+    sequence 5 angka (satu wilayah), atau array NumPy (n, 5) berurutan RAW_INPUTS.
+    """
+    raw, single = _as_raw(record)
+    proba = predict_features(model, build_features(raw), compiled=compiled)
+    return _to_prediction(model, proba, single)
+
+
+def predict_frame(model, df, compiled=False):
+    """
+    Prediksi batch dari frame yang berisi kolom RAW_COLUMNS (mis. hasil
+    evaluation.build_model_frame), fitur dihitung lewat frame_features.
+    """
+    return _to_prediction(model, predict_features(model, frame_features(df), compiled=compiled), False)
+
+
+def _to_prediction(model, proba, single):
+    idx = np.argmax(proba, axis=1)
+    classes = np.asarray(model.classes_)[idx]
+    confidence = proba[np.arange(len(idx)), idx]
+
+    if single:
+        return Prediction(classes[0].item(), float(confidence[0]), proba[0])
+    return Prediction(classes, confidence, proba)
@@ -0,0 +1,253 @@
+"""
+Ingest data mentah Dataset_DS dengan cache kolumnar (Parquet).
+
+Parsing Excel lewat openpyxl adalah bagian paling lambat dari satu run.
+Setiap file sumber dibaca sekali, lalu disimpan sebagai salinan Parquet
+bertipe di CACHE_DIR. Salinan ini dikunci dengan ukuran file, mtime dan
+hash isi (sha256), jadi hanya dibangun ulang kalau file sumbernya berubah.
+"""
+import csv
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import perf
+
+# ==========================================
+# KONFIGURASI PATH FILE
+# ==========================================
+BASE_DIR = "Dataset_DS"
+FILES = {
+    "Sekolah": "sekolah adiwiyata - sekolah adiwiyata.csv",
+    "RTH": "Data_RTH.xlsx",
+    "Sampah": "Data_Timbulan_Sampah.xlsx",
+    "Kualitas Air": "Indeks_Kualitas_Air.csv",
+    "Kualitas Udara": "indeks_kualitas_udara.csv"
+}
+
+CACHE_DIR = os.path.join(".cache", "columnar")
+
+# Satu lock per file sumber agar dua sesi tidak membangun cache yang sama bersamaan
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def source_path(label, base_dir=BASE_DIR):
+    """Path lengkap file sumber berdasarkan label di FILES"""
+    return os.path.join(base_dir, FILES[label])
+
+
+def content_hash(path, chunk_size=1 << 20):
+    """Hash sha256 isi file (dibaca per blok agar hemat memori)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_raw(path):
+    """Baca file sumber langsung (tanpa cache), sesuai format ekstensinya"""
+    if path.lower().endswith((".xlsx", ".xls")):
+        with perf.span("ingest.read_excel"):
+            return pd.read_excel(path)
+    with perf.span("ingest.read_csv"):
+        return pd.read_csv(path)
+
+
+def _to_typed(df):
+    """
+    Siapkan DataFrame agar bisa disimpan ke Parquet.
+    Kolom object campuran (mis. angka + '-') disimpan sebagai string,
+    nilai kosong tetap NaN.
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind not in ("string", "empty"):
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+
+def _source_key(path):
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+def _manifest_path(path, cache_dir):
+    return os.path.join(cache_dir, f"{_source_key(path)}.json")
+
+
+def _read_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path, writer):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    writer(tmp)
+    os.replace(tmp, path)
+
+
+def _write_manifest(path, manifest):
+    def writer(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(path, writer)
+
+
+@perf.timed("ingest.read_parquet")
+def _read_parquet(path):
+    df = pd.read_parquet(path)
+    # Parquet mengembalikan None untuk string kosong, samakan dengan NaN seperti read_csv/read_excel
+    obj_cols = df.columns[df.dtypes == object]
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].replace({None: np.nan})
+    return df
+
+
+# Hash file tanpa manifest (mis. file yang dibaca streaming), per proses
+_hashes = {}
+
+
+def file_fingerprint(path, cache_dir=CACHE_DIR):
+    """
+    Sidik jari file sumber: (ukuran, mtime, sha256).
+    Hash dibaca dari manifest kalau ukuran & mtime belum berubah.
+    """
+    st_ = os.stat(path)
+    manifest = _read_manifest(_manifest_path(path, cache_dir))
+    if manifest and manifest["size"] == st_.st_size and manifest["mtime_ns"] == st_.st_mtime_ns:
+        return st_.st_size, st_.st_mtime_ns, manifest["sha256"]
+    signature = (os.path.abspath(path), st_.st_size, st_.st_mtime_ns)
+    if signature not in _hashes:
+        _hashes[signature] = content_hash(path)
+    return st_.st_size, st_.st_mtime_ns, _hashes[signature]
+
+
+def read_table(path, cache_dir=CACHE_DIR):
+    """
+    Baca satu file sumber lewat cache Parquet.
+
+    1. Ukuran & mtime sama dengan manifest -> langsung baca Parquet.
+    2. Ukuran/mtime berubah tapi hash isi sama -> perbarui manifest saja.
+    3. Isi berubah -> parse ulang file asli, tulis Parquet & manifest baru.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_file = _manifest_path(path, cache_dir)
+
+    with _lock_for(path):
+        st_ = os.stat(path)
+        manifest = _read_manifest(manifest_file)
+        if manifest:
+            parquet_file = os.path.join(cache_dir, manifest["parquet"])
+            if os.path.exists(parquet_file):
+                if manifest["size"] == st_.st_size and manifest["mtime_ns"] == st_.st_mtime_ns:
+                    return _read_parquet(parquet_file)
+
+        digest = content_hash(path)
+        parquet_name = f"{_source_key(path)}-{digest[:16]}.parquet"
+        parquet_file = os.path.join(cache_dir, parquet_name)
+
+        if os.path.exists(parquet_file):
+            df = _read_parquet(parquet_file)
+        else:
+            df = read_raw(path)
+            _write_atomic(parquet_file, lambda tmp: _to_typed(df).to_parquet(tmp, engine="pyarrow", index=False))
+            # Hapus salinan lama milik file ini agar cache tidak menumpuk
+            if manifest and manifest.get("parquet") != parquet_name:
+                old = os.path.join(cache_dir, manifest["parquet"])
+                if os.path.exists(old):
+                    os.remove(old)
+            df = _read_parquet(parquet_file)
+
+        _write_manifest(manifest_file, {
+            "source": os.path.abspath(path),
+            "size": st_.st_size,
+            "mtime_ns": st_.st_mtime_ns,
+            "sha256": digest,
+            "parquet": parquet_name,
+        })
+        return df
+
+
+def load_sources(paths, cache_dir=CACHE_DIR, max_workers=None):
+    """
+    Baca beberapa file sumber secara paralel.
+    `paths` berupa dict {label: path}, hasilnya dict {label: DataFrame}.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or len(paths) or 1) as pool:
+        futures = {label: pool.submit(read_table, path, cache_dir) for label, path in paths.items()}
+        return {label: fut.result() for label, fut in futures.items()}
+
+
+# ==========================================
+# STREAMING (FILE CSV BESAR)
+# ==========================================
+# Ukuran blok yang dibaca pyarrow per potongan (bytes); puncak memori ~ ukuran ini
+STREAM_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def csv_header(path):
+    """Nama-nama kolom CSV (baris pertama saja)"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return next(csv.reader(f), [])
+
+
+@perf.timed("ingest.stream_group_counts")
+def stream_group_counts(path, key_column, count_column, block_size=STREAM_BLOCK_SIZE):
+    """
+    Hitung jumlah nilai `count_column` yang tidak kosong per nilai `key_column`
+    (setara groupby(key).agg(count)) dengan membaca CSV per potongan.
+
+    Hanya dua kolom itu yang dibaca, keduanya sebagai kolom dictionary
+    (kategori), jadi tiap potongan cukup diringkas dengan bincount atas kode
+    kategorinya. Hasil: DataFrame [key_column, "count"], kunci kosong = NaN.
+    """
+    # Import di sini agar mode non-streaming tidak perlu memuat pyarrow.csv
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    dict_type = pa.dictionary(pa.int32(), pa.string())
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=[key_column, count_column],
+            column_types={key_column: dict_type, count_column: dict_type},
+            strings_can_be_null=True,
+        ),
+    )
+
+    totals = {}
+    missing_key = 0
+    for batch in reader:
+        keys = batch.column(key_column)
+        has_value = batch.column(count_column).is_valid().to_numpy(zero_copy_only=False)
+        # Kode kategori; baris kunci kosong diisi 0 lalu disaring lewat key_valid
+        codes = keys.indices.fill_null(0).to_numpy(zero_copy_only=False)
+        key_valid = keys.is_valid().to_numpy(zero_copy_only=False)
+
+        missing_key += int((has_value & ~key_valid).sum())
+        counts = np.bincount(codes[has_value & key_valid], minlength=len(keys.dictionary))
+        # Kamus kategori bisa berbeda antar potongan: gabungkan lewat nilai string-nya
+        for name, n in zip(keys.dictionary.to_pylist(), counts.tolist()):
+            if n:
+                totals[name] = totals.get(name, 0) + n
+
+    result = pd.DataFrame({key_column: list(totals), "count": list(totals.values())})
+    if missing_key:
+        result.loc[len(result)] = [np.nan, missing_key]
+    return result
@@ -0,0 +1,252 @@
+"""
+Load test dashboard: N sesi simulasi bersamaan dalam satu proses.
+
+Setiap sesi adalah AppTest Streamlit (streamlit.testing.v1) yang menjalankan
+app.py yang asli tanpa browser. Sesi-sesi dijalankan paralel (satu thread
+per sesi) sehingga cache bersama proses (pipeline, fitur, figcache, model)
+dan kontensi lock-nya ikut teruji seperti di server sungguhan.
+
+Skenario per sesi (SCENARIO): buka app, jalankan Data Preparation, buka
+setiap section EDA, ganti pilihan selectbox outlier, lalu Compute Prediction.
+Untuk setiap jumlah sesi N dilaporkan latensi rerun p50/p95/p99 per
+interaksi, puncak RSS proses, dan memori sesi terbesar (adiwiyata/memory.py).
+
+Jalankan dari folder repo (app.py memakai path relatif Dataset_DS & model):
+
+    python -m adiwiyata.loadtest --sessions 1 2 4 8 16 --out loadtest.json
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import eda, memory
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Batas waktu satu rerun (detik); rerun pertama bisa membangun pipeline & cache
+TIMEOUT = 180
+
+SESSIONS = (1, 2, 4, 8)
+PERCENTILES = (50, 95, 99)
+
+# Interval sampling RSS (detik)
+RSS_INTERVAL = 0.05
+
+MENU_LABEL = "Navigasi Menu:"
+MENU_OVERVIEW = "1. Dataset Overview"
+MENU_EDA = "2. EDA Lengkap"
+MENU_MODEL = "3. Modelling"
+PREPARE_BUTTON = "🚀 Jalankan Data Preparation (Sesuai Notebook)"
+OUTLIER_LABEL = "Pilih Indikator untuk Dianalisis:"
+PREDICT_BUTTON = "Compute Prediction"
+
+
+# ==========================================
+# INTERAKSI
+# ==========================================
+def _find(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"Widget tidak ditemukan: {label!r}")
+
+
+def _menu(option):
+    return lambda at: _find(at.radio, MENU_LABEL).set_value(option)
+
+
+def _section(key):
+    return lambda at: at.radio(key="eda_section").set_value(key)
+
+
+def _outlier(column):
+    return lambda at: _find(at.selectbox, OUTLIER_LABEL).set_value(column)
+
+
+def _click(label):
+    return lambda at: _find(at.button, label).click()
+
+
+# (nama interaksi, aksi sebelum rerun); aksi None = rerun pertama (buka app)
+SCENARIO = [
+    ("open", None),
+    ("menu:overview", _menu(MENU_OVERVIEW)),
+    ("prepare", _click(PREPARE_BUTTON)),
+    ("menu:eda", _menu(MENU_EDA)),
+    *[(f"eda:{s.key}", _section(s.key)) for s in eda.SECTIONS],
+    ("eda:statistik:revisit", _section("statistik")),
+    *[("outlier", _outlier(col)) for col in eda.NUMERICAL_COLS[1:]],
+    ("menu:model", _menu(MENU_MODEL)),
+    ("predict", _click(PREDICT_BUTTON)),
+]
+
+
+# ==========================================
+# MEMORI
+# ==========================================
+def _rss_bytes():
+    """RSS proses saat ini (Linux /proc), None kalau tidak tersedia"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakRSS:
+    """Sampling RSS di thread background selama blok with berjalan"""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            rss = _rss_bytes()
+            if rss is None:
+                return
+            self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, name="loadtest-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        if not self.peak:
+            # Tanpa /proc: puncak RSS sepanjang umur proses (KB di Linux)
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return False
+
+
+# ==========================================
+# SESI & LEVEL
+# ==========================================
+def run_session(scenario=SCENARIO, app_path=APP_PATH, timeout=TIMEOUT, think=0.0):
+    """Satu sesi simulasi -> list dict {interaction, seconds, error}"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+    records = []
+    for name, action in scenario:
+        error = None
+        t0 = time.perf_counter()
+        try:
+            if action is not None:
+                action(at)
+            at.run()
+            if at.exception:
+                error = at.exception[0].message
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        records.append({"interaction": name, "seconds": time.perf_counter() - t0, "error": error})
+        if think:
+            time.sleep(think)
+    return records
+
+
+def summarize(records):
+    """Latensi per interaksi: n, error, mean, p50/p95/p99 (detik)"""
+    df = pd.DataFrame(records)
+    rows = []
+    for name, group in df.groupby("interaction", sort=False):
+        ok = group.loc[group["error"].isna(), "seconds"].to_numpy()
+        row = {"interaction": name, "n": len(group), "errors": int(group["error"].notna().sum())}
+        row["mean"] = float(ok.mean()) if len(ok) else float("nan")
+        for p in PERCENTILES:
+            row[f"p{p}"] = float(np.percentile(ok, p)) if len(ok) else float("nan")
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def run_level(n_sessions, scenario=SCENARIO, app_path=APP_PATH, timeout=TIMEOUT, think=0.0):
+    """N sesi bersamaan -> dict hasil (tabel latensi, memori, contoh error)"""
+    started = time.time()
+    with PeakRSS() as rss, ThreadPoolExecutor(max_workers=n_sessions, thread_name_prefix="loadtest-session") as pool:
+        t0 = time.perf_counter()
+        sessions = list(pool.map(lambda _: run_session(scenario, app_path, timeout, think), range(n_sessions)))
+        wall = time.perf_counter() - t0
+
+    records = [r for session in sessions for r in session]
+    session_bytes = [r["bytes"] for _, r in memory.reports() if r["updated"] >= started]
+    errors = sorted({r["error"] for r in records if r["error"]})
+    return {
+        "sessions": n_sessions,
+        "wall_seconds": wall,
+        "peak_rss_bytes": rss.peak,
+        "max_session_bytes": max(session_bytes, default=0),
+        "latency": summarize(records).to_dict(orient="records"),
+        "errors": errors[:10],
+    }
+
+
+def run(levels=SESSIONS, app_path=APP_PATH, timeout=TIMEOUT, think=0.0, log=print):
+    """Naikkan jumlah sesi bertahap (levels) dalam satu proses"""
+    result = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "app": app_path,
+            "cpu_count": os.cpu_count(),
+            "scenario": [name for name, _ in SCENARIO],
+        },
+        "levels": [],
+    }
+    # Memori sesi diukur di setiap rerun (tanpa jeda memory.TRACK_INTERVAL)
+    interval, memory.TRACK_INTERVAL = memory.TRACK_INTERVAL, 0
+    try:
+        for n in levels:
+            log(f"[{n} sesi] ...")
+            level = run_level(n, app_path=app_path, timeout=timeout, think=think)
+            result["levels"].append(level)
+            log(report(level))
+    finally:
+        memory.TRACK_INTERVAL = interval
+    return result
+
+
+def report(level):
+    """Teks ringkas satu level"""
+    table = pd.DataFrame(level["latency"])
+    lines = [
+        f"{level['sessions']} sesi: wall {level['wall_seconds']:.1f} dtk, "
+        f"puncak RSS {level['peak_rss_bytes'] / 2**20:,.0f} MB, "
+        f"sesi terbesar {level['max_session_bytes'] / 2**20:,.1f} MB",
+        table.to_string(index=False, float_format=lambda v: f"{v:.3f}"),
+    ]
+    lines += [f"  error: {e}" for e in level["errors"]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test dashboard dengan sesi AppTest bersamaan")
+    parser.add_argument("--sessions", nargs="+", type=int, default=list(SESSIONS), help="jumlah sesi per level")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="batas waktu satu rerun (detik)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="jeda antar interaksi per sesi (ms)")
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--out", help="tulis hasil ke JSON ini")
+    args = parser.parse_args(argv)
+
+    result = run(args.sessions, os.path.abspath(args.app), args.timeout, args.think_ms / 1000)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Hasil ditulis ke {args.out}")
+    return 1 if any(level["errors"] for level in result["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
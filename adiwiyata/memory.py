@@ -0,0 +1,153 @@
+"""
+Akuntansi memori per sesi Streamlit.
+
+Server berjalan lama dan setiap sesi menyimpan objek di session_state
+(df_final, hasil evaluasi, dsb.). Modul ini menghitung bytes yang dipegang
+tiap sesi (DataFrame dihitung deep, termasuk string) ditambah figur
+matplotlib yang masih hidup, lalu menandai sesi yang melewati budget.
+
+Catatan:
+- Objek yang dipakai bersama (mis. df_final dari memo pipeline) tetap
+  dihitung di setiap sesi yang mereferensikannya, jadi total semua sesi
+  bisa melebihi memori proses yang sebenarnya.
+- Figur pyplot bersifat global per proses (bukan per sesi); jumlahnya
+  dilaporkan di setiap laporan sebagai indikator kebocoran figur.
+- Perhitungan deep (memory_usage deep=True) mahal, jadi laporan satu sesi
+  paling sering dihitung ulang sekali per TRACK_INTERVAL detik; di antara
+  itu laporan terakhir yang dipakai (kecuali force=True).
+"""
+import sys
+import threading
+import time
+
+from matplotlib._pylab_helpers import Gcf
+import numpy as np
+import pandas as pd
+
+# Batas bytes per sesi sebelum ditandai over budget
+SESSION_BUDGET = 256 * 1024 * 1024
+
+# Sesi yang tidak melapor selama ini (detik) dianggap sudah selesai
+MAX_AGE = 3600
+
+# Laporan sesi dihitung ulang paling sering sekali per interval ini (detik)
+TRACK_INTERVAL = 30
+
+
+def sizeof(obj, _seen=None):
+    """Perkiraan bytes yang dipegang obj (rekursif, objek sama dihitung sekali)"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            sizeof(k, _seen) + sizeof(v, _seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(sizeof(v, _seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + sizeof(vars(obj), _seen)
+    return sys.getsizeof(obj)
+
+
+def figure_usage():
+    """Figur pyplot yang belum ditutup: jumlah + perkiraan bytes buffer RGBA"""
+    # Lewat Gcf langsung agar tidak mengganti "current figure" pyplot
+    managers = Gcf.get_all_fig_managers()
+    total = 0
+    for manager in managers:
+        fig = manager.canvas.figure
+        w, h = fig.get_size_inches() * fig.dpi
+        total += int(w) * int(h) * 4
+    return {"figures": len(managers), "figure_bytes": total}
+
+
+def session_usage(session_state, budget=SESSION_BUDGET):
+    """Laporan satu sesi: bytes per key session_state, total, dan status budget"""
+    seen = set()
+    keys = {}
+    for key in list(session_state.keys()):
+        try:
+            keys[key] = sizeof(session_state[key], seen)
+        except KeyError:
+            # Key dihapus thread lain di tengah perhitungan
+            continue
+    total = sum(keys.values())
+    return {
+        "keys": dict(sorted(keys.items(), key=lambda kv: kv[1], reverse=True)),
+        "bytes": total,
+        "budget": budget,
+        "over_budget": total > budget,
+        **figure_usage(),
+    }
+
+
+class SessionTracker:
+    """Laporan memori terakhir tiap sesi (dibuang kalau sesi lama tidak melapor)"""
+
+    def __init__(self, budget=SESSION_BUDGET, max_age=MAX_AGE, interval=None):
+        self.budget = budget
+        self.max_age = max_age
+        self.interval = interval  # None = TRACK_INTERVAL modul (dibaca saat dipakai)
+        self._reports = {}
+        self._lock = threading.Lock()
+
+    def track(self, session_id, session_state, force=False):
+        """Laporan sesi; dihitung ulang kalau force atau laporan terakhir lebih tua dari interval"""
+        if not force:
+            with self._lock:
+                last = self._reports.get(session_id)
+            interval = TRACK_INTERVAL if self.interval is None else self.interval
+            if last is not None and time.time() - last["updated"] < interval:
+                return last
+        report = session_usage(session_state, self.budget)
+        report["updated"] = time.time()
+        with self._lock:
+            self._reports[session_id] = report
+            self._expire(report["updated"])
+        return report
+
+    def _expire(self, now):
+        for sid in [s for s, r in self._reports.items() if now - r["updated"] > self.max_age]:
+            del self._reports[sid]
+
+    def forget(self, session_id):
+        with self._lock:
+            self._reports.pop(session_id, None)
+
+    def reports(self):
+        """Semua sesi aktif, yang terbesar duluan"""
+        with self._lock:
+            self._expire(time.time())
+            items = list(self._reports.items())
+        return sorted(items, key=lambda kv: kv[1]["bytes"], reverse=True)
+
+    def over_budget(self):
+        return [(sid, r) for sid, r in self.reports() if r["over_budget"]]
+
+
+# Tracker bersama satu proses (semua sesi Streamlit)
+_default = SessionTracker()
+
+
+def track(session_id, session_state, force=False):
+    return _default.track(session_id, session_state, force)
+
+
+def reports():
+    return _default.reports()
+
+
+def over_budget():
+    return _default.over_budget()
@@ -0,0 +1,123 @@
+"""
+Penyimpanan model LightGBM yang resident di memori proses.
+
+Model di-unpickle sekali per proses lalu dipakai bersama oleh semua sesi.
+Setiap akses hanya melakukan os.stat; model baru dimuat ulang kalau file
+.pkl di disk berubah (ukuran/mtime). Pergantian model dilakukan dengan
+mengganti referensi secara atomik, jadi prediksi yang sedang berjalan tetap
+memakai model lama sampai selesai.
+"""
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from adiwiyata import perf
+
+PATH_MODEL = "model_lgbm_adiwiyata.pkl"
+
+
+def _signature(path):
+    st_ = os.stat(path)
+    return st_.st_size, st_.st_mtime_ns
+
+
+def warm_up(model):
+    """Satu prediksi dummy agar struktur booster & thread pool LightGBM siap"""
+    booster = model.booster_
+    booster.predict(np.zeros((1, booster.num_feature())))
+
+
+class ModelStore:
+    """Satu model per path, dimuat ulang otomatis saat file berubah"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._current = None  # (signature, model)
+        self.load_count = 0
+        self.last_error = None
+        self.last_used = time.monotonic()
+
+    def _load(self, signature):
+        with perf.span("model.load"):
+            model = joblib.load(self.path)
+            warm_up(model)
+        self._current = (signature, model)
+        self.load_count += 1
+        self.last_error = None
+        return model
+
+    def get(self):
+        """Ambil model aktif (memuat ulang kalau file .pkl berubah)"""
+        self.last_used = time.monotonic()
+        signature = _signature(self.path)
+        current = self._current
+        if current is not None and current[0] == signature:
+            return current[1]
+
+        with self._lock:
+            current = self._current
+            if current is not None and current[0] == signature:
+                return current[1]
+            try:
+                return self._load(signature)
+            except Exception as e:
+                # File mungkin sedang ditulis: tetap layani dengan model lama
+                self.last_error = e
+                if current is None:
+                    raise
+                return current[1]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+_warm_started = set()
+
+
+def get_store(path=PATH_MODEL):
+    """ModelStore bersama untuk satu path (satu instance per proses)"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ModelStore(path)
+        return store
+
+
+def get_model(path=PATH_MODEL):
+    """Model resident untuk `path`"""
+    return get_store(path).get()
+
+
+def evict_idle(keep=(), max_idle=0.0):
+    """
+    Lepas model yang tidak dipakai lebih dari `max_idle` detik (kecuali path di
+    `keep`), agar hanya versi yang sedang dipakai yang resident di memori.
+    """
+    keep = {os.path.abspath(p) for p in keep}
+    now = time.monotonic()
+    with _stores_lock:
+        idle = [k for k, s in _stores.items() if k not in keep and now - s.last_used > max_idle]
+        for key in idle:
+            _warm_started.discard(_stores.pop(key).path)
+    return idle
+
+
+def warm_async(path=PATH_MODEL):
+    """Muat model + warm-up di background (sekali per path, mulai dari rerun pertama sesi pertama)"""
+    store = get_store(path)
+    with _stores_lock:
+        if store.path in _warm_started or not os.path.exists(path):
+            return
+        _warm_started.add(store.path)
+
+    def _warm():
+        try:
+            store.get()
+        except Exception:
+            pass
+
+    threading.Thread(target=_warm, name="model-warmup", daemon=True).start()
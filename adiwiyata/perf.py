@@ -0,0 +1,314 @@
+"""
+Instrumentasi waktu per rerun (panel "Performa" di sidebar).
+
+Setiap bagian yang berat dibungkus span bernama: tahap pipeline, baca file
+sumber, normalisasi kab/kota, render grafik, dan pemanggilan model. Span
+dicatat ke jejak (trace) rerun yang sedang berjalan (contextvars, jadi aman
+dipakai banyak sesi sekaligus) dan ke statistik bergulir per nama span
+(WINDOW sampel terakhir) untuk persentil p50/p95/p99.
+
+Setiap rerun yang selesai ditulis sebagai satu baris JSON ke SPANS_FILE dan
+statistiknya ke PROM_FILE (format teks Prometheus, bisa dibaca node_exporter
+textfile collector). Mode profil (opt-in, satu rerun) menjalankan sampling
+profiler berbasis sys._current_frames() pada thread skrip.
+
+Rerun yang berhenti lewat st.stop()/st.rerun() tidak sampai ke end_rerun();
+jejaknya ditutup saat rerun berikutnya sesi itu dimulai (complete=False).
+"""
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+
+PERF_DIR = os.path.join(".cache", "perf")
+SPANS_FILE = os.path.join(PERF_DIR, "spans.jsonl")
+PROM_FILE = os.path.join(PERF_DIR, "metrics.prom")
+
+# File JSONL diputar (spans.jsonl -> spans.jsonl.1) setelah sebesar ini
+MAX_JSONL_BYTES = 16 * 1024 * 1024
+
+# Jumlah sampel terakhir per span untuk persentil bergulir
+WINDOW = 500
+PERCENTILES = (50, 95, 99)
+
+# Jejak terakhir yang disimpan (satu per sesi)
+MAX_SESSIONS = 256
+
+# Interval sampling profiler (detik) & jumlah fungsi teratas yang dilaporkan
+PROFILE_INTERVAL = 0.005
+PROFILE_TOP = 25
+
+_current = contextvars.ContextVar("perf_trace", default=None)
+_depth = contextvars.ContextVar("perf_depth", default=0)
+
+_lock = threading.Lock()
+_export_lock = threading.Lock()
+_window = {}
+_totals = {}
+_traces = OrderedDict()
+_pending = {}
+
+
+# ==========================================
+# SPAN
+# ==========================================
+def _record(name, seconds):
+    with _lock:
+        if name not in _window:
+            _window[name] = deque(maxlen=WINDOW)
+            _totals[name] = [0, 0.0]
+        _window[name].append(seconds)
+        _totals[name][0] += 1
+        _totals[name][1] += seconds
+
+
+@contextmanager
+def span(name):
+    """Ukur blok `with` sebagai span bernama (juga di luar rerun, mis. thread background)"""
+    trace = _current.get()
+    depth = _depth.get()
+    token = _depth.set(depth + 1)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        t1 = time.perf_counter()
+        _depth.reset(token)
+        _record(name, t1 - t0)
+        if trace is not None:
+            trace["spans"].append({
+                "name": name,
+                "start": t0 - trace["t0"],
+                "seconds": t1 - t0,
+                "depth": depth,
+                "thread": threading.current_thread().name,
+            })
+            trace["last"] = t1
+
+
+def timed(name):
+    """Dekorator: seluruh panggilan fungsi sebagai satu span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return run
+    return decorator
+
+
+def bind(fn):
+    """
+    fn yang dijalankan dalam salinan konteks saat ini, agar span dari thread
+    pool (mis. load paralel pipeline) tetap masuk ke jejak rerun pemanggil.
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+# ==========================================
+# RERUN
+# ==========================================
+def begin_rerun(session_id, profile=False, **meta):
+    """Mulai jejak rerun sesi ini (jejak sebelumnya yang belum ditutup ikut difinalisasi)"""
+    with _lock:
+        stale = _pending.pop(session_id, None)
+    if stale is not None:
+        _finish(stale, stale["last"], complete=False)
+
+    now = time.perf_counter()
+    trace = {
+        "session": session_id,
+        "started": time.time(),
+        "t0": now,
+        "last": now,
+        "meta": dict(meta),
+        "spans": [],
+        "profiler": SamplingProfiler(threading.get_ident()).start() if profile else None,
+    }
+    with _lock:
+        _pending[session_id] = trace
+    _current.set(trace)
+    return trace
+
+
+def annotate(**meta):
+    """Tambah keterangan (mis. menu aktif) ke jejak rerun yang sedang berjalan"""
+    trace = _current.get()
+    if trace is not None:
+        trace["meta"].update(meta)
+
+
+def end_rerun():
+    """Tutup jejak rerun yang sedang berjalan (dipanggil di akhir skrip)"""
+    trace = _current.get()
+    if trace is None:
+        return None
+    _current.set(None)
+    with _lock:
+        if _pending.get(trace["session"]) is trace:
+            del _pending[trace["session"]]
+        else:
+            return None
+    return _finish(trace, time.perf_counter(), complete=True)
+
+
+def _finish(trace, end, complete):
+    profiler = trace.pop("profiler")
+    total = end - trace.pop("t0")
+    trace.pop("last")
+    trace.update(seconds=total, complete=complete,
+                 profile=profiler.stop() if profiler is not None else None)
+    _record("rerun", total)
+    with _lock:
+        _traces[trace["session"]] = trace
+        _traces.move_to_end(trace["session"])
+        while len(_traces) > MAX_SESSIONS:
+            _traces.popitem(last=False)
+    try:
+        export(trace)
+    except OSError:
+        # Folder tidak bisa ditulis: panel tetap jalan, ekspor dilewati
+        pass
+    return trace
+
+
+def last_trace(session_id):
+    """Jejak rerun terakhir yang sudah selesai untuk sesi ini (None kalau belum ada)"""
+    with _lock:
+        return _traces.get(session_id)
+
+
+def breakdown(trace):
+    """Total per nama span dalam satu jejak (span bertumpuk tetap dihitung sendiri-sendiri)"""
+    totals = {}
+    for s in trace["spans"]:
+        n, sec = totals.get(s["name"], (0, 0.0))
+        totals[s["name"]] = (n + 1, sec + s["seconds"])
+    rows = [{"span": name, "n": n, "seconds": sec, "share": sec / trace["seconds"] if trace["seconds"] else 0.0}
+            for name, (n, sec) in totals.items()]
+    return sorted(rows, key=lambda r: -r["seconds"])
+
+
+# ==========================================
+# STATISTIK BERGULIR
+# ==========================================
+def _quantile(sorted_values, q):
+    """Persentil dengan interpolasi linier (sama dengan numpy.percentile bawaan)"""
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def percentiles():
+    """Per nama span: n (jendela), last, p50/p95/p99 (detik), total count & sum sejak start"""
+    with _lock:
+        snapshot = {name: (list(values), tuple(_totals[name])) for name, values in _window.items()}
+    rows = []
+    for name, (values, (count, total)) in snapshot.items():
+        ordered = sorted(values)
+        row = {"span": name, "n": len(values), "last": values[-1]}
+        for p in PERCENTILES:
+            row[f"p{p}"] = _quantile(ordered, p / 100)
+        row.update(count=count, sum=total)
+        rows.append(row)
+    return sorted(rows, key=lambda r: -r[f"p{PERCENTILES[-1]}"])
+
+
+# ==========================================
+# EKSPOR
+# ==========================================
+def _prom_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(rows=None):
+    """Statistik span dalam format teks Prometheus (summary)"""
+    rows = percentiles() if rows is None else rows
+    lines = [
+        f"# HELP adiwiyata_span_seconds Durasi span per rerun (kuantil atas {WINDOW} sampel terakhir)",
+        "# TYPE adiwiyata_span_seconds summary",
+    ]
+    for row in rows:
+        label = _prom_label(row["span"])
+        for p in PERCENTILES:
+            lines.append(f'adiwiyata_span_seconds{{span="{label}",quantile="{p / 100:g}"}} {row[f"p{p}"]:.6g}')
+        lines.append(f'adiwiyata_span_seconds_sum{{span="{label}"}} {row["sum"]:.6g}')
+        lines.append(f'adiwiyata_span_seconds_count{{span="{label}"}} {row["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def export(trace, spans_file=SPANS_FILE, prom_file=PROM_FILE):
+    """Tambah satu baris JSON untuk rerun ini + tulis ulang file Prometheus (atomik)"""
+    line = json.dumps({k: v for k, v in trace.items() if k != "profile"}, default=str)
+    os.makedirs(os.path.dirname(spans_file) or ".", exist_ok=True)
+    with _export_lock:
+        if os.path.exists(spans_file) and os.path.getsize(spans_file) > MAX_JSONL_BYTES:
+            os.replace(spans_file, f"{spans_file}.1")
+        with open(spans_file, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+        tmp = f"{prom_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(prometheus_text())
+        os.replace(tmp, prom_file)
+
+
+# ==========================================
+# SAMPLING PROFILER (OPT-IN, SATU RERUN)
+# ==========================================
+class SamplingProfiler:
+    """
+    Ambil stack thread target tiap `interval` detik dari thread terpisah.
+    Overhead hanya ada selama profiler aktif; hasil: fungsi teratas menurut
+    sampel inklusif (ada di stack) dan self (paling atas stack).
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self._self = Counter()
+        self._total = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _label(code):
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            self._self[self._label(frame.f_code)] += 1
+            seen = set()
+            while frame is not None:
+                seen.add(self._label(frame.f_code))
+                frame = frame.f_back
+            self._total.update(seen)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="perf-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, top=PROFILE_TOP):
+        """Hentikan sampling -> list dict {function, total, self, total_pct, self_pct}"""
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        n = self.samples or 1
+        return [
+            {"function": fn, "total": count, "self": self._self[fn],
+             "total_pct": count / n, "self_pct": self._self[fn] / n}
+            for fn, count in self._total.most_common(top)
+        ]
@@ -0,0 +1,407 @@
+"""
+Pipeline Data Preparation: load -> clean -> aggregate -> merge.
+
+Setiap tahap adalah fungsi murni yang di-memo (disimpan hasilnya) di level
+proses, sehingga dipakai bersama oleh semua sesi Streamlit. Kunci memo
+sebuah tahap = nama tahap + hash kode tahap + kunci input-inputnya, jadi
+tahap hanya dihitung ulang kalau input atau kodenya berubah. Kunci tahap
+load berasal dari sidik jari file sumber (ukuran, mtime, sha256).
+
+Hasil memo dipakai bersama: jangan dimutasi, lakukan .copy() dulu.
+"""
+import functools
+import hashlib
+import inspect
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import perf
+from adiwiyata.incremental import IncrementalFinal, frames_equal, latest_rows
+from adiwiyata.ingest import (BASE_DIR, CACHE_DIR, csv_header, file_fingerprint, read_table, source_path,
+                               stream_group_counts)
+from adiwiyata.regions import alias_version, normalize_kabkot_rules, normalize_kabkot_sekolah
+from adiwiyata.resolve import RegionIndex, directions, join_column, resolve_regions
+
+# Jumlah hasil yang disimpan per tahap (versi lama dibuang duluan)
+MEMO_SIZE = 4
+
+# Kolom yang diambil dari data tahun terbaru tiap sumber
+RTH_COLUMNS = ("PERSEN_RTH", "LUAS_WILAYAH")
+SAMPAH_COLUMNS = ("SAMPAH_HARIAN_TON", "SAMPAH_TAHUNAN_TON")
+
+# Label tabel referensi (urutan = prioritas nama kanonik, lihat resolve.py)
+REFERENCES = ("RTH", "Sampah")
+
+# Daftar sekolah sebesar ini (bytes) atau lebih dibaca streaming per potongan:
+# hanya kolom kab/kota & nama sekolah, langsung diringkas jadi jumlah per wilayah
+SEKOLAH_STREAM_BYTES = 64 * 1024 * 1024
+
+
+class Node(NamedTuple):
+    """Hasil satu tahap beserta kunci memo-nya"""
+    key: str
+    value: Any
+
+
+class NotCached(Exception):
+    """Dilempar saat mode intip (peek) menemukan tahap yang belum di-memo"""
+
+
+_memo = {}
+_memo_lock = threading.RLock()
+_build_lock = threading.Lock()
+_local = threading.local()
+_stats = {"hit": 0, "miss": 0}
+
+
+def _digest(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _code_hash(*fns):
+    sources = []
+    for fn in fns:
+        try:
+            sources.append(inspect.getsource(fn))
+        except (OSError, TypeError):
+            sources.append(fn.__code__.co_code.hex())
+    return _digest(*sources)
+
+
+def _memo_get(name, key):
+    with _memo_lock:
+        slot = _memo.get(name)
+        if slot is not None and key in slot:
+            slot.move_to_end(key)
+            _stats["hit"] += 1
+            return True, slot[key]
+        if getattr(_local, "peek", False):
+            raise NotCached(name)
+        _stats["miss"] += 1
+        return False, None
+
+
+def _memo_put(name, key, value):
+    with _memo_lock:
+        slot = _memo.setdefault(name, OrderedDict())
+        slot[key] = value
+        while len(slot) > MEMO_SIZE:
+            slot.popitem(last=False)
+
+
+def stage(*uses):
+    """
+    Dekorator tahap pipeline. Input berupa Node, output berupa Node.
+    `uses` = fungsi helper yang kodenya ikut menentukan kunci memo.
+    """
+    def decorator(fn):
+        code = _code_hash(fn, *uses)
+
+        @functools.wraps(fn)
+        def run(*inputs, **params):
+            key = _digest(fn.__name__, code, [n.key for n in inputs], sorted(params.items()))
+            found, value = _memo_get(fn.__name__, key)
+            if not found:
+                with perf.span(f"pipeline.{fn.__name__}"):
+                    value = fn(*[n.value for n in inputs], **params)
+                _memo_put(fn.__name__, key, value)
+            return Node(key, value)
+
+        run.stage_name = fn.__name__
+        return run
+    return decorator
+
+
+# ==========================================
+# TAHAP 1: LOAD
+# ==========================================
+def load(path, cache_dir=CACHE_DIR):
+    """Tahap load: baca file sumber (via cache Parquet), kunci = sidik jari file"""
+    key = _digest("load", path, file_fingerprint(path, cache_dir))
+    found, value = _memo_get("load", key)
+    if not found:
+        with perf.span("pipeline.load"):
+            value = read_table(path, cache_dir)
+        _memo_put("load", key, value)
+    return Node(key, value)
+
+
+def load_sekolah_counts(path, cache_dir=CACHE_DIR):
+    """
+    Tahap load versi streaming untuk daftar sekolah besar: jumlah sekolah per
+    nama kab/kota mentah (lihat ingest.stream_group_counts), bukan tabel penuh.
+    """
+    key = _digest("load_sekolah_counts", path, file_fingerprint(path, cache_dir))
+    found, value = _memo_get("load_sekolah_counts", key)
+    if not found:
+        col_kab = next((c for c in csv_header(path) if "Kabupaten" in c), "Kabupaten/Kota")
+        with perf.span("pipeline.load_sekolah_counts"):
+            value = stream_group_counts(path, col_kab, "Nama Sekolah").rename(columns={col_kab: "Kabupaten/Kota"})
+        _memo_put("load_sekolah_counts", key, value)
+    return Node(key, value)
+
+
+# ==========================================
+# TAHAP 2: CLEAN
+# ==========================================
+@stage(normalize_kabkot_sekolah, normalize_kabkot_rules)
+def clean_sekolah(df_sekolah, alias_version=0):
+    df_sekolah = df_sekolah.copy()
+
+    # Pastikan nama kolom 'Kabupaten/Kota' ada (Mapping dari file asli)
+    col_kab = [c for c in df_sekolah.columns if 'Kabupaten' in c]
+    if col_kab: df_sekolah.rename(columns={col_kab[0]: 'Kabupaten/Kota'}, inplace=True)
+
+    # Terapkan fungsi normalisasi (alias_version hanya untuk kunci memo)
+    df_sekolah["KABKOT_STD"] = normalize_kabkot_sekolah(df_sekolah["Kabupaten/Kota"])
+    return df_sekolah
+
+
+@stage()
+def clean_rth(df_rth):
+    df_rth_clean = df_rth.copy()
+
+    # Rename (Sesuai Notebook)
+    # Catatan: Kita pakai strip() dulu jaga-jaga ada spasi di header excel asli
+    df_rth_clean.columns = df_rth_clean.columns.str.strip()
+    df_rth_clean = df_rth_clean.rename(columns={
+        "Kabupaten/Kota": "KABKOT_STD",
+        "Luas Wilayah (km2)(A)": "LUAS_WILAYAH",
+        "% RTH(B/A)": "PERSEN_RTH"
+    })
+
+    # Cleaning Numerik (Sesuai Notebook)
+    for col in ["LUAS_WILAYAH", "PERSEN_RTH"]:
+        if col in df_rth_clean.columns:
+            df_rth_clean[col] = (
+                df_rth_clean[col]
+                .astype(str)
+                .str.replace(",", ".", regex=False)
+                .replace("-", np.nan)
+            )
+            df_rth_clean[col] = pd.to_numeric(df_rth_clean[col], errors="coerce")
+
+    # Drop NA pada Luas Wilayah (Sesuai Notebook)
+    return df_rth_clean.dropna(subset=["LUAS_WILAYAH"])
+
+
+@stage()
+def clean_sampah(df_sampah):
+    df_sampah_clean = df_sampah.copy()
+    df_sampah_clean.columns = df_sampah_clean.columns.str.strip()
+
+    return df_sampah_clean.rename(columns={
+        "Kabupaten/Kota": "KABKOT_STD",
+        "Timbulan Sampah Harian(ton)": "SAMPAH_HARIAN_TON",
+        "Timbulan Sampah Tahunan(ton)": "SAMPAH_TAHUNAN_TON"
+    })
+
+
+# ==========================================
+# TAHAP 3: AGGREGATE
+# ==========================================
+@stage()
+def aggregate_sekolah(df_sekolah):
+    return (
+        df_sekolah
+        .groupby("KABKOT_STD", as_index=False)
+        .agg(
+            JUMLAH_SEKOLAH_ADIWIYATA=("Nama Sekolah", "count")
+        )
+    )
+
+
+@stage(normalize_kabkot_sekolah, normalize_kabkot_rules)
+def aggregate_sekolah_counts(df_counts, alias_version=0):
+    """Setara clean_sekolah + aggregate_sekolah, tapi dari jumlah per nama mentah"""
+    df_counts = df_counts.copy()
+    df_counts["KABKOT_STD"] = normalize_kabkot_sekolah(df_counts["Kabupaten/Kota"])
+    return (
+        df_counts
+        .groupby("KABKOT_STD", as_index=False)
+        .agg(
+            JUMLAH_SEKOLAH_ADIWIYATA=("count", "sum")
+        )
+    )
+
+
+@stage(latest_rows)
+def latest_per_region(df_clean, columns=()):
+    """Ambil data tahun terbaru per KABKOT_STD"""
+    return latest_rows(df_clean, columns)
+
+
+# ==========================================
+# TAHAP 4: RESOLVE + MERGE
+# ==========================================
+@stage(resolve_regions, RegionIndex, directions)
+def resolve_sekolah(df_sekolah_wilayah, df_rth_wilayah, df_sampah_wilayah):
+    """
+    Cocokkan kunci wilayah sekolah ke nama RTH dan Sampah (index n-gram per
+    tabel). Hasil: (df_sekolah_wilayah + kunci join per tabel, laporan
+    resolusi per kunci per tabel).
+    """
+    return resolve_regions(df_sekolah_wilayah, dict(zip(REFERENCES, [df_rth_wilayah, df_sampah_wilayah])))
+
+
+@stage(join_column)
+def merge_final(df_sekolah_wilayah, df_rth_wilayah, df_sampah_wilayah):
+    """Left join sekolah ke RTH & Sampah, masing-masing lewat kunci join tabelnya"""
+    df = df_sekolah_wilayah
+    for table, df_ref in zip(REFERENCES, [df_rth_wilayah, df_sampah_wilayah]):
+        col = join_column(table)
+        df = df.merge(df_ref.rename(columns={"KABKOT_STD": col}), on=col, how="left")
+    return df.drop(columns=[join_column(t) for t in REFERENCES])
+
+
+def _clean_nodes(base_dir=BASE_DIR, cache_dir=CACHE_DIR):
+    """Load -> clean (-> aggregate sekolah), hasilnya Node (sekolah_wilayah, rth, sampah)"""
+    paths = [source_path(label, base_dir) for label in ["Sekolah", "RTH", "Sampah"]]
+    stream = os.path.getsize(paths[0]) >= SEKOLAH_STREAM_BYTES
+    loaders = [load_sekolah_counts if stream else load, load, load]
+    if getattr(_local, "peek", False):
+        sekolah, rth, sampah = [fn(p, cache_dir) for fn, p in zip(loaders, paths)]
+    else:
+        # Ketiga sumber dibaca paralel
+        with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+            sekolah, rth, sampah = pool.map(perf.bind(lambda job: job[0](job[1], cache_dir)), zip(loaders, paths))
+
+    if stream:
+        sekolah_wilayah = aggregate_sekolah_counts(sekolah, alias_version=alias_version())
+    else:
+        sekolah_wilayah = aggregate_sekolah(clean_sekolah(sekolah, alias_version=alias_version()))
+    return sekolah_wilayah, clean_rth(rth), clean_sampah(sampah)
+
+
+def _regional_nodes(base_dir=BASE_DIR, cache_dir=CACHE_DIR):
+    """Load -> clean -> aggregate -> resolve, hasilnya Node (resolve, rth, sampah)"""
+    sekolah_wilayah, rth, sampah = _clean_nodes(base_dir, cache_dir)
+    rth_wilayah = latest_per_region(rth, columns=RTH_COLUMNS)
+    sampah_wilayah = latest_per_region(sampah, columns=SAMPAH_COLUMNS)
+
+    resolved = resolve_sekolah(sekolah_wilayah, rth_wilayah, sampah_wilayah)
+    return resolved, rth_wilayah, sampah_wilayah
+
+
+def run_pipeline(base_dir=BASE_DIR, cache_dir=CACHE_DIR):
+    """Jalankan seluruh DAG, hasilnya Node df_final"""
+    resolved, rth_wilayah, sampah_wilayah = _regional_nodes(base_dir, cache_dir)
+    sekolah_wilayah = Node(resolved.key, resolved.value[0])
+    return merge_final(sekolah_wilayah, rth_wilayah, sampah_wilayah)
+
+
+_incremental = IncrementalFinal(RTH_COLUMNS, SAMPAH_COLUMNS)
+
+
+def _join_keys(base_dir, cache_dir):
+    """Kunci join RTH & Sampah per baris df_final (urutan baris sama, dari memo resolve)"""
+    df_sekolah_wilayah = _regional_nodes(base_dir, cache_dir)[0].value[0]
+    return [df_sekolah_wilayah[join_column(t)].to_numpy(dtype=object) for t in REFERENCES]
+
+
+def _build_incremental(base_dir, cache_dir, verify):
+    nodes = _clean_nodes(base_dir, cache_dir)
+    df_final = _incremental.update(*nodes)
+    if df_final is None:
+        return _incremental.rebuild(run_pipeline(base_dir, cache_dir).value, _join_keys(base_dir, cache_dir), *nodes)
+
+    if verify:
+        # Bukti: hasil inkremental harus identik dengan pipeline penuh
+        df_full = run_pipeline(base_dir, cache_dir).value
+        _incremental.last_update["verified"] = frames_equal(df_final, df_full)
+        if not _incremental.last_update["verified"]:
+            df_final = _incremental.rebuild(df_full, _join_keys(base_dir, cache_dir), *nodes)
+            _incremental.last_update["verified"] = False
+    return df_final
+
+
+def build_final(base_dir=BASE_DIR, cache_dir=CACHE_DIR, incremental=False, verify=False):
+    """
+    Ambil df_final. Kalau semua tahap sudah di-memo dan file sumber tidak
+    berubah, ini hanya beberapa os.stat (milidetik).
+
+    incremental=True: kalau yang berubah hanya RTH/Sampah (mis. tahun baru
+    di-append), hanya baris baru/hilang dan wilayah terdampak yang diproses
+    (lihat adiwiyata/incremental.py). verify=True membandingkan hasilnya
+    dengan pipeline penuh (lihat incremental_stats()["verified"]).
+    """
+    with _build_lock:
+        if incremental:
+            return _build_incremental(base_dir, cache_dir, verify)
+        return run_pipeline(base_dir, cache_dir).value
+
+
+def peek_final(base_dir=BASE_DIR, cache_dir=CACHE_DIR):
+    """
+    Ambil df_final hanya kalau sudah tersedia di memo (tanpa menghitung).
+    Dipakai untuk mengisi sesi baru tanpa harus klik tombol lagi.
+    """
+    _local.peek = True
+    try:
+        df_final = _incremental.current(tuple(n.key for n in _clean_nodes(base_dir, cache_dir)))
+        if df_final is not None:
+            return df_final
+        return run_pipeline(base_dir, cache_dir).value
+    except (NotCached, OSError):
+        return None
+    finally:
+        _local.peek = False
+
+
+_warm_started = threading.Event()
+
+
+def warm_async(base_dir=BASE_DIR, cache_dir=CACHE_DIR):
+    """
+    Hitung df_final di background satu kali per proses. Dipanggil dari
+    app.py, jadi mulai saat rerun pertama sesi pertama (bukan saat server
+    start); sesi berikutnya menemukan hasilnya sudah di memo.
+    """
+    if _warm_started.is_set():
+        return
+    _warm_started.set()
+
+    def _warm():
+        try:
+            build_final(base_dir, cache_dir, incremental=True)
+        except Exception:
+            # File belum lengkap dll: biarkan tombol di menu 1 yang menampilkan error
+            pass
+
+    threading.Thread(target=_warm, name="pipeline-warmup", daemon=True).start()
+
+
+def resolution_report(base_dir=BASE_DIR, cache_dir=CACHE_DIR, unmatched_only=True):
+    """
+    Laporan resolusi kunci wilayah sekolah (key, table, name, score, method)
+    dari memo pipeline terakhir, satu baris per kunci per tabel referensi.
+    None kalau df_final belum pernah dibangun.
+    """
+    _local.peek = True
+    try:
+        report = _regional_nodes(base_dir, cache_dir)[0].value[1]
+    except (NotCached, OSError):
+        return None
+    finally:
+        _local.peek = False
+    if unmatched_only:
+        report = report[report["method"] == "none"]
+    return report.reset_index(drop=True)
+
+
+def incremental_stats():
+    """Ringkasan update df_final terakhir (mode, baris diproses, wilayah, verifikasi)"""
+    with _build_lock:
+        return dict(_incremental.last_update)
+
+
+def memo_stats():
+    """Statistik hit/miss memo tahap (untuk debugging)"""
+    with _memo_lock:
+        return {**_stats, "entries": {name: len(slot) for name, slot in _memo.items()}}
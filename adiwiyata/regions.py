@@ -0,0 +1,184 @@
+"""
+Normalisasi nama kabupaten/kota.
+
+Sebagian besar baris hanya mengulang ~500 nama kab/kota yang sama, jadi
+normalisasi dilakukan pada nilai unik saja: input di-factorize menjadi
+array kode + daftar nilai unik, nilai unik dicari di tabel alias kanonik
+(kabkot_alias.csv), yang belum ada dinormalisasi dengan aturan regex, lalu
+hasilnya dipetakan balik lewat array kode. Biaya normalisasi jadi sebanding
+dengan jumlah nama unik, bukan jumlah baris.
+
+Tabel alias bisa ditambah manual (mis. ejaan khusus) lewat register_alias(),
+dan dibangun ulang dari Dataset_DS dengan:
+    python -m adiwiyata.regions --rebuild
+"""
+import csv
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from adiwiyata import perf
+
+ALIAS_PATH = os.path.join(os.path.dirname(__file__), "data", "kabkot_alias.csv")
+
+_alias = None
+_alias_lock = threading.Lock()
+_version = 0
+
+
+# ==========================================
+# ATURAN NORMALISASI (PERBAIKAN DOUBLE TITIK)
+# ==========================================
+def normalize_kabkot_rules(series):
+    """
+    Normalisasi nama kabupaten/kota (Versi Fix Double Dot)
+    """
+    # 1. Bersihkan karakter aneh & spasi berlebih
+    s = (
+        series
+        .astype(str)
+        .str.replace('\xa0', ' ', regex=False)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
+        .str.upper()
+    )
+
+    # 2. Cek apakah dia Kota atau Kabupaten
+    is_kota = s.str.match(r'^KOTA\b')
+
+    # 3. Ambil nama intinya saja
+    # PERBAIKAN: Regex sekarang memakan spasi & titik setelah KAB/KOTA.
+    # KABUPATEN dicoba sebelum KAB (bukan "Kab. Upaten X") dan KOTA harus
+    # kata utuh (KOTAWARINGIN/KOTABARU bukan awalan "Kota")
+    nama_inti = (
+        s
+        .str.replace(r'^(KABUPATEN|KAB\.?|KOTA\b)\s*\.?\s*', '', regex=True)
+        .str.strip()
+        .str.lstrip('.') # Hapus paksa titik di depan jika masih ada sisa
+        .str.strip()
+        .str.title()
+    )
+
+    # 4. Format ulang jadi "Kab. X" atau "Kota Y"
+    hasil = nama_inti.where(is_kota, "Kab. " + nama_inti)
+    hasil = hasil.where(~is_kota, "Kota " + nama_inti)
+
+    # 5. Handle kasus khusus (misal "Kab. -")
+    hasil = hasil.replace("Kab. -", "Tidak Diketahui").replace("Kota -", "Tidak Diketahui")
+
+    return hasil
+
+
+# ==========================================
+# TABEL ALIAS KANONIK
+# ==========================================
+def load_alias_table(path=ALIAS_PATH):
+    """Baca tabel alias {nama mentah: nama kanonik} (dict biasa, sekali per proses)"""
+    global _alias
+    with _alias_lock:
+        if _alias is None:
+            table = {}
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8", newline="") as f:
+                    for row in csv.DictReader(f):
+                        table[row["raw"]] = row["canonical"]
+            _alias = table
+        return _alias
+
+
+def save_alias_table(table=None, path=ALIAS_PATH):
+    """Tulis tabel alias ke CSV (terurut, atomik)"""
+    table = load_alias_table() if table is None else table
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["raw", "canonical"])
+        for raw in sorted(table):
+            writer.writerow([raw, table[raw]])
+    os.replace(tmp, path)
+
+
+def _bump_version():
+    global _version
+    with _alias_lock:
+        _version += 1
+
+
+def alias_version():
+    """
+    Versi tabel alias, naik setiap ada override manual / rebuild.
+    Dipakai pipeline sebagai bagian kunci memo tahap clean.
+    """
+    return _version
+
+
+def register_alias(raw, canonical, persist=True):
+    """Tambah/ubah satu alias (mis. ejaan khusus yang tidak tertangani aturan)"""
+    table = load_alias_table()
+    with _alias_lock:
+        table[str(raw)] = canonical
+    _bump_version()
+    if persist:
+        save_alias_table(table)
+
+
+@perf.timed("regions.normalize_kabkot")
+def normalize_kabkot_sekolah(series, learn=True):
+    """
+    Normalisasi nama kabupaten/kota: unik -> tabel alias / aturan -> petakan balik.
+    Hasil identik dengan normalize_kabkot_rules untuk nama yang tidak di-override.
+    `learn=True` menyimpan hasil nama baru ke tabel alias di memori.
+    """
+    series = pd.Series(series)
+    na = series.isna()
+    if na.any():
+        # Samakan dengan .astype(str): None -> 'None', NaN -> 'nan'
+        series = series.astype(object).copy()
+        series[na] = [str(v) for v in series[na]]
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    keys = pd.Index(uniques).astype(str)
+
+    table = load_alias_table()
+    hasil = np.array([table.get(k) for k in keys], dtype=object)
+
+    baru = np.flatnonzero(pd.isna(hasil))
+    if len(baru):
+        hasil[baru] = normalize_kabkot_rules(pd.Series(keys[baru], dtype=object)).to_numpy(dtype=object)
+        if learn:
+            with _alias_lock:
+                for i in baru:
+                    table.setdefault(keys[i], hasil[i])
+
+    return pd.Series(hasil[codes], index=series.index, name=series.name, dtype=object)
+
+
+def rebuild_alias_table(base_dir=None, path=ALIAS_PATH):
+    """Bangun ulang tabel alias dari semua nama kab/kota di Dataset_DS"""
+    from adiwiyata.ingest import BASE_DIR, read_table, source_path
+
+    names = set()
+    for label in ["Sekolah", "RTH", "Sampah"]:
+        df = read_table(source_path(label, base_dir or BASE_DIR))
+        col = [c for c in df.columns if 'Kabupaten' in c][0]
+        names.update(df[col].dropna().astype(str).unique())
+
+    keys = sorted(names)
+    table = dict(zip(keys, normalize_kabkot_rules(pd.Series(keys, dtype=object))))
+    # Alias yang sudah ada (termasuk override manual) dipertahankan
+    table.update(load_alias_table(path))
+    save_alias_table(table, path)
+    _bump_version()
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tabel alias kab/kota")
+    parser.add_argument("--rebuild", action="store_true", help="bangun ulang dari Dataset_DS")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"{len(rebuild_alias_table())} alias ditulis ke {ALIAS_PATH}")
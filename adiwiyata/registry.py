@@ -0,0 +1,215 @@
+"""
+Registry model lokal berversi (folder REGISTRY_DIR).
+
+Setiap versi = <id>.pkl (model) + <id>.json (metadata: fitur, sidik jari
+data training, metrik, parameter). Model notebook (model_store.PATH_MODEL)
+selalu tersedia sebagai versi BASELINE tanpa perlu disalin.
+
+Versi aktif disimpan di file pointer REGISTRY_DIR/ACTIVE yang ditulis atomik
+(os.replace), jadi pergantian versi langsung berlaku untuk semua sesi tanpa
+restart dan tanpa menimpa file model. Model dimuat lewat adiwiyata/model_store
+dan dilepas dari memori setelah IDLE_SECONDS tidak dipakai (versi aktif
+selalu dipertahankan).
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score
+
+from adiwiyata import inference, model_store
+
+REGISTRY_DIR = "models"
+ARTIFACT_PREFIX = "model_lgbm_adiwiyata"
+BASELINE = "baseline"
+ACTIVE_FILE = "ACTIVE"
+
+# Model non-aktif dilepas dari memori setelah selama ini (detik) tidak dipakai
+IDLE_SECONDS = 600
+
+_lock = threading.Lock()
+
+
+class Version(NamedTuple):
+    id: str
+    path: str
+    metadata: dict
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# ==========================================
+# VERSI
+# ==========================================
+def check_model(model):
+    """
+    Pastikan model bisa dinilai jalur inference (urutan fitur booster dikenali,
+    satu baris bisa diprediksi). ValueError kalau tidak.
+    """
+    proba = inference.predict_features(model, np.zeros((1, len(inference.FEATURES))))
+    if proba.shape != (1, len(model.classes_)):
+        raise ValueError(f"Bentuk probabilitas {proba.shape} tidak sesuai {len(model.classes_)} kelas")
+    return model
+
+
+def register(model, metadata, registry_dir=REGISTRY_DIR):
+    """Simpan model + metadata sebagai versi baru (id = timestamp UTC). Hasil: Version"""
+    check_model(model)
+    os.makedirs(registry_dir, exist_ok=True)
+    with _lock:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        version_id, n = stamp, 1
+        while os.path.exists(os.path.join(registry_dir, f"{ARTIFACT_PREFIX}-{version_id}.pkl")):
+            n += 1
+            version_id = f"{stamp}-{n}"
+        base = os.path.join(registry_dir, f"{ARTIFACT_PREFIX}-{version_id}")
+        metadata = {
+            "version": version_id,
+            "features": list(inference.FEATURES),
+            **metadata,
+            "path": f"{base}.pkl",
+        }
+        # Metadata ditulis terakhir: versi baru terlihat hanya kalau .pkl-nya sudah lengkap
+        _write_atomic(f"{base}.pkl", lambda tmp: joblib.dump(model, tmp))
+        _write_atomic(f"{base}.json", lambda tmp: _dump_json(tmp, metadata))
+    return Version(version_id, f"{base}.pkl", metadata)
+
+
+def _dump_json(path, obj):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+
+
+def versions(registry_dir=REGISTRY_DIR):
+    """Semua versi, terbaru duluan, BASELINE (model notebook) paling akhir"""
+    found = []
+    if os.path.isdir(registry_dir):
+        for name in sorted(os.listdir(registry_dir), reverse=True):
+            if not (name.startswith(ARTIFACT_PREFIX) and name.endswith(".json")):
+                continue
+            metadata = _read_json(os.path.join(registry_dir, name))
+            path = os.path.join(registry_dir, f"{name[:-5]}.pkl")
+            if metadata and os.path.exists(path):
+                found.append(Version(metadata.get("version", name[len(ARTIFACT_PREFIX) + 1:-5]), path, metadata))
+    if os.path.exists(model_store.PATH_MODEL):
+        found.append(Version(BASELINE, model_store.PATH_MODEL, {
+            "version": BASELINE,
+            "features": list(inference.FEATURES),
+            "source": "notebook (RandomizedSearchCV n_iter=40)",
+        }))
+    return found
+
+
+def get(version_id, registry_dir=REGISTRY_DIR):
+    for version in versions(registry_dir):
+        if version.id == version_id:
+            return version
+    raise KeyError(f"Versi model tidak ditemukan: {version_id}")
+
+
+# ==========================================
+# VERSI AKTIF
+# ==========================================
+def active_id(registry_dir=REGISTRY_DIR):
+    """Id versi aktif (BASELINE kalau belum pernah diganti / pointer rusak)"""
+    try:
+        with open(os.path.join(registry_dir, ACTIVE_FILE), "r", encoding="utf-8") as f:
+            version_id = f.read().strip()
+    except OSError:
+        return BASELINE
+    return version_id or BASELINE
+
+
+def active(registry_dir=REGISTRY_DIR):
+    try:
+        return get(active_id(registry_dir), registry_dir)
+    except KeyError:
+        return get(BASELINE, registry_dir)
+
+
+def activate(version_id, registry_dir=REGISTRY_DIR):
+    """Jadikan versi ini aktif (pointer ditulis atomik), model lama dilepas kalau idle"""
+    version = get(version_id, registry_dir)
+    # Muat + warm-up + cek jalur inference dulu sebelum dipakai semua sesi
+    check_model(model_store.get_model(version.path))
+    os.makedirs(registry_dir, exist_ok=True)
+
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version_id)
+    _write_atomic(os.path.join(registry_dir, ACTIVE_FILE), write)
+    release_idle(registry_dir)
+    return version
+
+
+def load(version_id, registry_dir=REGISTRY_DIR):
+    """Model satu versi (resident di model_store selama dipakai)"""
+    model = model_store.get_model(get(version_id, registry_dir).path)
+    release_idle(registry_dir)
+    return model
+
+
+def release_idle(registry_dir=REGISTRY_DIR, max_idle=IDLE_SECONDS):
+    """Lepas model versi non-aktif yang sudah lama tidak dipakai"""
+    try:
+        keep = [active(registry_dir).path]
+    except KeyError:
+        keep = []
+    return model_store.evict_idle(keep=keep, max_idle=max_idle)
+
+
+# ==========================================
+# PERBANDINGAN DUA VERSI
+# ==========================================
+def _score(version_id, df_model, registry_dir):
+    model = load(version_id, registry_dir)
+    return inference.predict_frame(model, df_model)
+
+
+def compare(version_a, version_b, df_model, registry_dir=REGISTRY_DIR):
+    """
+    Nilai data evaluasi berlabel (evaluation.build_model_frame) dengan dua versi
+    secara paralel. Hasil: (tabel metrik per versi, baris yang prediksinya beda).
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        pred_a, pred_b = pool.map(lambda v: _score(v, df_model, registry_dir), [version_a, version_b])
+
+    y = df_model["KETIDAKSESUAIAN"].to_numpy()
+    metrics = pd.DataFrame([
+        {
+            "Versi": version_id,
+            "Accuracy": accuracy_score(y, pred.pred_class),
+            "F1": f1_score(y, pred.pred_class, zero_division=0),
+            "F1 (Macro)": f1_score(y, pred.pred_class, average="macro", zero_division=0),
+        }
+        for version_id, pred in [(version_a, pred_a), (version_b, pred_b)]
+    ])
+
+    differ = np.flatnonzero(pred_a.pred_class != pred_b.pred_class)
+    diffs = pd.DataFrame({
+        "KABKOT_STD": df_model["KABKOT_STD"].to_numpy()[differ],
+        "Aktual": y[differ],
+        f"Prediksi {version_a}": pred_a.pred_class[differ],
+        f"Conf. {version_a}": pred_a.confidence[differ],
+        f"Prediksi {version_b}": pred_b.pred_class[differ],
+        f"Conf. {version_b}": pred_b.confidence[differ],
+    })
+    return metrics, diffs
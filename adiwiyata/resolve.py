@@ -0,0 +1,191 @@
+"""
+Resolusi kunci wilayah (KABKOT_STD) sekolah -> nama kanonik RTH/Sampah.
+
+Join exact string membuat variasi ejaan (mis. "Kab. Gunung Kidul" vs
+"Kab. Gunungkidul") jadi baris NaN yang kemudian dibuang. Modul ini membuat
+inverted index n-gram karakter atas nama kanonik; satu kunci hanya
+dibandingkan dengan nama yang berbagi n-gram dengannya (bukan semua nama),
+lalu diberi skor Dice atas himpunan n-gram nama inti (tanpa "Kab."/"Kota").
+Beberapa kandidat teratas dinilai ulang dengan rasio kemiripan urutan
+karakter (difflib) agar sisipan/hapusan huruf ("Baru" vs "Barru") tetap
+cocok tapi nama yang hanya berbagi kata ("Toba Samosir" vs "Samosir") tidak.
+
+Jenis wilayah (Kab./Kota) dan kata arah (Barat/Timur/Utara/Selatan/Tengah/
+Pusat) adalah syarat mutlak sebelum skor fuzzy dihitung: "Jakarta Barat"
+tidak pernah dibandingkan dengan "Jakarta Utara", "Kab. Bogor" tidak dengan
+"Kota Bogor". Lintas jenis hanya diizinkan kalau nama intinya sama persis
+dan nama tersebut tidak ada sama sekali dengan jenis aslinya di tabel
+referensi mana pun (kasus "MAKASSAR" tanpa awalan yang jadi "Kab. Makassar").
+
+Setiap tabel referensi (RTH, Sampah) di-resolve sendiri-sendiri: nama yang
+ada di RTH belum tentu ada (atau sama ejaannya) di Sampah, jadi setiap
+wilayah sekolah membawa kunci join per tabel dan laporan mencatat kegagalan
+per tabel.
+"""
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+NGRAM = 3
+
+# Jumlah kandidat Dice teratas yang dinilai ulang
+TOP_K = 5
+
+# Skor minimum agar dianggap cocok (rasio kemiripan nama inti);
+# 0.8 masih menerima "Bangka" -> "Bangkalan"
+MIN_SCORE = 0.85
+
+KINDS = ("Kab. ", "Kota ")
+
+# Kata arah pada nama inti harus sama persis antara kunci dan kandidat
+DIRECTIONS = frozenset({"barat", "timur", "utara", "selatan", "tengah", "pusat"})
+
+
+class Match(NamedTuple):
+    key: str
+    table: str    # label tabel referensi (RTH / Sampah)
+    name: object  # nama kanonik, None kalau tidak cocok
+    score: float
+    method: str   # exact / fuzzy / kind / none
+
+
+def split_kind(name):
+    """'Kab. Bogor' -> ('Kab. ', 'bogor')"""
+    for kind in KINDS:
+        if name.startswith(kind):
+            return kind, name[len(kind):].strip().lower()
+    return "", name.strip().lower()
+
+
+def directions(core):
+    """'lampung barat' -> frozenset({'barat'})"""
+    return frozenset(word for word in core.split() if word in DIRECTIONS)
+
+
+def ngrams(text, n=NGRAM):
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+class RegionIndex:
+    """Inverted index n-gram atas daftar nama kanonik satu tabel referensi"""
+
+    def __init__(self, names, table="", known=None, min_score=MIN_SCORE):
+        """`known` = semua nama di semua tabel referensi (syarat lintas jenis)"""
+        self.names = sorted({str(n) for n in names if pd.notna(n)})
+        self.table = table
+        self.min_score = min_score
+        self._exact = set(self.names)
+        self._known = self._exact if known is None else set(known)
+        self._kinds, self._cores, self._dirs, self._sizes = [], [], [], []
+        self._by_core = defaultdict(list)
+        postings = defaultdict(list)
+
+        for i, name in enumerate(self.names):
+            kind, core = split_kind(name)
+            grams = ngrams(core)
+            self._kinds.append(kind)
+            self._cores.append(core)
+            self._dirs.append(directions(core))
+            self._sizes.append(len(grams))
+            self._by_core[core].append(i)
+            for g in grams:
+                postings[g].append(i)
+
+        self._postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in postings.items()}
+        self._sizes = np.asarray(self._sizes, dtype=np.float64)
+        self._cache = {}
+
+    def _fuzzy(self, kind, core):
+        grams = ngrams(core)
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        if not lists:
+            return None, 0.0
+        # Hitung n-gram bersama hanya untuk kandidat yang muncul di posting list
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        # Syarat mutlak: jenis (Kab./Kota) & kata arah sama
+        dirs = directions(core)
+        allowed = np.array([self._kinds[i] == kind and self._dirs[i] == dirs for i in ids], dtype=bool)
+        ids, shared = ids[allowed], shared[allowed]
+        if not len(ids):
+            return None, 0.0
+        dice = 2.0 * shared / (len(grams) + self._sizes[ids])
+
+        best, best_score = None, 0.0
+        for i in ids[np.argsort(-dice, kind="stable")[:TOP_K]]:
+            score = SequenceMatcher(None, core, self._cores[i]).ratio()
+            if score > best_score:
+                best, best_score = int(i), score
+        return best, best_score
+
+    def lookup(self, key):
+        """Cari nama kanonik terbaik untuk satu kunci (hasil di-cache)"""
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+
+        if key in self._exact:
+            match = Match(key, self.table, key, 1.0, "exact")
+        else:
+            kind, core = split_kind(key)
+            best, score = self._fuzzy(kind, core)
+            if best is not None and score >= self.min_score:
+                match = Match(key, self.table, self.names[best], score, "fuzzy")
+            else:
+                others = [i for i in self._by_core.get(core, []) if self._kinds[i] != kind]
+                if kind and len(others) == 1 and key not in self._known:
+                    match = Match(key, self.table, self.names[others[0]], 1.0, "kind")
+                else:
+                    match = Match(key, self.table, None, score, "none")
+
+        self._cache[key] = match
+        return match
+
+    def resolve(self, keys):
+        """DataFrame hasil resolusi untuk banyak kunci (nilai unik saja yang dicari)"""
+        uniques = pd.unique(pd.Series(keys, dtype=object))
+        return pd.DataFrame([self.lookup(k) for k in uniques], columns=Match._fields)
+
+
+def join_column(table):
+    """Nama kolom kunci join sekolah untuk satu tabel referensi: 'RTH' -> 'KABKOT_RTH'"""
+    return f"KABKOT_{table.upper()}"
+
+
+def resolve_regions(df_sekolah_wilayah, references):
+    """
+    Cocokkan KABKOT_STD sekolah ke setiap tabel referensi secara terpisah.
+    `references` = dict {label: df_wilayah} (mis. {"RTH": ..., "Sampah": ...}).
+
+    KABKOT_STD diganti nama kanonik dari tabel pertama yang cocok (urutan
+    dict), sekolah dijumlahkan ulang per nama kanonik, dan setiap tabel
+    mendapat kolom kunci join sendiri (join_column(label), NaN kalau tidak
+    cocok). Hasil: (df_wilayah, laporan per kunci per tabel).
+    """
+    keys = df_sekolah_wilayah["KABKOT_STD"].astype(str)
+    df = df_sekolah_wilayah.copy()
+    df["KABKOT_STD"] = keys
+    canonical = pd.Series(np.nan, index=df.index, dtype=object)
+
+    names = {table: set(df_ref["KABKOT_STD"].dropna().astype(str)) for table, df_ref in references.items()}
+    known = set().union(*names.values())
+
+    reports = []
+    for table in references:
+        index = RegionIndex(names[table], table=table, known=known)
+        report = index.resolve(keys)
+        mapping = dict(zip(report["key"], report["name"]))
+        df[join_column(table)] = keys.map(mapping)
+        canonical = canonical.fillna(df[join_column(table)])
+        reports.append(report)
+
+    df["KABKOT_STD"] = canonical.fillna(keys)
+    df = df.groupby("KABKOT_STD", as_index=False, sort=True).agg(
+        JUMLAH_SEKOLAH_ADIWIYATA=("JUMLAH_SEKOLAH_ADIWIYATA", "sum"),
+        **{join_column(t): (join_column(t), "first") for t in references},
+    )
+    report = pd.concat(reports, ignore_index=True) if reports else pd.DataFrame(columns=Match._fields)
+    return df, report
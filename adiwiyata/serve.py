@@ -0,0 +1,240 @@
+"""
+Scoring service HTTP tanpa UI (tornado) dengan micro-batching.
+
+Request yang datang bersamaan dikumpulkan dalam satu jendela waktu
+(--window-ms) lalu diprediksi dalam SATU panggilan booster. Feature
+engineering & model sama persis dengan dashboard (adiwiyata/inference.py).
+
+Jalankan:
+    python -m adiwiyata.serve --port 8600 --window-ms 5 --max-batch 256
+
+Endpoint:
+    POST /predict   {"luas": 500, "sekolah": 10, "sampah_harian": 100,
+                     "sampah_tahunan": 36500, "rth": 20}
+                    atau {"records": [{...}, {...}]}
+    GET  /health    status model, kedalaman antrian, ukuran batch, latensi p50/p99
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import tornado.web
+
+from adiwiyata import inference, model_store
+
+
+class MicroBatcher:
+    """Kumpulkan baris dari banyak request lalu prediksi per batch"""
+
+    def __init__(self, predict_fn, window_ms=5.0, max_batch=256, history=2048):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = asyncio.Queue()
+        self._pending_rows = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self._task = None
+
+        # Metrik
+        self.batch_sizes = deque(maxlen=history)
+        self.latencies = deque(maxlen=history)
+        self.total_requests = 0
+        self.total_rows = 0
+        self.total_batches = 0
+        self.errors = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def queue_depth(self):
+        return self._pending_rows
+
+    async def submit(self, raw):
+        """Masukkan array (n, 5) ke antrian, tunggu hasil Prediction-nya"""
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        self._pending_rows += len(raw)
+        self.total_requests += 1
+        await self._queue.put((raw, fut, time.perf_counter()))
+        return await fut
+
+    async def _collect(self):
+        items = [await self._queue.get()]
+        rows = len(items[0][0])
+        deadline = time.perf_counter() + self.window
+        while rows < self.max_batch:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            batch = np.concatenate([raw for raw, _, _ in items])
+            self._pending_rows -= len(batch)
+            try:
+                result = await loop.run_in_executor(self._executor, self.predict_fn, batch)
+            except Exception as e:
+                self.errors += 1
+                for _, fut, _ in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+
+            self.total_batches += 1
+            self.total_rows += len(batch)
+            self.batch_sizes.append(len(batch))
+
+            now = time.perf_counter()
+            start = 0
+            for raw, fut, t0 in items:
+                end = start + len(raw)
+                self.latencies.append(now - t0)
+                if not fut.done():
+                    fut.set_result(inference.Prediction(
+                        result.pred_class[start:end],
+                        result.confidence[start:end],
+                        result.proba[start:end],
+                    ))
+                start = end
+
+    def metrics(self):
+        lat = np.asarray(self.latencies) * 1000.0
+        sizes = np.asarray(self.batch_sizes)
+        return {
+            "queue_depth": self.queue_depth,
+            "requests": self.total_requests,
+            "rows": self.total_rows,
+            "batches": self.total_batches,
+            "errors": self.errors,
+            "window_ms": self.window * 1000.0,
+            "max_batch": self.max_batch,
+            "batch_size": {
+                "mean": float(sizes.mean()) if len(sizes) else 0.0,
+                "p50": float(np.percentile(sizes, 50)) if len(sizes) else 0.0,
+                "max": int(sizes.max()) if len(sizes) else 0,
+            },
+            "latency_ms": {
+                "p50": float(np.percentile(lat, 50)) if len(lat) else 0.0,
+                "p99": float(np.percentile(lat, 99)) if len(lat) else 0.0,
+            },
+        }
+
+
+def parse_records(payload):
+    """Body JSON -> array mentah (n, 5) berurutan inference.RAW_INPUTS"""
+    records = payload.get("records") if isinstance(payload, dict) and "records" in payload else [payload]
+    if not isinstance(records, list) or not records:
+        raise ValueError("Body harus berupa record atau {'records': [...]}")
+    raw = np.empty((len(records), len(inference.RAW_INPUTS)), dtype=np.float64)
+    for i, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            raise ValueError(f"records[{i}] harus berupa object")
+        missing = [k for k in inference.RAW_INPUTS if k not in rec]
+        if missing:
+            raise ValueError(f"records[{i}] tidak punya field: {missing}")
+        raw[i] = [float(rec[k]) for k in inference.RAW_INPUTS]
+    bad = ~np.isfinite(raw)
+    if bad.any():
+        i, j = np.argwhere(bad)[0]
+        raise ValueError(f"records[{i}].{inference.RAW_INPUTS[j]} harus angka berhingga (bukan NaN/Infinity)")
+    if (raw[:, 0] <= 0).any():
+        raise ValueError("luas harus > 0")
+    return raw
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def write_json(self, obj, status=200):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(obj))
+
+
+class PredictHandler(BaseHandler):
+    def initialize(self, batcher):
+        self.batcher = batcher
+
+    async def post(self):
+        try:
+            raw = parse_records(json.loads(self.request.body or b"null"))
+        except (ValueError, TypeError) as e:
+            return self.write_json({"error": str(e)}, status=400)
+
+        try:
+            result = await self.batcher.submit(raw)
+        except Exception as e:
+            return self.write_json({"error": f"Gagal memprediksi: {e}"}, status=500)
+
+        self.write_json({"predictions": [
+            {
+                "class": int(c),
+                "label": inference.LABELS[int(c)],
+                "confidence": float(conf),
+                "proba": [float(p) for p in proba],
+            }
+            for c, conf, proba in zip(result.pred_class, result.confidence, result.proba)
+        ]})
+
+
+class HealthHandler(BaseHandler):
+    def initialize(self, batcher, model_path):
+        self.batcher = batcher
+        self.model_path = model_path
+
+    def get(self):
+        store = model_store.get_store(self.model_path)
+        self.write_json({
+            "status": "ok" if store.last_error is None else "degraded",
+            "model": self.model_path,
+            "model_loads": store.load_count,
+            **self.batcher.metrics(),
+        })
+
+
+def make_app(model_path=model_store.PATH_MODEL, window_ms=5.0, max_batch=256, compiled=False):
+    """Aplikasi tornado + batcher-nya"""
+    def predict_fn(raw):
+        return inference.predict(model_store.get_model(model_path), raw, compiled=compiled)
+
+    batcher = MicroBatcher(predict_fn, window_ms=window_ms, max_batch=max_batch)
+    app = tornado.web.Application([
+        (r"/predict", PredictHandler, {"batcher": batcher}),
+        (r"/health", HealthHandler, {"batcher": batcher, "model_path": model_path}),
+    ])
+    return app, batcher
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring service model Adiwiyata")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--model", default=model_store.PATH_MODEL)
+    parser.add_argument("--window-ms", type=float, default=5.0, help="jendela pengumpulan batch (ms)")
+    parser.add_argument("--max-batch", type=int, default=256, help="maksimum baris per batch")
+    parser.add_argument("--compiled", action="store_true", help="pakai evaluator NumPy (adiwiyata/compiled.py)")
+    args = parser.parse_args(argv)
+
+    # Model dimuat + warm-up sebelum menerima request
+    model_store.get_model(args.model)
+    app, batcher = make_app(args.model, args.window_ms, args.max_batch, args.compiled)
+    app.listen(args.port)
+    batcher.start()
+    print(f"Scoring service jalan di http://localhost:{args.port} (window {args.window_ms} ms, max batch {args.max_batch})")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
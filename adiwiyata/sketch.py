@@ -0,0 +1,275 @@
+"""
+Statistik deskriptif streaming (describe, batas IQR, top-k outlier) dengan
+memori terbatas, untuk tabel besar (level sekolah / desa, jutaan baris).
+
+Data dibaca sekali per potongan (chunk). Tiap (grup, kolom) punya satu
+ColumnSketch yang bisa di-merge, sehingga potongan bisa diproses terpisah
+(paralel / per file) lalu digabung.
+
+Isi ColumnSketch:
+- Momen: count, mean, M2 (Welford/Chan), min, max -> EXACT (sampai
+  pembulatan float64), termasuk std dengan ddof=1 seperti pandas.
+- Kuantil: selama jumlah nilai <= EXACT_LIMIT, nilai mentah disimpan dan
+  kuantil dihitung persis sama dengan pandas (interpolasi linear). Lewat
+  batas itu, nilai dilipat ke bucket logaritmik (gaya DDSketch) dengan
+  gamma = (1 + alpha) / (1 - alpha).
+- Top-k: k nilai terbesar beserta labelnya -> EXACT.
+
+Batas error setelah mode bucket (dibanding pandas .quantile / .describe):
+- Kuantil q: hasil sketch v memenuhi |v - x| <= alpha * |x| untuk suatu
+  nilai data x berperingkat floor(q*(n-1)) atau ceil(q*(n-1)). pandas
+  menginterpolasi di antara dua nilai itu, jadi error relatif terhadap
+  pandas <= alpha ditambah selisih dua nilai bertetangga tersebut.
+  Nol dihitung persis (bucket khusus). Default alpha = 1%.
+- Batas IQR (q3 + 1.5 * IQR) mewarisi error kuantil: maksimum
+  alpha * (|q1| * 1.5 + |q3| * 2.5).
+- count_above(x): nilai di bucket yang sama dengan x bisa salah sisi,
+  jadi hasilnya bisa meleset sebanyak isi satu bucket (nilai dalam rentang
+  relatif alpha dari x).
+- Memori per kolom: O(EXACT_LIMIT) lalu O(log(max/min) / log(gamma))
+  bucket, mis. ~2.400 bucket untuk rentang 1e-9..1e12 pada alpha 1%.
+"""
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+# Nilai mentah yang disimpan sebelum pindah ke bucket (hasil persis di bawah ini)
+EXACT_LIMIT = 100_000
+
+# Error relatif kuantil setelah mode bucket
+ALPHA = 0.01
+
+# Jumlah nilai terbesar (beserta label) yang disimpan per kolom
+TOP_K = 20
+
+
+class ColumnSketch:
+    """Sketch satu kolom numerik: momen, kuantil, dan top-k (mergeable)"""
+
+    def __init__(self, alpha=ALPHA, exact_limit=EXACT_LIMIT, top_k=TOP_K):
+        self.alpha = alpha
+        self.exact_limit = exact_limit
+        self.top_k = top_k
+        self._gamma_log = math.log((1 + alpha) / (1 - alpha))
+
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+        self._raw = []  # potongan nilai mentah (mode exact)
+        self._buckets = None  # {indeks: jumlah}, indeks negatif untuk nilai < 0
+        self._zeros = 0
+        self._top = []  # heap (nilai, urutan, label) berisi <= top_k item
+        self._seq = 0
+
+    # ------------------------------------------
+    # UPDATE / MERGE
+    # ------------------------------------------
+    def update(self, values, labels=None):
+        """Tambahkan satu potongan nilai (NaN/inf diabaikan, seperti pandas)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        mask = np.isfinite(values)
+        if labels is not None:
+            labels = np.asarray(labels, dtype=object).ravel()[mask]
+        values = values[mask]
+        if len(values) == 0:
+            return self
+
+        self._merge_moments(len(values), values.mean(), ((values - values.mean()) ** 2).sum(),
+                            values.min(), values.max())
+        self._add_top(values, labels)
+        if self._buckets is None:
+            self._raw.append(values)
+            if self.count > self.exact_limit:
+                self._to_buckets()
+        else:
+            self._bucket_add(values)
+        return self
+
+    def merge(self, other):
+        """Gabungkan sketch lain (dari potongan / proses lain) ke sketch ini"""
+        if other.count == 0:
+            return self
+        self._merge_moments(other.count, other.mean, other._m2, other.min, other.max)
+        for value, _, label in other._top:
+            self._push_top(value, label)
+        if self._buckets is None and other._buckets is None:
+            self._raw.extend(other._raw)
+            if self.count > self.exact_limit:
+                self._to_buckets()
+        else:
+            if self._buckets is None:
+                self._to_buckets()
+            if other._buckets is None:
+                for chunk in other._raw:
+                    self._bucket_add(chunk)
+            else:
+                self._zeros += other._zeros
+                for idx, n in other._buckets.items():
+                    self._buckets[idx] = self._buckets.get(idx, 0) + n
+        return self
+
+    def _merge_moments(self, n, mean, m2, lo, hi):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(lo))
+        self.max = max(self.max, float(hi))
+
+    def _add_top(self, values, labels):
+        if len(values) > self.top_k:
+            idx = np.argpartition(values, -self.top_k)[-self.top_k:]
+        else:
+            idx = np.arange(len(values))
+        for i in idx:
+            self._push_top(float(values[i]), None if labels is None else labels[i])
+
+    def _push_top(self, value, label):
+        self._seq += 1
+        item = (value, self._seq, label)
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, item)
+        elif value > self._top[0][0]:
+            heapq.heapreplace(self._top, item)
+
+    def _to_buckets(self):
+        self._buckets = {}
+        raw, self._raw = self._raw, []
+        for chunk in raw:
+            self._bucket_add(chunk)
+
+    def _bucket_add(self, values):
+        zero = values == 0
+        self._zeros += int(zero.sum())
+        values = values[~zero]
+        # Indeks bucket: ceil(log_gamma |x|), tanda ikut nilai (indeks digeser agar 0 tidak bentrok)
+        idx = np.ceil(np.log(np.abs(values)) / self._gamma_log).astype(np.int64)
+        keys = np.where(values > 0, idx * 2, idx * 2 + 1)
+        for key, n in zip(*np.unique(keys, return_counts=True)):
+            key = int(key)
+            self._buckets[key] = self._buckets.get(key, 0) + int(n)
+
+    # ------------------------------------------
+    # QUERY
+    # ------------------------------------------
+    @property
+    def exact(self):
+        return self._buckets is None
+
+    @property
+    def std(self):
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def _bucket_value(self, key):
+        idx, negative = key >> 1, key & 1
+        value = 2 * math.exp(idx * self._gamma_log) / (1 + math.exp(self._gamma_log))
+        return -value if negative else value
+
+    def _sorted_buckets(self):
+        items = [(self._bucket_value(k), n) for k, n in self._buckets.items()]
+        if self._zeros:
+            items.append((0.0, self._zeros))
+        return sorted(items)
+
+    def quantile(self, q):
+        """Kuantil q (0..1); persis pandas di mode exact, error <= alpha di mode bucket"""
+        if self.count == 0:
+            return math.nan
+        if self.exact:
+            return float(np.quantile(np.concatenate(self._raw), q))
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, n in self._sorted_buckets():
+            seen += n
+            if seen > rank:
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def describe(self, percentiles=(0.25, 0.5, 0.75)):
+        """Series dengan index yang sama seperti pandas describe()"""
+        index = ["count", "mean", "std", "min"]
+        values = [self.count, self.mean if self.count else math.nan, self.std,
+                  self.min if self.count else math.nan]
+        for p in percentiles:
+            index.append(f"{p * 100:g}%")
+            values.append(self.quantile(p))
+        index.append("max")
+        values.append(self.max if self.count else math.nan)
+        return pd.Series(values, index=index, dtype=np.float64)
+
+    def iqr_bounds(self, whisker=1.5):
+        """(batas bawah, batas atas) ala boxplot: q1 - w*IQR, q3 + w*IQR"""
+        q1, q3 = self.quantile(0.25), self.quantile(0.75)
+        iqr = q3 - q1
+        return q1 - whisker * iqr, q3 + whisker * iqr
+
+    def count_above(self, threshold):
+        """Jumlah nilai > threshold (persis di mode exact)"""
+        if self.exact:
+            return int(sum((chunk > threshold).sum() for chunk in self._raw))
+        return sum(n for value, n in self._sorted_buckets() if value > threshold)
+
+    def top(self, k=None, above=-math.inf):
+        """k nilai terbesar (> above) sebagai list (label, nilai), terbesar duluan"""
+        items = sorted(self._top, key=lambda item: (-item[0], item[1]))
+        items = [(label, value) for value, _, label in items if value > above]
+        return items[:k] if k is not None else items
+
+
+# ==========================================
+# BANYAK KOLOM / GRUP
+# ==========================================
+def _chunks(source):
+    if isinstance(source, pd.DataFrame):
+        return [source]
+    return source
+
+
+def sketch_frame(source, columns, by=None, label=None, **options):
+    """
+    Satu lintasan atas DataFrame atau iterable potongan DataFrame
+    (mis. pd.read_csv(..., chunksize=...)).
+
+    Tanpa `by`: {kolom: ColumnSketch}. Dengan `by`: {grup: {kolom: ColumnSketch}}.
+    `label`: kolom yang disimpan bersama top-k (mis. KABKOT_STD).
+    """
+    result = {}
+    for chunk in _chunks(source):
+        groups = [(None, chunk)] if by is None else chunk.groupby(by, sort=False, observed=True)
+        for key, part in groups:
+            sketches = result.setdefault(key, {})
+            labels = None if label is None else part[label].to_numpy()
+            for col in columns:
+                sketch = sketches.get(col)
+                if sketch is None:
+                    sketch = sketches[col] = ColumnSketch(**options)
+                sketch.update(part[col].to_numpy(), labels)
+    if by is None:
+        return result.get(None, {col: ColumnSketch(**options) for col in columns})
+    return result
+
+
+def merge_sketches(*results):
+    """Gabungkan beberapa hasil sketch_frame (tanpa `by`) kolom per kolom"""
+    merged = {}
+    for result in results:
+        for col, sketch in result.items():
+            if col not in merged:
+                merged[col] = ColumnSketch(sketch.alpha, sketch.exact_limit, sketch.top_k)
+            merged[col].merge(sketch)
+    return merged
+
+
+def describe(sketches, percentiles=(0.25, 0.5, 0.75)):
+    """DataFrame seperti df[columns].describe(percentiles=...)"""
+    return pd.DataFrame({col: s.describe(percentiles) for col, s in sketches.items()})
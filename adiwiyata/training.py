@@ -0,0 +1,241 @@
+"""
+Retraining LightGBM di dalam aplikasi (menu Modelling).
+
+Label KETIDAKSESUAIAN dibangun ulang dari df_final terkini (sama dengan
+evaluasi, lihat adiwiyata/evaluation.py), lalu ruang parameter notebook
+(PARAM_DIST) dicari dengan successive halving:
+
+1. N_CANDIDATES kombinasi parameter diambil acak (seperti RandomizedSearchCV
+   n_iter=40 di notebook).
+2. Tiap rung, semua kandidat yang tersisa dinilai dengan CV stratified
+   (F1, sama dengan scoring="f1") memakai batas boosting round yang naik
+   ETA kali per rung. Tiap fold memakai early stopping pada fold validasi.
+3. Hanya 1/ETA kandidat terbaik yang lanjut ke rung berikutnya.
+
+Semua pasangan (kandidat, fold) satu rung dijalankan paralel di semua core
+(LightGBM melepas GIL, tiap model n_jobs=1). Pencarian berjalan di thread
+background; progresnya dibaca UI lewat TrainingJob.snapshot(). Model
+terbaik di-fit ulang pada split train notebook (70/30, stratify) lalu
+didaftarkan sebagai versi baru di registry model (adiwiyata/registry.py).
+"""
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from lightgbm import LGBMClassifier
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+
+from adiwiyata import evaluation, inference, registry
+from adiwiyata.features import fingerprint
+from adiwiyata.ingest import BASE_DIR
+
+# Ruang parameter (sama dengan notebook)
+PARAM_DIST = {
+    "n_estimators": [200, 300, 400, 500, 700, 1000],
+    "learning_rate": [0.01, 0.03, 0.05, 0.1],
+    "max_depth": [3, 5, 7, 9, -1],
+    "num_leaves": [15, 31, 63, 127],
+    "min_child_samples": [5, 10, 20, 30],
+    "subsample": [0.6, 0.8, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0]
+}
+
+BASE_PARAMS = {"objective": "binary", "class_weight": "balanced", "random_state": 42, "verbose": -1}
+
+N_CANDIDATES = 40
+CV_FOLDS = 5
+ETA = 3
+MIN_ROUNDS = 50
+MAX_ROUNDS = max(PARAM_DIST["n_estimators"])
+EARLY_STOPPING_ROUNDS = 30
+
+
+def _fit_fold(params, rounds, X, y, train_idx, valid_idx):
+    model = LGBMClassifier(**BASE_PARAMS, **{**params, "n_estimators": min(params["n_estimators"], rounds)}, n_jobs=1)
+    model.fit(
+        X.iloc[train_idx], y[train_idx],
+        eval_set=[(X.iloc[valid_idx], y[valid_idx])],
+        callbacks=[lgb.early_stopping(EARLY_STOPPING_ROUNDS, verbose=False)],
+    )
+    pred = model.predict(X.iloc[valid_idx])
+    return f1_score(y[valid_idx], pred, zero_division=0), model.best_iteration_ or model.n_estimators
+
+
+def rung_schedule(n_candidates=N_CANDIDATES, eta=ETA, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    """Daftar (jumlah kandidat, batas round) per rung"""
+    schedule = []
+    n, rounds = n_candidates, min_rounds
+    while True:
+        schedule.append((n, min(rounds, max_rounds)))
+        if n <= 1 or rounds >= max_rounds:
+            return schedule
+        n, rounds = max(1, math.ceil(n / eta)), rounds * eta
+
+
+def check_round_trip(model, df_model, expected):
+    """
+    Pastikan model baru bisa dipakai jalur inference (predict_frame, dipakai
+    evaluasi, registry.compare & Try-it-out) dan hasilnya sama dengan
+    model.predict. Melempar ValueError kalau tidak, sebelum model didaftarkan.
+    """
+    got = inference.predict_frame(model, df_model).pred_class
+    if not np.array_equal(got, np.asarray(expected)):
+        raise ValueError(f"Prediksi inference.predict_frame berbeda dari model.predict ({int((got != expected).sum())} baris)")
+
+
+class TrainingJob:
+    """Satu run retraining di thread background, progresnya bisa dibaca kapan saja"""
+
+    def __init__(self, df_final, base_dir=BASE_DIR, n_candidates=N_CANDIDATES, n_jobs=-1, seed=42):
+        self.df_final = df_final
+        self.base_dir = base_dir
+        self.n_candidates = n_candidates
+        self.n_jobs = n_jobs
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._state = {
+            "status": "pending", "stage": "", "rung": 0, "rungs": 0,
+            "done": 0, "total": 0, "best_score": None, "best_params": None,
+            "log": [], "started": None, "finished": None, "result": None, "error": None,
+        }
+        self._thread = None
+
+    # ------------------------------------------
+    # PROGRES
+    # ------------------------------------------
+    def _update(self, **changes):
+        with self._lock:
+            self._state.update(changes)
+
+    def _log(self, message):
+        with self._lock:
+            self._state["log"].append(f"[{time.strftime('%H:%M:%S')}] {message}")
+
+    def snapshot(self):
+        with self._lock:
+            state = dict(self._state, log=list(self._state["log"]))
+        end = state["finished"] or time.time()
+        state["elapsed"] = end - state["started"] if state["started"] else 0.0
+        return state
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------
+    # JALANKAN
+    # ------------------------------------------
+    def start(self):
+        self._update(status="running", started=time.time())
+        self._thread = threading.Thread(target=self._run, name="retraining", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self._update(result=self._search(), status="done")
+            self._log("Selesai.")
+        except Exception as e:
+            self._update(status="error", error=str(e))
+            self._log(f"Gagal: {e}")
+        finally:
+            self._update(finished=time.time())
+
+    def _search(self):
+        self._update(stage="Menyiapkan data & label")
+        df_model = evaluation.build_model_frame(self.df_final, self.base_dir)
+        # Frame bernama kolom FEATURES: nama fitur booster = yang dicari inference
+        X = pd.DataFrame(inference.frame_features(df_model), columns=inference.FEATURES)
+        y = df_model["KETIDAKSESUAIAN"].to_numpy(dtype=np.int64)
+        # Posisi baris ikut di-split (split-nya sama) untuk cek round-trip di _finalize
+        X_train, X_test, y_train, y_test, _, test_rows = train_test_split(
+            X, y, np.arange(len(y)), test_size=0.3, random_state=42, stratify=y
+        )
+        self._log(f"Data: {len(X_train)} train / {len(X_test)} test, kelas positif {y.mean():.1%}")
+
+        folds = list(StratifiedKFold(CV_FOLDS, shuffle=True, random_state=self.seed).split(X_train, y_train))
+        candidates = list(ParameterSampler(PARAM_DIST, self.n_candidates, random_state=self.seed))
+        schedule = rung_schedule(len(candidates))
+        self._update(rungs=len(schedule), total=sum(n for n, _ in schedule) * len(folds))
+
+        parallel = Parallel(n_jobs=self.n_jobs, backend="threading", return_as="generator_unordered")
+        scores = {}
+        for rung, (n_keep, rounds) in enumerate(schedule, start=1):
+            candidates = candidates[:n_keep]
+            self._update(stage=f"Rung {rung}/{len(schedule)}: {len(candidates)} kandidat, maks {rounds} round", rung=rung)
+
+            jobs = [(c, f) for c in range(len(candidates)) for f in range(len(folds))]
+            fold_scores = {c: [] for c in range(len(candidates))}
+            fold_rounds = {c: [] for c in range(len(candidates))}
+
+            def _task(c, f, params, rounds):
+                train_idx, valid_idx = folds[f]
+                return c, _fit_fold(params, rounds, X_train, y_train, train_idx, valid_idx)
+
+            tasks = (delayed(_task)(c, f, candidates[c], rounds) for c, f in jobs)
+            for c, (score, best_iter) in parallel(tasks):
+                fold_scores[c].append(score)
+                fold_rounds[c].append(best_iter)
+                with self._lock:
+                    self._state["done"] += 1
+
+            ranked = sorted(range(len(candidates)), key=lambda c: -np.mean(fold_scores[c]))
+            scores = {i: (float(np.mean(fold_scores[c])), int(np.mean(fold_rounds[c])))
+                      for i, c in enumerate(ranked)}
+            candidates = [candidates[c] for c in ranked]
+            best_score = scores[0][0]
+            self._update(best_score=best_score, best_params=candidates[0])
+            self._log(f"Rung {rung}: F1 CV terbaik {best_score:.4f} ({len(candidates)} kandidat, {rounds} round)")
+
+        return self._finalize(candidates[0], scores[0], X_train, X_test, y_train, y_test, df_model.iloc[test_rows])
+
+    def _finalize(self, params, cv, X_train, X_test, y_train, y_test, df_test):
+        self._update(stage="Fit ulang model terbaik & simpan artefak")
+        cv_score, best_rounds = cv
+        # Jumlah round = rata-rata best_iteration dari early stopping di CV
+        final_params = {**params, "n_estimators": max(1, best_rounds)}
+        model = LGBMClassifier(**BASE_PARAMS, **final_params, n_jobs=self.n_jobs)
+        model.fit(X_train, y_train)
+
+        pred = model.predict(X_test)
+        check_round_trip(model, df_test, pred)
+        metadata = {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "source": f"retraining (successive halving, {self.n_candidates} kandidat)",
+            "params": final_params,
+            "cv_f1": cv_score,
+            "test_f1": float(f1_score(y_test, pred)),
+            "test_accuracy": float(accuracy_score(y_test, pred)),
+            "n_train": int(len(X_train)),
+            "n_test": int(len(X_test)),
+            "data_fingerprint": fingerprint(self.df_final),
+        }
+        version = registry.register(model, metadata)
+        self._log(f"Model disimpan sebagai versi {version.id}: {version.path} (F1 test {metadata['test_f1']:.4f})")
+        return version.metadata
+
+
+# ==========================================
+# JOB BERSAMA PROSES
+# ==========================================
+_job = None
+_job_lock = threading.Lock()
+
+
+def start(df_final, base_dir=BASE_DIR, **options):
+    """Mulai retraining di background; kalau masih ada yang berjalan, kembalikan job itu"""
+    global _job
+    with _job_lock:
+        if _job is None or not _job.running:
+            _job = TrainingJob(df_final, base_dir, **options).start()
+        return _job
+
+
+def current_job():
+    return _job
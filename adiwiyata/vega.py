@@ -0,0 +1,188 @@
+"""
+Backend grafik Vega-Lite (Altair) untuk halaman EDA: digambar di browser.
+
+Server hanya menghitung agregat ringkas dengan NumPy (jumlah per bin
+histogram, kurva KDE di grid tetap, kuartil boxplot, matriks korelasi),
+lalu mengirim spesifikasi Vega-Lite berisi agregat tersebut. Ukuran payload
+dan waktu render di server tidak lagi bergantung pada jumlah baris.
+
+Setiap builder punya nama & signature yang sama dengan fungsi di
+adiwiyata/charts.py, sehingga Figure yang sama bisa dirender lewat salah
+satu backend. Grafik yang tidak punya builder di sini (mis. segment_lmplot,
+yang memang butuh titik per baris) tetap memakai PNG matplotlib.
+"""
+import json
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from adiwiyata import correlation, figcache
+
+# Jumlah titik kurva KDE (grid tetap, tidak tergantung jumlah baris)
+KDE_POINTS = 100
+
+# Outlier boxplot yang dikirim per kolom (yang paling ekstrem duluan)
+MAX_OUTLIERS = 50
+
+# Lebar/tinggi panel kecil dalam grid (px)
+PANEL_WIDTH = 260
+PANEL_HEIGHT = 180
+
+
+# ==========================================
+# AGREGAT NUMPY
+# ==========================================
+def _finite(values):
+    values = np.asarray(values, dtype=np.float64).ravel()
+    return values[np.isfinite(values)]
+
+
+def hist_bins(values, bins=30):
+    """Jumlah per bin: DataFrame bin_start, bin_end, count"""
+    values = _finite(values)
+    if len(values) == 0:
+        return pd.DataFrame({"bin_start": [], "bin_end": [], "count": []})
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+
+def kde_curve(values, bins=30, points=KDE_POINTS):
+    """
+    KDE Gaussian (bandwidth Scott, sama dengan seaborn) di grid tetap,
+    diskalakan ke satuan jumlah per bin agar bisa ditumpuk di atas histogram.
+    """
+    values = _finite(values)
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or std == 0:
+        return pd.DataFrame({"x": [], "y": []})
+    bw = std * n ** (-1 / 5)
+    lo, hi = values.min(), values.max()
+    grid = np.linspace(lo, hi, points)
+    density = np.empty(points)
+    # Per potongan grid agar memori sementara tetap O(n), bukan O(points * n)
+    for start in range(0, points, 20):
+        z = (grid[start:start + 20, None] - values[None, :]) / bw
+        density[start:start + 20] = np.exp(-0.5 * z * z).sum(axis=1)
+    density /= n * bw * np.sqrt(2 * np.pi)
+    bin_width = (hi - lo) / bins if hi > lo else 1.0
+    return pd.DataFrame({"x": grid, "y": density * n * bin_width})
+
+
+def box_stats(values, name):
+    """Kuartil, whisker 1.5 IQR (dipotong ke data), dan outlier paling ekstrem"""
+    values = _finite(values)
+    if len(values) == 0:
+        return {"name": name}, pd.DataFrame({"name": [], "value": []})
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lo, hi = inside.min(), inside.max()
+    outliers = values[(values < lo) | (values > hi)]
+    if len(outliers) > MAX_OUTLIERS:
+        outliers = outliers[np.argsort(-np.abs(outliers - median))[:MAX_OUTLIERS]]
+    stats = {"name": name, "lo": lo, "q1": q1, "median": median, "q3": q3, "hi": hi}
+    return stats, pd.DataFrame({"name": name, "value": outliers})
+
+
+def corr_long(df, method):
+    """Matriks korelasi dalam bentuk panjang: row, col, value"""
+    corr = correlation.matrix(df, method)
+    return corr.rename_axis("row").reset_index().melt(id_vars="row", var_name="col", value_name="value")
+
+
+# ==========================================
+# KOMPONEN ALTAIR
+# ==========================================
+def _hist_panel(values, title, color, bins=30, y_title="Frekuensi"):
+    bars = alt.Chart(hist_bins(values, bins)).mark_bar(color=color, opacity=0.7).encode(
+        x=alt.X("bin_start:Q", bin="binned", title=None),
+        x2="bin_end:Q",
+        y=alt.Y("count:Q", title=y_title),
+    )
+    line = alt.Chart(kde_curve(values, bins)).mark_line(color=color).encode(x="x:Q", y="y:Q")
+    return (bars + line).properties(title=title, width=PANEL_WIDTH, height=PANEL_HEIGHT)
+
+
+def _box_panel(columns, title, color=None, width=600, height=None):
+    stats, outliers = zip(*(box_stats(values, name) for name, values in columns))
+    stats = pd.DataFrame(list(stats))
+    outliers = pd.concat(outliers, ignore_index=True)
+    y = alt.Y("name:N", title=None, sort=None)
+    fill = alt.value(color) if color else alt.Color("name:N", scale=alt.Scale(scheme="set2"), legend=None)
+
+    base = alt.Chart(stats)
+    whisker = base.mark_rule().encode(x=alt.X("lo:Q", title=None), x2="hi:Q", y=y)
+    box = base.mark_bar(size=24).encode(x="q1:Q", x2="q3:Q", y=y, color=fill)
+    median = base.mark_tick(color="black", size=24).encode(x="median:Q", y=y)
+    points = alt.Chart(outliers).mark_point(color="black", size=20).encode(x="value:Q", y=y)
+    height = height or 50 * len(stats)
+    return (whisker + box + median + points).properties(title=title, width=width, height=height)
+
+
+def _rows(panels, per_row):
+    return alt.vconcat(*[alt.hconcat(*panels[i:i + per_row]) for i in range(0, len(panels), per_row)])
+
+
+# ==========================================
+# BUILDER (signature sama dengan adiwiyata/charts.py)
+# ==========================================
+def distribution_grid(df):
+    panels = []
+    for col in df.columns:
+        color = "#66BB6A" if "SEKOLAH" in col or "RTH" in col else "#EF5350"
+        panels.append(_hist_panel(df[col], col.replace("_", " "), color, bins=25, y_title="Jumlah Wilayah"))
+    return _rows(panels, 3)
+
+
+def outlier_box(series):
+    return _box_panel([(series.name, series)], f"Sebaran {series.name}", color="#FFD54F", height=80)
+
+
+def log_compare_grid(df, columns):
+    panels = []
+    for col in columns:
+        panels.append(_hist_panel(df[col], f"SEBELUM: {col}", "#EF5350"))
+        panels.append(_hist_panel(df[f"LOG_{col}"], f"SESUDAH: LOG_{col}", "#42A5F5"))
+    return _rows(panels, 2)
+
+
+def horizontal_box(df, title, figsize=(14, 6), grid=False):
+    return _box_panel([(col, df[col]) for col in df.columns], title, width=int(figsize[0] * 50))
+
+
+def corr_heatmap(df, method, title=None, figsize=(8, 6), bounded=True):
+    scale = alt.Scale(scheme="redblue", reverse=True, domainMid=0,
+                      **({"domain": [-1, 1]} if bounded else {}))
+    base = alt.Chart(corr_long(df, method)).encode(
+        x=alt.X("col:N", title=None, sort=None),
+        y=alt.Y("row:N", title=None, sort=None),
+    )
+    rect = base.mark_rect().encode(color=alt.Color("value:Q", scale=scale, title=None))
+    text = base.mark_text().encode(text=alt.Text("value:Q", format=".2f"))
+    return (rect + text).properties(title=title or "", width=int(figsize[0] * 45), height=int(figsize[1] * 45))
+
+
+def density_hist(df):
+    return _rows([_hist_panel(df[col], f"Distribusi {col}", "green") for col in df.columns], len(df.columns))
+
+
+BUILDERS = {
+    "distribution_grid": distribution_grid,
+    "outlier_box": outlier_box,
+    "log_compare_grid": log_compare_grid,
+    "log_box": horizontal_box,
+    "density_box": horizontal_box,
+    "corr_heatmap": corr_heatmap,
+    "density_hist": density_hist,
+}
+
+
+def supports(name):
+    return name in BUILDERS
+
+
+def spec(name, data, **params):
+    """Spesifikasi Vega-Lite (dict) lewat cache bersama figcache"""
+    return json.loads(figcache.render(name, BUILDERS[name], data, fmt="vega-lite", **params))
@@ -1,13 +1,12 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 import os
-import joblib
-from lightgbm import LGBMClassifier
-from sklearn.model_selection import RandomizedSearchCV, train_test_split
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix, f1_score
+import time
+from sklearn.metrics import confusion_matrix, f1_score
+from adiwiyata import (charts, correlation, crossval, eda, evaluation, inference, memory, model_store, perf, pipeline,
+                       registry, segments, sketch, training)
+from adiwiyata.ingest import BASE_DIR, FILES
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # ==========================================
 # 1. KONFIGURASI HALAMAN
@@ -55,23 +54,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Jejak waktu rerun ini (span pipeline/grafik/model, lihat adiwiyata/perf.py).
+# Profil sampling hanya untuk satu rerun setelah tombol profil ditekan.
+ctx = get_script_run_ctx()
+perf.begin_rerun(ctx.session_id if ctx is not None else None,
+                 profile=st.session_state.pop("perf_profile_next", False))
+
 # ==========================================
-# 2. FUNGSI UTILITY (CLEANING DATA)
+# 2. DATA PREPARATION (PIPELINE BERSAMA)
 # ==========================================
-def normalize_kabkot_sekolah(series):
-    """Normalisasi nama kabupaten/kota dari dataset sekolah"""
-    s = (series.astype(str)
-         .str.replace('\xa0', ' ', regex=False)
-         .str.replace(r'\s+', ' ', regex=True)
-         .str.strip().str.upper())
-    
-    is_kota = s.str.match(r'^KOTA\b')
-    nama_inti = (s.str.replace(r'^(KOTA|KAB\.?|KABUPATEN)\b', '', regex=True)
-                 .str.strip().str.title())
-    
-    hasil = nama_inti.where(is_kota, "Kab. " + nama_inti)
-    hasil = hasil.where(~is_kota, "Kota " + nama_inti)
-    return hasil
+# Pipeline & model dihitung sekali per proses di background, mulai dari rerun
+# pertama pengunjung pertama (Streamlit baru menjalankan skrip ini saat ada
+# sesi), lalu dipakai bersama oleh semua sesi (lihat adiwiyata/pipeline.py)
+pipeline.warm_async()
+try:
+    # Versi aktif registry (bukan selalu model notebook): yang dipakai Try-it-out
+    model_store.warm_async(registry.active().path)
+except KeyError:
+    # Belum ada model sama sekali: menu Modelling yang menampilkan error
+    pass
+
+if "df_final" not in st.session_state:
+    df_cached = pipeline.peek_final()
+    if df_cached is not None:
+        st.session_state["df_final"] = df_cached
 
 # ==========================================
 # 3. SIDEBAR MENU (SIMPEL & CANTIK)
@@ -88,52 +94,123 @@ with st.sidebar:
         index=0
     )
     
+    perf.annotate(menu=menu)
     st.divider()
 
+    # Memori yang dipegang sesi ini + figur matplotlib yang masih hidup
+    # (dihitung ulang paling sering tiap memory.TRACK_INTERVAL detik, atau lewat tombol)
+    if ctx is not None:
+        usage = memory.track(ctx.session_id, st.session_state, force=st.session_state.get("memory_refresh", False))
+        with st.expander(f"🧠 Memori Sesi: {usage['bytes'] / 2**20:,.1f} MB"):
+            if usage["over_budget"]:
+                st.warning(f"Melebihi budget {usage['budget'] / 2**20:,.0f} MB per sesi.")
+            st.caption(
+                f"Figur matplotlib aktif (proses): {usage['figures']} · "
+                f"dihitung {time.time() - usage['updated']:,.0f} dtk lalu"
+            )
+            st.button("🔄 Hitung Ulang Memori", key="memory_refresh")
+            st.dataframe(
+                pd.Series(usage["keys"], name="bytes").rename_axis("key").to_frame(),
+                use_container_width=True
+            )
+
+    # Rincian waktu rerun terakhir sesi ini + persentil bergulir semua sesi
+    with st.expander("⏱️ Performa"):
+        last = perf.last_trace(ctx.session_id if ctx is not None else None)
+        if last is None:
+            st.caption("Belum ada rerun yang selesai.")
+        else:
+            st.caption(
+                f"Rerun terakhir ({last['meta'].get('menu', '-')}): {last['seconds'] * 1000:,.0f} ms"
+                + ("" if last["complete"] else " — berhenti lebih awal (st.stop/st.rerun)")
+            )
+            st.dataframe(
+                pd.DataFrame(perf.breakdown(last), columns=["span", "n", "seconds", "share"])
+                .style.format({"seconds": "{:.3f}", "share": "{:.0%}"}),
+                hide_index=True, use_container_width=True
+            )
+        st.caption("Persentil bergulir (detik, semua sesi)")
+        st.dataframe(
+            pd.DataFrame(perf.percentiles(), columns=["span", "n", "last", "p50", "p95", "p99"])
+            .style.format({c: "{:.3f}" for c in ["last", "p50", "p95", "p99"]}),
+            hide_index=True, use_container_width=True
+        )
+        st.caption(f"Ekspor: `{perf.SPANS_FILE}` (JSON lines) & `{perf.PROM_FILE}` (Prometheus)")
+
+        if st.button("🔬 Profil rerun berikutnya", help="Sampling profiler aktif untuk satu rerun setelah ini."):
+            st.session_state["perf_profile_next"] = True
+            st.caption("Profiler aktif pada interaksi berikutnya.")
+        if last is not None and last["profile"]:
+            st.caption("Fungsi teratas (sampel inklusif / self)")
+            st.dataframe(
+                pd.DataFrame(last["profile"])
+                .style.format({"total_pct": "{:.0%}", "self_pct": "{:.0%}"}),
+                hide_index=True, use_container_width=True
+            )
+
 # ==========================================
 # 4. LOGIKA KONTEN UTAMA
 # ==========================================
+def show_figure(fig):
+    """Tampilkan grafik dari cache bytes (digambar ulang hanya jika data/parameter berubah)"""
+    # Backend browser (Vega-Lite): server hanya mengirim agregat, fallback ke PNG
+    if st.session_state.get("chart_backend") == "Vega-Lite":
+        spec = fig.spec()
+        if spec is not None:
+            st.vega_lite_chart(spec)
+            return
+    st.image(fig.render(), width="stretch")
+
+
+def show_corr_ci(df_corr):
+    """Tabel interval kepercayaan 95% (bootstrap) Spearman & Pearson per pasangan variabel"""
+    with st.expander("📏 Interval Kepercayaan 95% (Bootstrap 1.000x)"):
+        st.caption("Rentang nilai korelasi yang masih wajar jika data wilayah diambil ulang secara acak. Rentang lebar = hubungan kurang pasti.")
+        ci = pd.concat([
+            correlation.confidence_intervals(df_corr, method, workers=os.cpu_count() or 1).assign(Metode=method.title())
+            for method in ["spearman", "pearson"]
+        ], ignore_index=True)
+        st.dataframe(
+            ci.style.format({"r": "{:.2f}", "CI Bawah": "{:.2f}", "CI Atas": "{:.2f}"}),
+            use_container_width=True, hide_index=True
+        )
 
 
-# ==========================================
-# FUNGSI NORMALISASI (PERBAIKAN DOUBLE TITIK)
-# ==========================================
-def normalize_kabkot_sekolah(series):
-    """
-    Normalisasi nama kabupaten/kota (Versi Fix Double Dot)
-    """
-    # 1. Bersihkan karakter aneh & spasi berlebih
-    s = (
-        series
-        .astype(str)
-        .str.replace('\xa0', ' ', regex=False)
-        .str.replace(r'\s+', ' ', regex=True)
-        .str.strip()
-        .str.upper()
-    )
+def render_training(job):
+    """Progres retraining (dibaca dari job background, UI tidak ikut terblokir)"""
+    state = job.snapshot()
+    if state["status"] == "running":
+        frac = state["done"] / state["total"] if state["total"] else 0.0
+        st.progress(frac, text=f"{state['stage']} ({state['done']}/{state['total']} fit, {state['elapsed']:.0f} dtk)")
+    elif state["status"] == "done":
+        res = state["result"]
+        st.success(f"✅ Selesai dalam {state['elapsed']:.0f} dtk. Model baru: `{res['path']}`")
+        r1, r2, r3 = st.columns(3)
+        r1.metric("F1 CV", f"{res['cv_f1']:.2%}")
+        r2.metric("F1 Test", f"{res['test_f1']:.2%}")
+        r3.metric("Accuracy Test", f"{res['test_accuracy']:.2%}")
+    elif state["status"] == "error":
+        st.error(f"Retraining gagal: {state['error']}")
 
-    # 2. Cek apakah dia Kota atau Kabupaten
-    is_kota = s.str.match(r'^KOTA\b')
-
-    # 3. Ambil nama intinya saja
-    # PERBAIKAN: Regex sekarang memakan spasi & titik setelah KAB/KOTA
-    nama_inti = (
-        s
-        .str.replace(r'^(KOTA|KAB\.?|KABUPATEN)\s*\.?\s*', '', regex=True)
-        .str.strip()
-        .str.lstrip('.') # Hapus paksa titik di depan jika masih ada sisa
-        .str.strip()
-        .str.title()
-    )
+    if state["best_params"]:
+        st.caption(f"Parameter terbaik sejauh ini (F1 CV {state['best_score']:.4f}): `{state['best_params']}`")
+    if state["log"]:
+        st.code("\n".join(state["log"][-10:]), language=None)
+    return state
 
-    # 4. Format ulang jadi "Kab. X" atau "Kota Y"
-    hasil = nama_inti.where(is_kota, "Kab. " + nama_inti)
-    hasil = hasil.where(~is_kota, "Kota " + nama_inti)
-    
-    # 5. Handle kasus khusus (misal "Kab. -")
-    hasil = hasil.replace("Kab. -", "Tidak Diketahui").replace("Kota -", "Tidak Diketahui")
 
-    return hasil
+@st.fragment(run_every=1.0)
+def render_training_live(job):
+    """Versi yang menyegarkan diri tiap detik selama job berjalan"""
+    if render_training(job)["status"] != "running":
+        # Job selesai: rerun penuh agar daftar artefak model ikut diperbarui
+        st.rerun()
+
+
+def show_chart(name, draw, data, **params):
+    """Seperti show_figure untuk grafik di luar section EDA (Figure ditutup setelah di-render)"""
+    show_figure(eda.Figure(name, draw, data, params))
+
 
 # ==========================================
 # MENU 1: DATASET OVERVIEW (STRICT LOGIC)
@@ -142,15 +219,7 @@ if menu == "1. Dataset Overview":
     st.title("📂 Dataset Overview & Processing")
     st.markdown("Modul ini menjalankan **Data Preparation** persis seperti spesifikasi Notebook.")
 
-    # Konfigurasi Path File
-    BASE_DIR = "Dataset_DS"
-    FILES = {
-        "Sekolah": "sekolah adiwiyata - sekolah adiwiyata.csv",
-        "RTH": "Data_RTH.xlsx",
-        "Sampah": "Data_Timbulan_Sampah.xlsx",
-        "Kualitas Air": "Indeks_Kualitas_Air.csv",
-        "Kualitas Udara": "indeks_kualitas_udara.csv"
-    }
+    # Konfigurasi Path File (BASE_DIR & FILES ada di adiwiyata/ingest.py)
 
     # Cek Ketersediaan File
     cols = st.columns(len(FILES))
@@ -173,93 +242,8 @@ if menu == "1. Dataset Overview":
         if st.button("🚀 Jalankan Data Preparation (Sesuai Notebook)", type="primary", use_container_width=True):
             with st.spinner("Sedang memproses data..."):
                 try:
-                    # 1. LOAD DATA
-                    df_sekolah = pd.read_csv(file_paths["Sekolah"])
-                    df_rth = pd.read_excel(file_paths["RTH"])
-                    df_sampah = pd.read_excel(file_paths["Sampah"])
-
-                    # 2. PROSES DATA SEKOLAH
-                    # Pastikan nama kolom 'Kabupaten/Kota' ada (Mapping dari file asli)
-                    col_kab = [c for c in df_sekolah.columns if 'Kabupaten' in c]
-                    if col_kab: df_sekolah.rename(columns={col_kab[0]: 'Kabupaten/Kota'}, inplace=True)
-
-                    # Terapkan fungsi normalisasi
-                    df_sekolah["KABKOT_STD"] = normalize_kabkot_sekolah(df_sekolah["Kabupaten/Kota"])
-
-                    # Agregasi
-                    df_sekolah_wilayah = (
-                        df_sekolah
-                        .groupby("KABKOT_STD", as_index=False)
-                        .agg(
-                            JUMLAH_SEKOLAH_ADIWIYATA=("Nama Sekolah", "count")
-                        )
-                    )
-
-                    # 3. PROSES DATA RTH
-                    df_rth_clean = df_rth.copy()
-                    
-                    # Rename (Sesuai Notebook)
-                    # Catatan: Kita pakai strip() dulu jaga-jaga ada spasi di header excel asli
-                    df_rth_clean.columns = df_rth_clean.columns.str.strip()
-                    df_rth_clean = df_rth_clean.rename(columns={
-                        "Kabupaten/Kota": "KABKOT_STD",
-                        "Luas Wilayah (km2)(A)": "LUAS_WILAYAH",
-                        "% RTH(B/A)": "PERSEN_RTH"
-                    })
-
-                    # Cleaning Numerik (Sesuai Notebook)
-                    for col in ["LUAS_WILAYAH", "PERSEN_RTH"]:
-                        if col in df_rth_clean.columns:
-                            df_rth_clean[col] = (
-                                df_rth_clean[col]
-                                .astype(str)
-                                .str.replace(",", ".", regex=False)
-                                .replace("-", np.nan)
-                            )
-                            df_rth_clean[col] = pd.to_numeric(df_rth_clean[col], errors="coerce")
-
-                    # Drop NA pada Luas Wilayah (Sesuai Notebook)
-                    df_rth_clean = df_rth_clean.dropna(subset=["LUAS_WILAYAH"])
-
-                    # Sorting & Drop Duplicates (Ambil data terbaru)
-                    if "Tahun" in df_rth_clean.columns:
-                        df_rth_wilayah = (
-                            df_rth_clean
-                            .sort_values(["KABKOT_STD", "Tahun"], ascending=[True, False])
-                            .drop_duplicates("KABKOT_STD")
-                            [["KABKOT_STD", "PERSEN_RTH", "LUAS_WILAYAH"]]
-                        )
-                    else:
-                        # Fallback jika tidak ada kolom tahun (ambil unique pertama)
-                        df_rth_wilayah = df_rth_clean.drop_duplicates("KABKOT_STD")[["KABKOT_STD", "PERSEN_RTH", "LUAS_WILAYAH"]]
-
-                    # 4. PROSES DATA SAMPAH
-                    df_sampah_clean = df_sampah.copy()
-                    df_sampah_clean.columns = df_sampah_clean.columns.str.strip()
-                    
-                    df_sampah_clean = df_sampah_clean.rename(columns={
-                        "Kabupaten/Kota": "KABKOT_STD",
-                        "Timbulan Sampah Harian(ton)": "SAMPAH_HARIAN_TON",
-                        "Timbulan Sampah Tahunan(ton)": "SAMPAH_TAHUNAN_TON"
-                    })
-
-                    # Sorting & Drop Duplicates (Ambil data terbaru)
-                    if "Tahun" in df_sampah_clean.columns:
-                        df_sampah_wilayah = (
-                            df_sampah_clean
-                            .sort_values(["KABKOT_STD", "Tahun"], ascending=[True, False])
-                            .drop_duplicates("KABKOT_STD")
-                            [["KABKOT_STD", "SAMPAH_HARIAN_TON", "SAMPAH_TAHUNAN_TON"]]
-                        )
-                    else:
-                        df_sampah_wilayah = df_sampah_clean.drop_duplicates("KABKOT_STD")[["KABKOT_STD", "SAMPAH_HARIAN_TON", "SAMPAH_TAHUNAN_TON"]]
-
-                    # 5. PENGGABUNGAN (MERGE)
-                    df_final = (
-                        df_sekolah_wilayah
-                        .merge(df_rth_wilayah, on="KABKOT_STD", how="left")
-                        .merge(df_sampah_wilayah, on="KABKOT_STD", how="left")
-                    )
+                    # Load -> Clean -> Aggregate -> Merge (tiap tahap di-memo)
+                    df_final = pipeline.build_final(BASE_DIR, incremental=True)
 
                     # Simpan ke Session
                     st.session_state["df_final"] = df_final
@@ -284,6 +268,13 @@ if menu == "1. Dataset Overview":
             with st.expander("🔍 Preview Tabel (5 Baris Teratas)", expanded=True):
                 st.dataframe(df_final.head(), use_container_width=True)
 
+            # Kunci wilayah sekolah yang tidak ketemu pasangannya di data RTH/Sampah
+            df_unmatched = pipeline.resolution_report(BASE_DIR)
+            if df_unmatched is not None and len(df_unmatched):
+                with st.expander(f"⚠️ {df_unmatched['key'].nunique()} Wilayah Sekolah Tidak Cocok dengan Data RTH/Sampah"):
+                    st.caption("Nama-nama ini tidak ditemukan (exact / fuzzy) di tabel yang disebut, sehingga kolom dari tabel tersebut kosong.")
+                    st.dataframe(df_unmatched[["key", "table", "score"]], use_container_width=True)
+
     else:
         st.warning("⚠️ File dataset tidak lengkap di folder `Dataset_DS`.")
 
@@ -296,16 +287,22 @@ elif menu == "2. EDA Lengkap":
         st.warning("⚠️ Data belum tersedia. Silakan kembali ke menu **'1. Dataset Overview'** dan klik tombol **'🚀 Jalankan Data Preparation'**.")
         st.stop()
     
-    # 2. Ambil Data
-    df_final = st.session_state["df_final"].copy()
+    # 2. Ambil Data (frame bersama, tidak di-copy; lihat langkah preprocessing)
+    df_final = st.session_state["df_final"]
     
     st.title("📊 Exploratory Data Analysis (EDA)")
     st.markdown("Analisis karakteristik data, transformasi, dan hubungan antar variabel.")
 
+    st.radio(
+        "Render grafik:",
+        ["Matplotlib", "Vega-Lite"],
+        horizontal=True,
+        key="chart_backend",
+        help="Vega-Lite: server hanya menghitung agregat (bin, kuartil, korelasi), grafik digambar di browser."
+    )
+
     # --- PREPROCESSING KOLOM (Agar sesuai codingan Notebook) ---
     # 1. Upper case & Strip
-    df_final.columns = df_final.columns.str.upper().str.strip()
-
     # 2. Mapping Nama Kolom (Agar cocok dengan variabel di plotting code)
     # Ini penting agar tidak error KeyError
     rename_map = {
@@ -315,16 +312,13 @@ elif menu == "2. EDA Lengkap":
         "TIMBULAN_SAMPAH_HARIAN": "SAMPAH_HARIAN_TON",
         "TIMBULAN_SAMPAH_TAHUNAN": "SAMPAH_TAHUNAN_TON"
     }
-    df_final.rename(columns=rename_map, inplace=True)
+    new_cols = [rename_map.get(c, c) for c in df_final.columns.str.upper().str.strip()]
+    # Salinan hanya dibuat kalau nama kolom memang berubah (biasanya tidak)
+    if new_cols != list(df_final.columns):
+        df_final = df_final.set_axis(new_cols, axis=1)
 
-    # 3. Definisi Kolom Numerik Utama
-    numerical_cols = [
-        "JUMLAH_SEKOLAH_ADIWIYATA",
-        "PERSEN_RTH",
-        "LUAS_WILAYAH",
-        "SAMPAH_HARIAN_TON",
-        "SAMPAH_TAHUNAN_TON"
-    ]
+    # 3. Definisi Kolom Numerik Utama (lihat adiwiyata/eda.py)
+    numerical_cols = eda.NUMERICAL_COLS
 
     # Validasi Kolom
     missing = [c for c in numerical_cols if c not in df_final.columns]
@@ -332,19 +326,22 @@ elif menu == "2. EDA Lengkap":
         st.error(f"❌ Kolom berikut hilang dari dataset: {missing}")
         st.stop()
 
-    # --- TABS VISUALISASI ---
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "1. Statistik & Distribusi",
-        "2. Log Transform",
-        "3. Korelasi",
-        "4. Normalisasi Wilayah",
-        "5. Visualisasi Lanjutan"
-    ])
+    # --- SECTION VISUALISASI ---
+    # Hanya section yang dibuka yang dihitung & digambar (lihat adiwiyata/eda.py)
+    section = eda.SECTIONS_BY_KEY[st.radio(
+        "Bagian EDA:",
+        [s.key for s in eda.SECTIONS],
+        format_func=lambda k: eda.SECTIONS_BY_KEY[k].title,
+        horizontal=True,
+        key="eda_section"
+    )]
+    data = eda.load_deps(section, df_final)
+    figs = section.figures(data)
 
 # ========================================================
     # TAB 1: STATISTIK & DISTRIBUSI (EXECUTIVE SUMMARY STYLE)
     # ========================================================
-    with tab1:
+    if section.key == "statistik":
         st.subheader("1. Snapshot Eksekutif")
         st.markdown("Ringkasan cepat kondisi data saat ini.")
 
@@ -391,8 +388,10 @@ elif menu == "2. EDA Lengkap":
             """)
 
         # Styling tabel agar angka desimal rapi
+        # (dari sketch streaming: persis pandas describe untuk data <= sketch.EXACT_LIMIT baris)
+        sketches = data["sketch"]
         st.dataframe(
-            df_final[numerical_cols].describe(percentiles=[0.25, 0.5, 0.75]).style.format("{:,.2f}"),
+            sketch.describe(sketches, percentiles=[0.25, 0.5, 0.75]).style.format("{:,.2f}"),
             use_container_width=True
         )
 
@@ -404,27 +403,7 @@ elif menu == "2. EDA Lengkap":
         Grafik ini menjawab pertanyaan: *"Apakah pembangunan lingkungan kita merata?"*
         """)
 
-        fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-        axes = axes.flatten()
-
-        for i, col in enumerate(numerical_cols):
-            if i < len(axes):
-                # Warna histogram: Hijau jika berhubungan dengan lingkungan (RTH/Sekolah), 
-                # Merah jika berhubungan dengan beban (Sampah/Luas)
-                bar_color = "#66BB6A" if "SEKOLAH" in col or "RTH" in col else "#EF5350"
-                
-                sns.histplot(df_final[col], kde=True, ax=axes[i], bins=25, color=bar_color)
-                
-                # Judul yang lebih deskriptif
-                axes[i].set_title(col.replace("_", " "), fontsize=10, fontweight='bold')
-                axes[i].set_xlabel("")
-                axes[i].set_ylabel("Jumlah Wilayah")
-
-        for j in range(len(numerical_cols), len(axes)):
-            axes[j].axis("off")
-
-        plt.tight_layout()
-        st.pyplot(fig)
+        show_figure(figs["distribution_grid"])
 
         st.info("""
         💡 **Kesimpulan Visual:**
@@ -452,37 +431,30 @@ elif menu == "2. EDA Lengkap":
 
         with col_box:
             # Boxplot Interaktif Tunggal
-            fig_box = plt.figure(figsize=(10, 4))
-            sns.boxplot(x=df_final[pilihan_outlier], color="#FFD54F")
-            plt.title(f"Sebaran {pilihan_outlier}")
-            plt.xlabel("")
-            st.pyplot(fig_box)
+            show_figure(figs[f"outlier_box:{pilihan_outlier}"])
 
         with col_txt:
             # ALGORITMA PENCARI NAMA KOTA (OTOMATIS)
-            # Hitung batas outlier (IQR)
-            q1 = df_final[pilihan_outlier].quantile(0.25)
-            q3 = df_final[pilihan_outlier].quantile(0.75)
-            iqr = q3 - q1
-            upper_bound = q3 + (1.5 * iqr)
+            # Hitung batas outlier (IQR) dari sketch, tanpa filter seluruh frame
+            col_sketch = sketches[pilihan_outlier]
+            _, upper_bound = col_sketch.iqr_bounds()
             
-            # Cari nama kota yang tembus batas atas
-            outliers = df_final[df_final[pilihan_outlier] > upper_bound].sort_values(pilihan_outlier, ascending=False)
+            # Cari nama kota yang tembus batas atas (top-k tersimpan di sketch)
+            n_outliers = col_sketch.count_above(upper_bound)
             
             st.markdown(f"**🔍 Deteksi Otomatis:**")
-            if not outliers.empty:
-                top_3 = outliers.head(5)
-                st.write(f"Ditemukan **{len(outliers)} wilayah** dengan nilai ekstrem tinggi:")
+            if n_outliers:
+                top_3 = col_sketch.top(5, above=upper_bound)
+                st.write(f"Ditemukan **{n_outliers} wilayah** dengan nilai ekstrem tinggi:")
                 
                 # Tampilkan Top 5 sebagai list
-                for idx, row in top_3.iterrows():
-                    val = row[pilihan_outlier]
+                for nama, val in top_3:
                     # Format angka biar enak dibaca
                     val_fmt = f"{val:,.0f}" if val > 100 else f"{val:.2f}"
-                    st.markdown(f"- **{row['KABKOT_STD']}**: {val_fmt}")
+                    st.markdown(f"- **{nama}**: {val_fmt}")
                 
-                if len(outliers) > 5:
-                    st.caption(f"...dan {len(outliers)-5} wilayah lainnya.")
+                if n_outliers > 5:
+                    st.caption(f"...dan {n_outliers-5} wilayah lainnya.")
             else:
                 st.success("Data merata. Tidak ditemukan wilayah dengan nilai ekstrem (Outlier).")
 
@@ -495,7 +467,7 @@ elif menu == "2. EDA Lengkap":
 # ========================================================
     # TAB 2: LOG TRANSFORM (PENYETARAAN SKALA)
     # ========================================================
-    with tab2:
+    if section.key == "log":
         st.subheader("2. Penyetaraan Skala Data (Log Transform)")
         
         # Penjelasan Konsep untuk Non-Statistisi
@@ -509,36 +481,13 @@ elif menu == "2. EDA Lengkap":
         Teknik **Log Transform** (`np.log1p`) berguna untuk "memampatkan" angka-angka raksasa tersebut agar skalanya lebih adil dan mendekati distribusi normal (lonceng).
         """)
 
-        # Proses Transformasi
-        df_stat = df_final.copy()
-        log_transform_cols = numerical_cols
-        
-        for col in log_transform_cols:
-            df_stat[f"LOG_{col}"] = np.log1p(df_stat[col])
-
         st.divider()
 
         # Plot Perbandingan (Before vs After)
         st.subheader("Visualisasi Dampak Transformasi")
         st.markdown("Perhatikan bagaimana grafik di sisi **Kanan (Sesudah)** menjadi lebih landai dan terpusat di tengah dibandingkan sisi **Kiri (Sebelum)**.")
 
-        fig, axes = plt.subplots(nrows=5, ncols=2, figsize=(16, 20))
-
-        for i, col in enumerate(log_transform_cols):
-            # BEFORE (Data Asli)
-            sns.histplot(df_stat[col], bins=30, kde=True, ax=axes[i, 0], color='#EF5350') # Merah (Timpang)
-            axes[i, 0].set_title(f"SEBELUM: {col}\n(Sangat Timpang ke Kiri)", fontsize=10, color='red')
-            axes[i, 0].set_xlabel("")
-            axes[i, 0].set_ylabel("Frekuensi")
-            
-            # AFTER (Data Log)
-            sns.histplot(df_stat[f"LOG_{col}"], bins=30, kde=True, ax=axes[i, 1], color='#42A5F5') # Biru (Normal)
-            axes[i, 1].set_title(f"SESUDAH: LOG_{col}\n(Lebih Terdistribusi Normal)", fontsize=10, color='blue')
-            axes[i, 1].set_xlabel("")
-            axes[i, 1].set_ylabel("")
-
-        plt.tight_layout()
-        st.pyplot(fig)
+        show_figure(figs["log_compare_grid"])
 
         st.divider()
 
@@ -549,48 +498,28 @@ elif menu == "2. EDA Lengkap":
         Grafik di bawah ini adalah **data bersih** yang akan dipelajari oleh model AI.
         """)
         
-        log_cols_only = [f"LOG_{c}" for c in log_transform_cols]
-        
-        fig_box_log = plt.figure(figsize=(14, 6))
-        # Menggunakan palette 'Set2' agar warna-warni tapi lembut
-        sns.boxplot(data=df_stat[log_cols_only], orient="h", palette="Set2") 
-        plt.title("Distribusi Data Siap Pakai (Log Scale)")
-        plt.grid(axis='x', linestyle='--', alpha=0.3)
-        st.pyplot(fig_box_log)
+        show_figure(figs["log_box"])
         
         st.success("✅ **Status Data:** Skala data kini sudah stabil. Siap untuk tahap analisis korelasi dan pemodelan.")
 
-    with tab3:
+    if section.key == "korelasi":
         st.subheader("Matriks Korelasi (Data Log)")
         st.write("Analisis ini bertujuan melihat kekuatan hubungan linear (Pearson) maupun hubungan peringkat (Spearman) antar variabel.")
 
-        corr_cols = [
-            "LOG_JUMLAH_SEKOLAH_ADIWIYATA",
-            "LOG_PERSEN_RTH",
-            "LOG_SAMPAH_HARIAN_TON",
-            "LOG_SAMPAH_TAHUNAN_TON"
-        ]
-
         # --- Bagian Visualisasi (Atas) ---
         c1, c2 = st.columns(2)
         
         with c1:
             st.markdown("##### 1. Spearman Correlation")
             st.caption("Mengukur hubungan monotonik (baik untuk data berdistribusi tidak normal/ada outlier).")
-            corr_spearman = df_stat[corr_cols].corr(method="spearman")
-            fig_s = plt.figure(figsize=(8, 6))
-            sns.heatmap(corr_spearman, annot=True, cmap="coolwarm", center=0, fmt=".2f", vmin=-1, vmax=1)
-            plt.title("Matriks Korelasi Spearman")
-            st.pyplot(fig_s)
+            show_figure(figs["spearman"])
 
         with c2:
             st.markdown("##### 2. Pearson Correlation")
             st.caption("Mengukur hubungan linear murni (asumsi data berdistribusi normal).")
-            corr_pearson = df_stat[corr_cols].corr(method="pearson")
-            fig_p = plt.figure(figsize=(8, 6))
-            sns.heatmap(corr_pearson, annot=True, cmap="coolwarm", center=0, fmt=".2f", vmin=-1, vmax=1)
-            plt.title("Matriks Korelasi Pearson")
-            st.pyplot(fig_p)
+            show_figure(figs["pearson"])
+
+        show_corr_ci(data["df_stat"][eda.CORR_COLS])
 
         st.divider()
 
@@ -630,39 +559,17 @@ elif menu == "2. EDA Lengkap":
             * **> 0.6**: Kuat
             """)
 
-    with tab4:
+    if section.key == "normalisasi":
         st.subheader("Normalisasi Berbasis Luas Wilayah")
         st.markdown("""
         **Tujuan:** Menghitung densitas (kepadatan) per km² untuk membandingkan wilayah secara adil, 
         terlepas dari besar/kecilnya luas wilayah tersebut.
         """)
         
-        # --- 1. PROSES HITUNG ---
-        df_norm = df_stat.copy()
-        df_norm = df_norm[df_norm["LUAS_WILAYAH"] > 0].copy() # Filter luas 0
-
-        # Rasio (Densitas)
-        df_norm["ADIWIYATA_PER_KM2"] = df_norm["JUMLAH_SEKOLAH_ADIWIYATA"] / df_norm["LUAS_WILAYAH"]
-        df_norm["SAMPAH_HARIAN_PER_KM2"] = df_norm["SAMPAH_HARIAN_TON"] / df_norm["LUAS_WILAYAH"]
-        df_norm["SAMPAH_TAHUNAN_PER_KM2"] = df_norm["SAMPAH_TAHUNAN_TON"] / df_norm["LUAS_WILAYAH"]
-
-        # Log Transform (Untuk visualisasi yang lebih baik)
-        df_norm["LOG_ADIWIYATA_PER_KM2"] = np.log1p(df_norm["ADIWIYATA_PER_KM2"])
-        df_norm["LOG_SAMPAH_HARIAN_PER_KM2"] = np.log1p(df_norm["SAMPAH_HARIAN_PER_KM2"])
-        df_norm["LOG_SAMPAH_TAHUNAN_PER_KM2"] = np.log1p(df_norm["SAMPAH_TAHUNAN_PER_KM2"])
-
-        norm_cols = ["LOG_ADIWIYATA_PER_KM2", "LOG_SAMPAH_HARIAN_PER_KM2", "LOG_SAMPAH_TAHUNAN_PER_KM2"]
-
         # --- 2. VISUALISASI DISTRIBUSI (HISTOGRAM) ---
         st.markdown("#### 1. Distribusi Data Densitas (Log Scale)")
         
-        fig, axes = plt.subplots(1, 3, figsize=(18, 5))
-        for i, col in enumerate(norm_cols):
-            sns.histplot(df_norm[col], bins=30, kde=True, ax=axes[i], color='green')
-            axes[i].set_title(f"Distribusi {col}")
-            axes[i].set_xlabel("")
-        plt.tight_layout()
-        st.pyplot(fig)
+        show_figure(figs["density_hist"])
 
         # Penjelasan Histogram
         st.info("""
@@ -675,10 +582,7 @@ elif menu == "2. EDA Lengkap":
         # --- 3. VISUALISASI OUTLIER (BOXPLOT) ---
         st.markdown("#### 2. Deteksi Outlier (Boxplot)")
         
-        fig_bn = plt.figure(figsize=(10, 4))
-        sns.boxplot(data=df_norm[norm_cols], orient="h", palette="Set2")
-        plt.title("Boxplot Variabel Normalisasi (Log)")
-        st.pyplot(fig_bn)
+        show_figure(figs["density_box"])
 
         # Penjelasan Boxplot
         st.caption("""
@@ -694,22 +598,18 @@ elif menu == "2. EDA Lengkap":
         c3, c4 = st.columns(2)
         with c3:
             st.write("**Spearman (Rank)**")
-            corr_ns = df_norm[norm_cols].corr(method="spearman")
-            fig_ns = plt.figure(figsize=(6, 5))
-            sns.heatmap(corr_ns, annot=True, cmap="coolwarm", center=0, fmt=".2f")
-            st.pyplot(fig_ns)
+            show_figure(figs["spearman"])
         with c4:
             st.write("**Pearson (Linear)**")
-            corr_np = df_norm[norm_cols].corr(method="pearson")
-            fig_np = plt.figure(figsize=(6, 5))
-            sns.heatmap(corr_np, annot=True, cmap="coolwarm", center=0, fmt=".2f")
-            st.pyplot(fig_np)
+            show_figure(figs["pearson"])
+
+        show_corr_ci(data["df_norm"][eda.NORM_COLS])
 
         # Penjelasan Korelasi (INI POIN PALING PENTING)
         st.warning("""
         **💡 TEMUAN PENTING: Lonjakan Korelasi!**
         
-        Bandingkan hasil Pearson di sini dengan data mentah di Tab 3:
+        Bandingkan hasil Pearson di sini dengan data mentah di bagian 3 (Korelasi):
         1.  **Data Mentah:** Korelasi Adiwiyata vs Sampah hanya berkisar **0.30 (Lemah)**.
         2.  **Data Densitas (di sini):** Korelasi melonjak menjadi **0.65 - 0.85 (Kuat)**.
         
@@ -717,35 +617,26 @@ elif menu == "2. EDA Lengkap":
         Ini menunjukkan fenomena **Urbanisasi**: Sekolah Adiwiyata lebih banyak terkonsentrasi di wilayah perkotaan (sempit & padat) yang juga merupakan produsen sampah terbesar.
         """)
 
-    with tab5:
+    if section.key == "segmentasi":
         st.subheader("3. Segmentasi Pola (LM Plot)")
         st.write("Analisis ini membedah apakah hubungan Adiwiyata-Sampah berlaku sama di semua wilayah, atau berbeda antara wilayah sampah rendah vs tinggi.")
         
+        n_kelompok = st.slider(
+            "Jumlah kelompok (kuantil sampah):", 2, 5, 2,
+            help="2 = median split seperti notebook (rendah vs tinggi)."
+        )
+
         try:
-            df_ctx = df_norm.copy()
-            
-            # Membagi data menjadi 2 kelompok (Median Split)
-            df_ctx["KELOMPOK_SAMPAH"] = pd.qcut(
-                df_ctx["LOG_SAMPAH_HARIAN_PER_KM2"], q=2,
-                labels=["Sampah Relatif Rendah", "Sampah Relatif Tinggi"]
+            # Kuantil split + OLS per kelompok, pita CI analitik (lihat adiwiyata/segments.py)
+            fig_segmen = figs["segment_lmplot"]
+            show_figure(fig_segmen._replace(params={**fig_segmen.params, "groups": n_kelompok}))
+
+            hasil_segmen = segments.segment(fig_segmen.data, *fig_segmen.data.columns, groups=n_kelompok)
+            st.dataframe(
+                hasil_segmen.table.style.format(precision=3),
+                use_container_width=True, hide_index=True
             )
             
-            # Plotting sesuai kodemu
-            g = sns.lmplot(
-                data=df_ctx,
-                x="LOG_ADIWIYATA_PER_KM2",
-                y="LOG_SAMPAH_HARIAN_PER_KM2",
-                hue="KELOMPOK_SAMPAH",
-                scatter_kws={"alpha": 0.5},
-                height=5,
-                aspect=1.2,
-                legend=False # Matikan legend bawaan agar bisa diatur posisinya jika mau, atau biarkan default
-            )
-            
-            plt.title("Perbedaan Pola Hubungan: Wilayah Rendah vs Tinggi")
-            plt.legend(title="Kategori Wilayah", loc='upper left') # Merapikan legend
-            st.pyplot(g.fig)
-            
             # --- BAGIAN INI YANG MEMBUATNYA INFORMATIF ---
 # --- PENJELASAN VISUAL & ANALITIS (UPDATED) ---
             st.info("""
@@ -769,6 +660,11 @@ elif menu == "2. EDA Lengkap":
         except Exception as e:
             st.warning(f"Gagal membuat LM Plot: {e}")
 
+    # Halaman sudah tampil: section berat lainnya digambar di background
+    # (hanya backend Matplotlib; spesifikasi Vega-Lite cukup murah dibuat saat dibuka)
+    if st.session_state.get("chart_backend") != "Vega-Lite":
+        eda.prefetch(df_final, skip=(section.key,))
+
 # ==========================================
 # MENU 3: MODELLING (ULTIMATE: PKL + HUGGING FACE UI)
 # ==========================================
@@ -781,19 +677,72 @@ elif menu == "3. Modelling":
         st.warning("⚠️ Data belum tersedia. Silakan proses data di Menu 1 dulu.")
         st.stop()
 
+    # --- RETRAINING (SUCCESSIVE HALVING, BACKGROUND) ---
+    job = training.current_job()
+    with st.expander("🔁 Latih Ulang Model dari Data Terkini", expanded=job is not None and job.running):
+        st.caption(
+            f"Label KETIDAKSESUAIAN dibangun ulang dari data saat ini, lalu {training.N_CANDIDATES} kombinasi parameter "
+            f"LightGBM diseleksi dengan successive halving (CV {training.CV_FOLDS}-fold, F1, early stopping) di semua core. "
+            f"Model terbaik disimpan sebagai versi baru di registry `{registry.REGISTRY_DIR}/`."
+        )
+        if job is not None and job.running:
+            render_training_live(job)
+        else:
+            if st.button("🚀 Mulai Retraining", type="primary"):
+                job = training.start(st.session_state["df_final"], BASE_DIR)
+                st.rerun()
+            if job is not None:
+                render_training(job)
+
     # 2. Setup Path & Dependencies
-    BASE_DIR = "Dataset_DS"
-    PATH_MODEL = "model_lgbm_adiwiyata.pkl"  # Pastikan file ini ada!
+    # Registry model: baseline notebook + versi hasil retraining (lihat adiwiyata/registry.py)
+    daftar_versi = registry.versions()
     
     # Cek Keberadaan Model
-    if not os.path.exists(PATH_MODEL):
-        st.error(f"❌ File Model `{PATH_MODEL}` tidak ditemukan! Harap upload file .pkl ke folder project.")
+    if not daftar_versi:
+        st.error(f"❌ File Model `{model_store.PATH_MODEL}` tidak ditemukan! Harap upload file .pkl ke folder project.")
         st.info("Tips: Jika file ada di dalam folder 'Dataset_DS', ubah path di kode menjadi os.path.join('Dataset_DS', 'modelname.pkl')")
         st.stop()
 
-    # 3. Load Model (Hanya sekali load agar ringan)
+    versi_aktif = registry.active()
+    id_versi = [v.id for v in daftar_versi]
+    with st.expander(f"🗂️ Registry Model — versi aktif: `{versi_aktif.id}`"):
+        c_reg1, c_reg2 = st.columns([3, 1])
+        pilih_aktif = c_reg1.selectbox(
+            "Versi:", id_versi, index=id_versi.index(versi_aktif.id),
+            format_func=lambda v: f"{v} (aktif)" if v == versi_aktif.id else v
+        )
+        c_reg2.write("")
+        if c_reg2.button("Jadikan Aktif", disabled=pilih_aktif == versi_aktif.id, use_container_width=True):
+            try:
+                registry.activate(pilih_aktif)
+            except ValueError as e:
+                st.error(f"Versi {pilih_aktif} tidak bisa diaktifkan: {e}")
+            else:
+                st.toast(f"Versi aktif sekarang: {pilih_aktif}", icon="✅")
+                st.rerun()
+        st.json(daftar_versi[id_versi.index(pilih_aktif)].metadata, expanded=False)
+
+        # --- PERBANDINGAN DUA VERSI ---
+        if len(id_versi) > 1:
+            st.markdown("**⚖️ Bandingkan Dua Versi (data evaluasi berlabel)**")
+            c_a, c_b = st.columns(2)
+            versi_a = c_a.selectbox("Versi A:", id_versi, index=id_versi.index(versi_aktif.id), key="cmp_a")
+            versi_b = c_b.selectbox("Versi B:", id_versi, index=0 if id_versi[0] != versi_a else 1, key="cmp_b")
+            if st.button("Bandingkan", disabled=versi_a == versi_b):
+                with st.spinner("Menilai kedua versi secara paralel..."):
+                    df_eval = evaluation.build_model_frame(st.session_state["df_final"], BASE_DIR)
+                    metrik, beda = registry.compare(versi_a, versi_b, df_eval)
+                st.dataframe(metrik.style.format(precision=4), use_container_width=True, hide_index=True)
+                st.caption(f"{len(beda)} dari {len(df_eval)} wilayah diprediksi berbeda oleh kedua versi.")
+                if len(beda):
+                    st.dataframe(beda, use_container_width=True, hide_index=True)
+
+    PATH_MODEL = versi_aktif.path
+
+    # 3. Load Model (resident per proses, dimuat ulang hanya jika file .pkl berubah)
     try:
-        model = joblib.load(PATH_MODEL)
+        model = registry.load(versi_aktif.id)
     except Exception as e:
         st.error(f"Gagal memuat model: {e}")
         st.stop()
@@ -822,24 +771,16 @@ elif menu == "3. Modelling":
 
             if st.button("Compute Prediction", type="primary", use_container_width=True):
                 try:
-                    # PREPROCESSING (Harus sama persis dengan Training)
-                    adiwiyata_km2 = in_sekolah / in_luas
-                    sampah_harian_km2 = in_sampah / in_luas
-                    sampah_tahunan_km2 = in_sampah_tahunan / in_luas
-                    
-                    # Susun Dataframe (Urutan kolom PENTING)
-                    input_data = pd.DataFrame([{
-                        "LOG_ADIWIYATA_PER_KM2": np.log1p(adiwiyata_km2),
-                        "LOG_SAMPAH_HARIAN_PER_KM2": np.log1p(sampah_harian_km2),
-                        "LOG_SAMPAH_TAHUNAN_PER_KM2": np.log1p(sampah_tahunan_km2),
-                        "PERSEN_RTH": in_rth,
-                        "LUAS_WILAYAH": in_luas
-                    }])
-                    
-                    # PREDIKSI
-                    pred_class = model.predict(input_data)[0]
-                    pred_proba = model.predict_proba(input_data)[0]
-                    confidence = pred_proba[pred_class] * 100
+                    # PREPROCESSING + PREDIKSI (satu kali jalan pohon booster)
+                    hasil = inference.predict(model, {
+                        "luas": in_luas,
+                        "sekolah": in_sekolah,
+                        "sampah_harian": in_sampah,
+                        "sampah_tahunan": in_sampah_tahunan,
+                        "rth": in_rth
+                    })
+                    pred_class = hasil.pred_class
+                    confidence = hasil.confidence * 100
                     
                     st.divider()
                     
@@ -860,10 +801,10 @@ elif menu == "3. Modelling":
         st.subheader("📊 Model Performance Metrics")
         st.markdown("Evaluasi model terhadap seluruh data wilayah yang tersedia.")
         
-        # Cek apakah hasil evaluasi sudah ada di session state?
-        if "pkl_results" in st.session_state:
+        # Cek apakah hasil evaluasi sudah tersimpan (dikunci hash model + sidik jari data)?
+        res = evaluation.cached_results(PATH_MODEL, st.session_state["df_final"], BASE_DIR)
+        if res is not None:
             # JIKA SUDAH ADA, LANGSUNG TAMPILKAN (Biar Cepat)
-            res = st.session_state["pkl_results"]
             
             # Kartu Metrik
             m1, m2, m3 = st.columns(3)
@@ -879,11 +820,7 @@ elif menu == "3. Modelling":
                 c_cm, c_rep = st.columns([1, 2])
                 with c_cm:
                     cm = confusion_matrix(res['y_actual'], res['y_pred'])
-                    fig_cm = plt.figure(figsize=(4, 3))
-                    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
-                                xticklabels=["Selaras", "Tdk Selaras"], 
-                                yticklabels=["Selaras", "Tdk Selaras"])
-                    st.pyplot(fig_cm)
+                    show_chart("confusion_matrix", charts.confusion_heatmap, cm)
                 with c_rep:
                     rep_df = pd.DataFrame(res['report']).transpose()
                     st.dataframe(rep_df.style.format("{:.2f}"), use_container_width=True)
@@ -893,9 +830,7 @@ elif menu == "3. Modelling":
                     "Fitur": res['feature_names'],
                     "Importance": res['feature_importances']
                 }).sort_values(by="Importance", ascending=False)
-                fig_imp = plt.figure(figsize=(8, 3))
-                sns.barplot(data=imp_df, x="Importance", y="Fitur", palette="viridis")
-                st.pyplot(fig_imp)
+                show_chart("feature_importance", charts.importance_bar, imp_df)
                 
             with tab_dist:
                 st.info("Grafik ini membandingkan data fakta (Asli) dengan tebakan Model (Prediksi).")
@@ -908,13 +843,11 @@ elif menu == "3. Modelling":
                 df_all = pd.concat([df_act, df_pre])
                 df_all["Label"] = df_all["Label"].map({0: "Selaras", 1: "Tdk Selaras"})
                 
-                fig_d = plt.figure(figsize=(8, 4))
-                sns.barplot(data=df_all, x="Label", y="Count", hue="Type", palette="pastel")
-                st.pyplot(fig_d)
+                show_chart("prediction_dist", charts.label_dist_bar, df_all)
                 
             # Tombol Reset (Opsional)
             if st.button("🔄 Refresh Evaluasi"):
-                del st.session_state["pkl_results"]
+                evaluation.forget_results(PATH_MODEL, st.session_state["df_final"], BASE_DIR)
                 st.rerun()
 
         else:
@@ -924,72 +857,43 @@ elif menu == "3. Modelling":
             if st.button("🚀 Load Dataset Evaluation", type="primary"):
                 with st.spinner("Memproses seluruh dataset & melakukan prediksi..."):
                     try:
-                        # --- DATA PREP LENGKAP (Merge IKA/IKU) ---
-                        # Kita perlu menyatukan data lagi untuk mendapatkan Label Asli (y_actual)
-                        df_final = st.session_state["df_final"].copy()
-                        df_model = df_final[df_final["LUAS_WILAYAH"] > 0].copy()
-                        df_model.columns = df_model.columns.str.upper().str.strip()
-                        
-                        # Feature Engineering
-                        df_model["ADIWIYATA_PER_KM2"] = df_model["JUMLAH_SEKOLAH_ADIWIYATA"] / df_model["LUAS_WILAYAH"]
-                        df_model["SAMPAH_HARIAN_PER_KM2"] = df_model["SAMPAH_HARIAN_TON"] / df_model["LUAS_WILAYAH"]
-                        df_model["SAMPAH_TAHUNAN_PER_KM2"] = df_model["SAMPAH_TAHUNAN_TON"] / df_model["LUAS_WILAYAH"]
-                        
-                        for col in ["ADIWIYATA_PER_KM2", "SAMPAH_HARIAN_PER_KM2", "SAMPAH_TAHUNAN_PER_KM2"]:
-                            df_model[f"LOG_{col}"] = np.log1p(df_model[col])
-                            
-                        # Merge Data Pendukung (IKA/IKU/Provinsi)
-                        path_ika = os.path.join(BASE_DIR, "Indeks_Kualitas_Air.csv")
-                        path_iku = os.path.join(BASE_DIR, "indeks_kualitas_udara.csv")
-                        path_rth = os.path.join(BASE_DIR, "Data_RTH.xlsx")
-                        
-                        # Load Mapping Provinsi
-                        df_rth_raw = pd.read_excel(path_rth)
-                        col_kab = [c for c in df_rth_raw.columns if 'Kabupaten' in c][0]
-                        df_rth_raw.rename(columns={col_kab: 'Kabupaten/Kota'}, inplace=True)
-                        df_rth_raw["KABKOT_STD"] = normalize_kabkot_sekolah(df_rth_raw["Kabupaten/Kota"])
-                        col_prov = [c for c in df_rth_raw.columns if 'Provinsi' in c or 'PROVINSI' in c][0]
-                        prov_map = df_rth_raw.drop_duplicates("KABKOT_STD").set_index("KABKOT_STD")[col_prov]
-                        df_model["PROVINSI"] = df_model["KABKOT_STD"].map(prov_map).astype(str).str.upper().str.strip()
-
-                        # Load & Merge IKA/IKU
-                        df_ika = pd.read_csv(path_ika)
-                        df_iku = pd.read_csv(path_iku)
-                        df_ika.rename(columns={"Provinsi": "PROVINSI", "Indeks Kualitas Air": "IKA"}, inplace=True)
-                        df_iku.rename(columns={"Provinsi": "PROVINSI", "Indeks Kualitas Udara": "IKU"}, inplace=True)
-                        for df in [df_ika, df_iku]: 
-                            if "PROVINSI" in df.columns: df["PROVINSI"] = df["PROVINSI"].astype(str).str.upper().str.strip()
-                        
-                        df_model = df_model.merge(df_ika[["PROVINSI", "IKA"]], on="PROVINSI", how="left") \
-                                           .merge(df_iku[["PROVINSI", "IKU"]], on="PROVINSI", how="left")
-                        
-                        df_model_clean = df_model.dropna(subset=["IKA", "IKU", "LOG_ADIWIYATA_PER_KM2"])
-                        
-                        # Labeling (Ground Truth)
-                        median_adiwiyata = df_model_clean["LOG_ADIWIYATA_PER_KM2"].median()
-                        median_ika = df_model_clean["IKA"].median()
-                        median_iku = df_model_clean["IKU"].median()
-                        df_model_clean["ADIWIYATA_TINGGI"] = df_model_clean["LOG_ADIWIYATA_PER_KM2"] >= median_adiwiyata
-                        df_model_clean["LINGKUNGAN_RENDAH"] = (df_model_clean["IKA"] < median_ika) | (df_model_clean["IKU"] < median_iku)
-                        df_model_clean["KETIDAKSESUAIAN"] = (df_model_clean["ADIWIYATA_TINGGI"] & df_model_clean["LINGKUNGAN_RENDAH"]).astype(int)
-
-                        # --- PREDIKSI MASSIF ---
-                        features = ["LOG_ADIWIYATA_PER_KM2", "LOG_SAMPAH_HARIAN_PER_KM2", "LOG_SAMPAH_TAHUNAN_PER_KM2", "PERSEN_RTH", "LUAS_WILAYAH"]
-                        X = df_model_clean[features]
-                        y_actual = df_model_clean["KETIDAKSESUAIAN"]
-                        y_pred = model.predict(X)
-                        
-                        # Simpan ke Session
-                        st.session_state["pkl_results"] = {
-                            "accuracy": accuracy_score(y_actual, y_pred),
-                            "report": classification_report(y_actual, y_pred, target_names=["Selaras", "Tdk Selaras"], output_dict=True),
-                            "feature_importances": model.feature_importances_,
-                            "feature_names": features,
-                            "y_actual": y_actual,
-                            "y_pred": y_pred
-                        }
+                        # --- DATA PREP LENGKAP (Lookup IKA/IKU + Label) + PREDIKSI MASSIF ---
+                        # Hasil disimpan di disk, dipakai semua sesi sampai model/data berubah
+                        evaluation.evaluate(model, PATH_MODEL, st.session_state["df_final"], BASE_DIR)
                         
                         st.rerun() # Refresh halaman agar hasil muncul
 
                     except Exception as e:
-                        st.error(f"Gagal memproses dataset: {e}")
\ No newline at end of file
+                        st.error(f"Gagal memproses dataset: {e}")
+
+        # --- CROSS-VALIDATION K-FOLD (label per fold, tanpa leakage) ---
+        with st.expander(f"🔁 Cross-Validation {crossval.N_SPLITS}-Fold"):
+            st.caption(
+                "Ambang median label dihitung dari fold train saja; model dengan parameter "
+                "yang sama di-fit ulang per fold. Hasil per fold disimpan di disk."
+            )
+            cv = crossval.cached(model, st.session_state["df_final"], BASE_DIR)
+            if cv is None and st.button("▶️ Jalankan Cross-Validation"):
+                with st.spinner(f"Melatih & menilai {crossval.N_SPLITS} fold secara paralel..."):
+                    try:
+                        cv = crossval.cross_validate(model, st.session_state["df_final"], BASE_DIR)
+                    except Exception as e:
+                        st.error(f"Cross-validation gagal: {e}")
+
+            if cv is not None:
+                summary = cv["summary"]
+                k1, k2, k3 = st.columns(3)
+                for col, metric in zip([k1, k2, k3], summary.index):
+                    col.metric(f"{metric} (CV)", f"{summary.loc[metric, 'Mean']:.2%}",
+                               f"± {summary.loc[metric, 'Std']:.2%}", delta_color="off")
+                c_cv, c_fold = st.columns([1, 2])
+                with c_cv:
+                    show_chart("confusion_matrix_cv", charts.confusion_heatmap, cv["confusion"])
+                with c_fold:
+                    st.dataframe(
+                        cv["per_fold"].style.format({"Accuracy": "{:.2%}", "F1": "{:.2%}", "F1 (Macro)": "{:.2%}"}),
+                        hide_index=True, use_container_width=True
+                    )
+
+# Rerun selesai normal (st.stop/st.rerun ditutup saat rerun berikutnya dimulai)
+perf.end_rerun()